@@ -1,49 +1,164 @@
 """SSE chat client for the production real-estate agent endpoint."""
 
+import asyncio
 import json
+import random
+import time
 from typing import TYPE_CHECKING, Optional, Any
-import requests
+
+import httpx
+import numpy as np
 
 from app.config.logger import get_logger
+from app.config.settings import (
+    HTTP2_ENABLED,
+    HTTP_POOL_MAX_CONNECTIONS,
+    HTTP_POOL_MAX_KEEPALIVE,
+    HTTP_KEEPALIVE_EXPIRY_SEC,
+    RETRY_BACKOFF_BASE_SEC,
+    RETRY_BACKOFF_MAX_SEC,
+)
+
+from app.core.replay.cassette import RecordedStream, current_cassette
 
 if TYPE_CHECKING:
-    from app.config.types import ChatResult
+    from app.config.types import ChatResult, StreamStats
 
 logger = get_logger(__name__)
 
 
+# One keep-alive pool per event loop, shared by every ChatClient / run.
+_shared_client: Optional[httpx.AsyncClient] = None
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared connection pool, creating it on first use in this event loop."""
+    global _shared_client, _shared_loop
+
+    loop = asyncio.get_running_loop()
+    if _shared_client is None or _shared_client.is_closed or _shared_loop is not loop:
+        _shared_client = httpx.AsyncClient(
+            http2=HTTP2_ENABLED,
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SEC,
+            ),
+        )
+        _shared_loop = loop
+        logger.info(f"Shared HTTP pool created (http2={HTTP2_ENABLED})")
+    return _shared_client
+
+
+async def aclose_http_client() -> None:
+    """Close the shared connection pool (called on application shutdown)."""
+    global _shared_client, _shared_loop
+
+    if _shared_client is not None and not _shared_client.is_closed:
+        await _shared_client.aclose()
+        logger.info("Shared HTTP pool closed")
+    _shared_client = None
+    _shared_loop = None
+
+
+def stream_stats(
+    ttfb_sec: Optional[float], delta_offsets: list[float], chars: int, total_sec: float
+) -> "StreamStats":
+    """Gap distribution, largest stall and throughput of one response from its delta arrival times."""
+    from app.config.types import StreamStats
+
+    def r(value: Optional[float]) -> Optional[float]:
+        return None if value is None else round(float(value), 4)
+
+    stats = StreamStats(
+        ttfb_sec=r(ttfb_sec),
+        first_delta_sec=r(delta_offsets[0]) if delta_offsets else None,
+        total_sec=r(total_sec),
+        deltas=len(delta_offsets),
+        chars=chars,
+    )
+    if len(delta_offsets) > 1:
+        gaps = np.diff(delta_offsets)
+        stats.gap_p50_sec, stats.gap_p95_sec, stats.gap_p99_sec = (r(v) for v in np.percentile(gaps, [50, 95, 99]))
+        stats.max_stall_sec = r(gaps.max())
+        span = delta_offsets[-1] - delta_offsets[0]
+        stats.chars_per_sec = round(chars / span, 1) if span > 0 else None
+    return stats
+
+
 class ChatClient:
     """Client for the production chat SSE endpoint."""
 
-    def __init__(self, api_url: str, user_id: str, timeout_sec: int, retry_count: int):
+    def __init__(
+        self,
+        api_url: str,
+        user_id: str,
+        timeout_sec: int,
+        retry_count: int,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
         self.api_url = api_url
         self.user_id = user_id
         self.timeout_sec = timeout_sec
         self.retry_count = retry_count
+        self._client = client
         logger.info("ChatClient initialized")
 
-    def send_message(self, content: str, session_id: Optional[str]) -> "ChatResult":
-        """Send a message and stream the response. Retries on failure."""
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number `attempt` (1-based)."""
+        cap = min(RETRY_BACKOFF_MAX_SEC, RETRY_BACKOFF_BASE_SEC * (2 ** (attempt - 1)))
+        return random.uniform(0, cap)
+
+    async def send_message(self, content: str, session_id: Optional[str]) -> "ChatResult":
+        """
+        Send a message and stream the response. Retries with jittered backoff on failure.
+        The result's connect/first-event/stream timings are those of the attempt that succeeded.
+        With a cassette current, the response lines are recorded, or replayed without a request.
+        """
+        cassette = current_cassette()
+        if cassette is not None and cassette.replaying:
+            entry = cassette.next("sse")
+            if entry is None:
+                raise RuntimeError(f"Cassette {cassette.path} has no more agent responses")
+            return await self._parse_sse(RecordedStream(entry["lines"]))
+
+        client = self._client or get_http_client()
+        body: dict[str, Any] = {
+            "userId": self.user_id,
+            "content": content,
+            "stream": True,
+        }
+        if session_id is not None:
+            body["session_id"] = session_id
+
         last_error = None
         for attempt in range(self.retry_count):
+            if attempt:
+                delay = self._backoff(attempt)
+                logger.info(f"Retrying send_message in {delay:.2f}s")
+                await asyncio.sleep(delay)
+            started = time.perf_counter()
             try:
-                body = {
-                    "userId": self.user_id,
-                    "content": content,
-                    "stream": True,
-                }
-                if session_id is not None:
-                    body["session_id"] = session_id
-                resp = requests.post(
+                async with client.stream(
+                    "POST",
                     self.api_url,
                     json=body,
-                    stream=True,
                     timeout=self.timeout_sec,
                     headers={"Accept": "text/event-stream"},
-                )
-                resp.raise_for_status()
-                logger.info(f"Message sent successfully on attempt {attempt + 1}")
-                return self._parse_sse(resp)
+                ) as resp:
+                    connect_sec = time.perf_counter() - started
+                    resp.raise_for_status()
+                    logger.info(f"Message sent successfully on attempt {attempt + 1}")
+                    if cassette is not None and cassette.recording:
+                        stream = RecordedStream(source=resp)
+                        result = await self._parse_sse(stream, started)
+                        cassette.record("sse", {"content": content, "session_id": session_id, "lines": stream.lines})
+                    else:
+                        result = await self._parse_sse(resp, started)
+                    result.connect_sec = connect_sec
+                    return result
             except Exception as e:
                 last_error = e
                 logger.error(f"Attempt {attempt + 1} failed: {e}")
@@ -51,22 +166,36 @@ class ChatClient:
         logger.error("send_message failed after retries")
         raise last_error or RuntimeError("send_message failed after retries")
 
-    def _parse_sse(self, response: requests.Response) -> "ChatResult":
-        """Parse SSE stream and accumulate assistant text and session_id."""
+    async def _parse_sse(self, response: httpx.Response, started: Optional[float] = None) -> "ChatResult":
+        """
+        Parse SSE stream and accumulate assistant text and session_id.
+        `started` (perf_counter when the request was sent) is the origin of the arrival
+        offsets: first line, first event and every content delta.
+        """
         from app.config.types import ChatResult
 
+        stream_started = time.perf_counter()
+        started = stream_started if started is None else started
+        first_line_at: Optional[float] = None
+        first_event_at: Optional[float] = None
+        delta_offsets: list[float] = []
         assistant_parts: list[str] = []
         session_id: Optional[str] = None
         raw_events_count = 0
         done = False
 
-        for line in response.iter_lines(decode_unicode=True):
+        async for line in response.aiter_lines():
             if line is None:
                 continue
+            now = time.perf_counter()
+            if first_line_at is None:
+                first_line_at = now
             line = line.strip()
             if not line.startswith("data:"):
                 continue
             raw_events_count += 1
+            if first_event_at is None:
+                first_event_at = now
             payload = line[5:].strip()
             if payload == "[DONE]" or payload == "":
                 continue
@@ -88,11 +217,24 @@ class ChatClient:
                 delta = data.get("delta") or ""
             if delta:
                 assistant_parts.append(delta if isinstance(delta, str) else str(delta))
+                delta_offsets.append(now - started)
 
+        ended = time.perf_counter()
+        stream_sec = ended - stream_started
         assistant_text = "".join(assistant_parts)
-        logger.info(f"Parsed SSE response with {raw_events_count} events")
+        stats = stream_stats(
+            first_line_at - started if first_line_at is not None else None,
+            delta_offsets,
+            len(assistant_text),
+            ended - started,
+        )
+        logger.info(f"Parsed SSE response with {raw_events_count} events ({stats.deltas} deltas) in {stream_sec:.3f}s")
         return ChatResult(
             assistant_text=assistant_text,
             session_id=session_id,
             raw_events_count=raw_events_count,
+            first_event_sec=first_event_at - started if first_event_at is not None else None,
+            stream_sec=stream_sec,
+            delta_offsets=delta_offsets,
+            stream=stats,
         )
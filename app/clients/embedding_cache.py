@@ -0,0 +1,249 @@
+"""Disk-backed, content-addressed cache for embedding vectors."""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.config.logger import get_logger
+from app.config.settings import (
+    EMBEDDING_CACHE_DIR,
+    EMBEDDING_CACHE_MAX_MB,
+    EMBEDDING_CACHE_DTYPE,
+)
+
+logger = get_logger(__name__)
+
+INDEX_FILE = "index.json"
+INDEX_LOG_FILE = "index.log"
+VECTORS_FILE = "vectors.bin"
+MIN_ROWS = 64
+# the log is folded into index.json once it has this many lines more than there are entries
+COMPACT_MIN_LOG_LINES = 1024
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace and case so near-verbatim repeats share one entry."""
+    return " ".join(text.split()).casefold()
+
+
+def cache_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\x00{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Embeddings of one model, stored as a memory-mapped (rows, dim) matrix in
+    `vectors.bin` (float32 or float16). The key -> row index is a snapshot in
+    `index.json` (LRU order) plus `index.log`, one "key row" line appended per stored
+    vector, so a put costs O(batch) on disk; the log is folded into the snapshot once
+    it outgrows the index, and on flush(). The matrix grows by doubling up to
+    `max_bytes`; after that the least recently used row is overwritten. Safe to share
+    between threads.
+    """
+
+    def __init__(self, root: str, model: str, max_bytes: int, dtype: str = "float32"):
+        self.model = model
+        self.dir = os.path.join(root, re.sub(r"[^A-Za-z0-9_.-]", "_", model))
+        self.max_bytes = max_bytes
+        self.dtype = np.dtype(dtype)
+        self.dim: Optional[int] = None
+        self._rows: "OrderedDict[str, int]" = OrderedDict()   # key -> row, least recently used first
+        self._matrix: Optional[np.memmap] = None
+        self._allocated = 0
+        self._log_lines = 0                 # lines in index.log since the last snapshot
+        self._snapshot = False              # index.json exists for this model/dtype
+        self._lock = threading.Lock()
+        self._load()
+
+    # ---------- persistence ----------
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.dir, name)
+
+    def _load(self) -> None:
+        if not os.path.exists(self._path(INDEX_FILE)):
+            return
+        try:
+            with open(self._path(INDEX_FILE), "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("model") != self.model or np.dtype(index.get("dtype")) != self.dtype:
+                logger.info(f"Embedding cache at {self.dir} has a different model/dtype; starting empty")
+                return
+            self.dim = int(index["dim"])
+            row_bytes = self.dim * self.dtype.itemsize
+            self._allocated = os.path.getsize(self._path(VECTORS_FILE)) // row_bytes
+            self._rows = OrderedDict((k, int(r)) for k, r in index["entries"] if int(r) < self._allocated)
+            self._replay_log()
+            self._matrix = np.memmap(
+                self._path(VECTORS_FILE), dtype=self.dtype, mode="r+", shape=(self._allocated, self.dim)
+            )
+            self._snapshot = True
+            logger.info(f"Embedding cache loaded: {len(self._rows)} vectors ({self.model})")
+        except Exception as e:
+            logger.error(f"Embedding cache at {self.dir} unreadable, starting empty: {e}")
+            self.dim, self._allocated, self._rows, self._matrix = None, 0, OrderedDict(), None
+
+    def _replay_log(self) -> None:
+        """Apply index.log on top of the snapshot; a row taken by a later key drops its previous owner."""
+        if not os.path.exists(self._path(INDEX_LOG_FILE)):
+            return
+        owners = {row: key for key, row in self._rows.items()}
+        with open(self._path(INDEX_LOG_FILE), "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) != 2 or not line.endswith("\n") or not parts[1].isdigit():
+                    continue        # torn last line after a crash
+                key, row = parts[0], int(parts[1])
+                if row >= self._allocated:
+                    continue
+                previous = owners.get(row)
+                if previous is not None and previous != key:
+                    self._rows.pop(previous, None)
+                old_row = self._rows.pop(key, None)
+                if old_row is not None and old_row != row:
+                    owners.pop(old_row, None)
+                self._rows[key] = row
+                owners[row] = key
+                self._log_lines += 1
+
+    def _write_snapshot(self) -> None:
+        """index.json from the in-memory index (atomic), then an empty log. Caller holds the lock."""
+        index = {
+            "model": self.model,
+            "dtype": self.dtype.name,
+            "dim": self.dim,
+            "rows": self._allocated,
+            "entries": list(self._rows.items()),
+        }
+        tmp_path = self._path(INDEX_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, separators=(",", ":"))
+        os.replace(tmp_path, self._path(INDEX_FILE))
+        with open(self._path(INDEX_LOG_FILE), "w", encoding="utf-8"):
+            pass
+        self._log_lines = 0
+        self._snapshot = True
+
+    def _append_log(self, stored: list[tuple[str, int]]) -> None:
+        """Persist a put: the vectors (page cache) and one log line each. Caller holds the lock."""
+        if not self._snapshot or self._log_lines + len(stored) > max(COMPACT_MIN_LOG_LINES, 2 * len(self._rows)):
+            self._matrix.flush()
+            self._write_snapshot()
+            return
+        with open(self._path(INDEX_LOG_FILE), "a", encoding="utf-8") as f:
+            f.write("".join(f"{key} {row}\n" for key, row in stored))
+        self._log_lines += len(stored)
+
+    def flush(self) -> None:
+        """Write the matrix and fold the log into index.json, if anything was logged (e.g. at shutdown)."""
+        with self._lock:
+            if self._matrix is None or not self._log_lines:
+                return
+            self._matrix.flush()
+            self._write_snapshot()
+
+    # ---------- storage ----------
+
+    @property
+    def max_rows(self) -> int:
+        return max(1, self.max_bytes // (self.dim * self.dtype.itemsize)) if self.dim else 0
+
+    def _grow(self, rows: int) -> None:
+        os.makedirs(self.dir, exist_ok=True)
+        path = self._path(VECTORS_FILE)
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+        with open(path, "ab") as f:
+            f.truncate(rows * self.dim * self.dtype.itemsize)
+        self._matrix = np.memmap(path, dtype=self.dtype, mode="r+", shape=(rows, self.dim))
+        self._allocated = rows
+
+    def _free_row(self) -> int:
+        """A row for a new vector: unused capacity first, then grow, then evict the LRU entry."""
+        # rows are handed out in order and only ever reused through eviction,
+        # so while below capacity rows 0..used-1 are exactly the taken ones
+        used = len(self._rows)
+        if used < self._allocated:
+            return used
+        if self._allocated < self.max_rows:
+            self._grow(min(self.max_rows, max(MIN_ROWS, self._allocated * 2)))
+            return used
+        _, row = self._rows.popitem(last=False)
+        return row
+
+    # ---------- api ----------
+
+    def get_many(self, texts: Sequence[str]) -> list[Optional[np.ndarray]]:
+        """Cached vectors (float32) for each text, None for misses."""
+        out: list[Optional[np.ndarray]] = []
+        with self._lock:
+            for text in texts:
+                key = cache_key(self.model, text)
+                row = self._rows.get(key)
+                if row is None or self._matrix is None:
+                    out.append(None)
+                    continue
+                # LRU order is only persisted with the next snapshot
+                self._rows.move_to_end(key)
+                out.append(np.asarray(self._matrix[row], dtype=np.float32))
+        return out
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """Store vectors for texts and persist them (O(batch) unless the log is due for compaction)."""
+        with self._lock:
+            stored: list[tuple[str, int]] = []
+            for text, vector in zip(texts, vectors):
+                vec = np.asarray(vector, dtype=np.float32)
+                if self.dim is None:
+                    self.dim = int(vec.shape[0])
+                if vec.shape[0] != self.dim:
+                    logger.error(f"Embedding dim {vec.shape[0]} != cache dim {self.dim}; not cached")
+                    continue
+                key = cache_key(self.model, text)
+                row = self._rows.pop(key, None)
+                if row is None:
+                    row = self._free_row()
+                self._matrix[row] = vec
+                self._rows[key] = row
+                stored.append((key, row))
+            if stored:
+                self._append_log(stored)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+# One cache per model, shared process-wide
+_caches: dict[str, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model: str) -> EmbeddingCache:
+    with _caches_lock:
+        cache = _caches.get(model)
+        if cache is None:
+            cache = EmbeddingCache(
+                EMBEDDING_CACHE_DIR, model, EMBEDDING_CACHE_MAX_MB * 1024 * 1024, EMBEDDING_CACHE_DTYPE
+            )
+            _caches[model] = cache
+        return cache
+
+
+@atexit.register
+def flush_embedding_caches() -> None:
+    """Fold every cache's log into its snapshot (called on application shutdown and at exit)."""
+    for cache in list(_caches.values()):
+        try:
+            cache.flush()
+        except Exception:
+            pass
@@ -1,11 +1,14 @@
-from typing import List
-from openai import OpenAI, APIError, AuthenticationError, RateLimitError
+from typing import List, Optional
+from openai import APIError, AuthenticationError, RateLimitError
 from app.config import settings
-import os 
-from dotenv import load_dotenv
-from app.config.logger import get_logger
+from app.config.logger import describe_error, get_logger
+from app.clients.embedding_cache import get_embedding_cache, cache_key
+from app.clients.openai_registry import get_openai_client
+from app.core.llm.scheduler import get_llm_scheduler, PRIORITY_BACKGROUND
+from app.core.llm.tokens import estimate_tokens
+from app.core.replay.cassette import current_cassette
 
-load_dotenv()
+logger = get_logger(__name__)
 
 DEFAULT_EMBEDDING_MODEL = "text-embedding-ada-002"
 
@@ -14,28 +17,19 @@ class EmbeddingError(Exception):
     pass
 
 
-def generate_embeddings(texts: List[str], model: str = None) -> List[List[float]]:
-    if not texts:
-        return []
+def _embed_remote(texts: List[str], model: str, priority: int = PRIORITY_BACKGROUND) -> List[List[float]]:
+    client = get_openai_client("embeddings")
 
-    api_key_env = "OPENAI_API_KEY"
-    api_key = os.environ.get(api_key_env)
-    if not api_key:
-            logger.error(f"Missing {api_key_env} environment variable")
-            raise ValueError(f"Missing {api_key_env} environment variable")
-    
-    model = model or DEFAULT_EMBEDDING_MODEL
-    
+    request = {"model": model, "input": texts}
     try:
-        client = OpenAI(api_key=api_key)
-        non_empty_texts = [text for text in texts if text and text.strip()]
-        
-        if not non_empty_texts:
-            return []
-        
-        response = client.embeddings.create(model=model, input=non_empty_texts)
+        response = get_llm_scheduler("embeddings").run_sync(
+            lambda: client.embeddings.create(**request),
+            tokens=sum(estimate_tokens(t) for t in texts),
+            priority=priority,
+            request=request,
+        )
         return [embedding.embedding for embedding in response.data]
-    
+
     except AuthenticationError as e:
         raise EmbeddingError(f"OpenAI authentication failed: {str(e)}")
     except RateLimitError as e:
@@ -43,12 +37,60 @@ def generate_embeddings(texts: List[str], model: str = None) -> List[List[float]
     except APIError as e:
         raise EmbeddingError(f"OpenAI API error: {str(e)}")
     except Exception as e:
-        raise EmbeddingError(f"Error generating embeddings: {str(e)}")
+        raise EmbeddingError(f"Error generating embeddings: {describe_error(e)}")
+
+
+def generate_embeddings(
+    texts: List[str], model: str = None, use_cache: bool = True, priority: int = PRIORITY_BACKGROUND
+) -> List[List[float]]:
+    """
+    Embed the non-empty texts (empty ones are dropped, as before).
+    With the cache on, only cache misses are sent to the API, each distinct text once.
+    The cache is bypassed while a cassette is current, so every request is recorded / replayed.
+    """
+    if not texts:
+        return []
+
+    model = model or DEFAULT_EMBEDDING_MODEL
+    non_empty_texts = [text for text in texts if text and text.strip()]
+    if not non_empty_texts:
+        return []
+
+    cache = None
+    if use_cache and settings.EMBEDDING_CACHE_ENABLED and current_cassette() is None:
+        try:
+            cache = get_embedding_cache(model)
+        except Exception as e:
+            logger.error(f"Embedding cache unavailable: {e}")
+
+    if cache is None:
+        return _embed_remote(non_empty_texts, model, priority)
+
+    found: List[Optional[List[float]]] = [
+        None if v is None else v.tolist() for v in cache.get_many(non_empty_texts)
+    ]
+    misses: dict[str, str] = {}     # cache key -> first text with that key
+    for text, vector in zip(non_empty_texts, found):
+        if vector is None:
+            misses.setdefault(cache_key(model, text), text)
+
+    if misses:
+        miss_texts = list(misses.values())
+        vectors = _embed_remote(miss_texts, model, priority)
+        try:
+            cache.put_many(miss_texts, vectors)
+        except Exception as e:
+            logger.error(f"Failed to store embeddings in cache: {e}")
+        by_key = {key: vector for key, vector in zip(misses, vectors)}
+        found = [v if v is not None else by_key[cache_key(model, t)] for t, v in zip(non_empty_texts, found)]
+
+    logger.info(f"Embeddings: {len(non_empty_texts) - len(misses)} cached, {len(misses)} fetched")
+    return found
 
 
 def generate_embedding(text: str, model: str = None) -> List[float]:
     if not text or not text.strip():
         raise EmbeddingError("Cannot generate embedding for empty text")
-    
+
     embeddings = generate_embeddings([text], model)
     return embeddings[0] if embeddings else []
@@ -7,9 +7,22 @@ from typing import Any, Optional
 import requests
 
 from app.config.logger import get_logger
+from app.config.settings import LOGS_LIMIT, LOGS_MAX_PAGES, LOGS_FALLBACK_MAX_LIMIT
+from app.core.replay.cassette import current_cassette, logs_key
 
 logger = get_logger(__name__)
 
+# Per logs_api_url: True/False once we know whether the server honours `since_id`.
+_cursor_support: dict[str, bool] = {}
+
+
+def _log_id(log: dict[str, Any]) -> Optional[int]:
+    try:
+        value = log.get("id")
+        return None if value is None else int(str(value))
+    except Exception:
+        return None
+
 
 @dataclass
 class LogsApiResponse:
@@ -22,7 +35,7 @@ class LogsApiResponse:
 class LogsApiClient:
     """
     Thin client for the real_estate logs endpoint: GET /logs/api
-    Query params: user_id, session_id, limit, (optional) log_type
+    Query params: user_id, session_id, limit, (optional) log_type, (optional) since_id
     """
 
     def __init__(self, logs_api_url: str, timeout_sec: int = 30, retry_count: int = 1):
@@ -37,38 +50,129 @@ class LogsApiClient:
         session_id: str,
         limit: int = 200,
         log_type: Optional[str] = None,
+        since_id: Optional[int] = None,
     ) -> LogsApiResponse:
 
         params: dict[str, Any] = {"user_id": user_id, "session_id": session_id, "limit": limit}
+        if since_id is not None:
+            params["since_id"] = since_id
         #if log_type:
         #    params["log_type"] = log_type
 
+        cassette = current_cassette()
+        if cassette is not None and cassette.replaying:
+            entry = cassette.take("logs", logs_key(params))
+            if entry is None:
+                return LogsApiResponse(False, [], error="No recorded logs for this request")
+            return self._parse(entry["data"])
+
         last_error: Optional[Exception] = None
         for attempt in range(self.retry_count):
             try:
                 resp = requests.get(self.logs_api_url, params=params, timeout=self.timeout_sec)
                 resp.raise_for_status()
                 data = resp.json()
-
-                if not isinstance(data, dict):
-                    logger.error("Invalid JSON shape (not dict).")
-                    return LogsApiResponse(False, [], error="Invalid JSON shape (not dict).")
-
-                success = bool(data.get("success"))
-                logs = data.get("logs") or []
-                if not isinstance(logs, list):
-                    logs = []
-
-                logger.info(f"Fetched {len(logs)} logs successfully")
-                return LogsApiResponse(
-                    success=success,
-                    logs=logs,
-                    count=int(data.get("count") or len(logs)),
-                    error=data.get("error"),
-                )
+                if cassette is not None and cassette.recording:
+                    cassette.record("logs", {"params": params, "data": data}, key=logs_key(params))
+                return self._parse(data)
             except Exception as e:
                 last_error = e
                 logger.error(f"Attempt {attempt + 1} failed: {e}")
 
         logger.error("fetch_logs failed after retries")
         return LogsApiResponse(False, [], error=str(last_error) if last_error else "Unknown error")
+
+    @staticmethod
+    def _parse(data: Any) -> LogsApiResponse:
+        if not isinstance(data, dict):
+            logger.error("Invalid JSON shape (not dict).")
+            return LogsApiResponse(False, [], error="Invalid JSON shape (not dict).")
+
+        success = bool(data.get("success"))
+        logs = data.get("logs") or []
+        if not isinstance(logs, list):
+            logs = []
+
+        logger.info(f"Fetched {len(logs)} logs successfully")
+        return LogsApiResponse(
+            success=success,
+            logs=logs,
+            count=int(data.get("count") or len(logs)),
+            error=data.get("error"),
+        )
+
+    def fetch_logs_since(
+        self,
+        user_id: str,
+        session_id: str,
+        since_id: Optional[int] = None,
+        page_size: int = LOGS_LIMIT,
+    ) -> LogsApiResponse:
+        """
+        Return every log with id > since_id (all logs if None), ascending by id.
+
+        Pages with the `since_id` cursor until a short page. If the server ignores the
+        cursor (it returns ids <= since_id), falls back to re-fetching the newest logs
+        with a growing limit until the window reaches back past since_id.
+        """
+        cursor = since_id if since_id is not None else 0
+        if _cursor_support.get(self.logs_api_url) is not False:
+            resp = self._fetch_with_cursor(user_id, session_id, cursor, page_size)
+            if resp is not None:
+                return resp
+        return self._fetch_with_growing_limit(user_id, session_id, cursor, page_size)
+
+    def _fetch_with_cursor(
+        self, user_id: str, session_id: str, since_id: int, page_size: int
+    ) -> Optional[LogsApiResponse]:
+        """Cursor pagination; None if the server turned out not to support `since_id`."""
+        collected: dict[int, dict[str, Any]] = {}
+        cursor = since_id
+        for _ in range(LOGS_MAX_PAGES):
+            resp = self.fetch_logs(user_id=user_id, session_id=session_id, limit=page_size, since_id=cursor)
+            if not resp.success:
+                return resp
+
+            ids = [_log_id(l) for l in resp.logs]
+            if any(i is not None and i <= cursor for i in ids):
+                logger.info("Logs API ignores since_id; using limit fallback")
+                _cursor_support[self.logs_api_url] = False
+                return None
+            if ids and all(i is not None for i in ids):
+                _cursor_support[self.logs_api_url] = True
+
+            for l, i in zip(resp.logs, ids):
+                if i is not None:
+                    collected[i] = l
+            if len(resp.logs) < page_size or not collected:
+                break
+            cursor = max(collected)
+        else:
+            logger.error(f"fetch_logs_since stopped after {LOGS_MAX_PAGES} pages; more logs may exist")
+
+        logs = [collected[i] for i in sorted(collected)]
+        return LogsApiResponse(success=True, logs=logs, count=len(logs))
+
+    def _fetch_with_growing_limit(
+        self, user_id: str, session_id: str, since_id: int, page_size: int
+    ) -> LogsApiResponse:
+        """Fallback for servers without cursor support: widen the newest-N window until it covers since_id."""
+        limit = page_size
+        while True:
+            resp = self.fetch_logs(user_id=user_id, session_id=session_id, limit=limit)
+            if not resp.success:
+                return resp
+
+            ids = [_log_id(l) for l in resp.logs]
+            complete = len(resp.logs) < limit or any(i is not None and i <= since_id for i in ids)
+            if complete or limit >= LOGS_FALLBACK_MAX_LIMIT:
+                if not complete:
+                    logger.error(f"More than {limit} new logs since id {since_id}; older ones were not fetched")
+                new = sorted(
+                    ((i, l) for i, l in zip(ids, resp.logs) if i is not None and i > since_id),
+                    key=lambda pair: pair[0],
+                )
+                logs = [l for _, l in new]
+                return LogsApiResponse(success=True, logs=logs, count=len(logs))
+
+            limit = min(limit * 2, LOGS_FALLBACK_MAX_LIMIT)
@@ -0,0 +1,120 @@
+"""Process-wide OpenAI clients with shared keep-alive pools, one per endpoint."""
+
+import asyncio
+import os
+import threading
+from typing import Optional
+
+from dotenv import load_dotenv
+from openai import (
+    DEFAULT_CONNECTION_LIMITS,
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+    DefaultHttpxClient,
+    OpenAI,
+    Timeout,
+)
+
+from app.config.logger import get_logger
+from app.config.settings import OPENAI_API_KEY_ENV, OPENAI_CONNECT_TIMEOUT_SEC, OPENAI_ENDPOINTS
+from app.core.replay.cassette import replaying
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+
+# (endpoint, api_key_env) -> client
+_sync_clients: dict[tuple[str, str], OpenAI] = {}
+_async_clients: dict[tuple[str, str], AsyncOpenAI] = {}
+_async_loop: Optional[asyncio.AbstractEventLoop] = None
+_lock = threading.Lock()
+
+
+def _api_key(api_key_env: str) -> str:
+    api_key = os.environ.get(api_key_env)
+    if not api_key and replaying():
+        return "cassette-replay"    # requests are answered from the cassette
+    if not api_key:
+        logger.error(f"Missing {api_key_env} environment variable")
+        raise ValueError(f"Missing {api_key_env} environment variable")
+    return api_key
+
+
+def _pool_options(endpoint: str) -> dict:
+    """
+    Pool limits and timeout for an endpoint ("chat", "embeddings"), from OPENAI_ENDPOINTS.
+    Built from the SDK's own types (its Limits class, `openai.Timeout`), which are not
+    necessarily those of the httpx installed alongside it.
+    """
+    options = OPENAI_ENDPOINTS.get(endpoint) or OPENAI_ENDPOINTS["chat"]
+    limits = type(DEFAULT_CONNECTION_LIMITS)(
+        max_connections=options["max_connections"],
+        max_keepalive_connections=options["max_keepalive"],
+    )
+    return {
+        "limits": limits,
+        "timeout": Timeout(options["timeout_sec"], connect=OPENAI_CONNECT_TIMEOUT_SEC),
+    }
+
+
+def get_openai_client(endpoint: str = "chat", api_key_env: str = OPENAI_API_KEY_ENV) -> OpenAI:
+    """Shared sync client for `endpoint`, created on first use; safe to use from any thread."""
+    key = (endpoint, api_key_env)
+    with _lock:
+        client = _sync_clients.get(key)
+        if client is None:
+            options = _pool_options(endpoint)
+            client = OpenAI(
+                api_key=_api_key(api_key_env),
+                http_client=DefaultHttpxClient(limits=options["limits"]),
+                timeout=options["timeout"],
+                max_retries=0,      # retries go through the LLM scheduler
+            )
+            _sync_clients[key] = client
+            logger.info(f"OpenAI client created ({endpoint})")
+        return client
+
+
+def get_async_openai_client(endpoint: str = "chat", api_key_env: str = OPENAI_API_KEY_ENV) -> AsyncOpenAI:
+    """Shared async client for `endpoint`, created on first use in this event loop."""
+    global _async_loop
+
+    loop = asyncio.get_running_loop()
+    key = (endpoint, api_key_env)
+    with _lock:
+        if _async_loop is not loop:
+            # pools are bound to the loop that opened them
+            _async_clients.clear()
+            _async_loop = loop
+        client = _async_clients.get(key)
+        if client is None:
+            options = _pool_options(endpoint)
+            client = AsyncOpenAI(
+                api_key=_api_key(api_key_env),
+                http_client=DefaultAsyncHttpxClient(limits=options["limits"]),
+                timeout=options["timeout"],
+                max_retries=0,
+            )
+            _async_clients[key] = client
+            logger.info(f"Async OpenAI client created ({endpoint})")
+        return client
+
+
+async def aclose_openai_clients() -> None:
+    """Close every shared client (called on application shutdown)."""
+    global _async_loop
+
+    with _lock:
+        sync_clients = list(_sync_clients.values())
+        async_clients = list(_async_clients.values())
+        _sync_clients.clear()
+        _async_clients.clear()
+        _async_loop = None
+
+    for client in sync_clients:
+        client.close()
+    for client in async_clients:
+        await client.close()
+    if sync_clients or async_clients:
+        logger.info(f"OpenAI clients closed ({len(sync_clients)} sync, {len(async_clients)} async)")
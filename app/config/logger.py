@@ -35,3 +35,12 @@ def get_logger(name: str) -> logging.Logger:
         logger.setLevel(logging.INFO)  # Set level to INFO to show info and error
         
     return logger
+
+
+def describe_error(e: BaseException) -> str:
+    """
+    Exception type and message, e.g. "APIConnectionError: Connection error."
+    (just the type when the message is empty), for error fields in reports and jobs.
+    """
+    message = str(e).strip()
+    return f"{type(e).__name__}: {message}" if message else type(e).__name__
@@ -10,16 +10,125 @@ LOGS_API_URL: str = "........."
 
 
 
-from uuid import uuid4
-USER_ID = str(uuid4())
-
 OPENAI_MODEL: str = "gpt-4o"
+OPENAI_API_KEY_ENV: str = "OPENAI_API_KEY"
 TIMEOUT_SEC: int = 50
 RETRY_COUNT: int = 2
+RETRY_BACKOFF_BASE_SEC: float = 0.5
+RETRY_BACKOFF_MAX_SEC: float = 8.0
 MAX_TURNS: int = 2
 MAX_TOTAL_SECONDS: int = 2000
 INITIAL_USER_MESSAGE: str = "hello i need to buy a new property for stability"
 INITIAL_REAL_Estate_MESSAGE: str = "what’s happening in your life right now that’s making you consider buying"
 
 
-LOGS_LIMIT: int = 50
+LOGS_LIMIT: int = 50                    # page size for incremental log fetching
+LOGS_MAX_PAGES: int = 20                # cursor pages per fetch before giving up
+LOGS_FALLBACK_MAX_LIMIT: int = 1000     # widest window when the server has no since_id cursor
+
+# wait for a turn's logs to be complete instead of reading once when the SSE stream ends
+LOGS_REQUIRED_TYPES: tuple = ("intent_classifier", "main_model")
+LOGS_EXPECTED_TYPES: tuple = ()         # e.g. ("memory_extraction",) to also wait for async stages
+LOGS_WAIT_DEADLINE_SEC: float = 10.0
+LOGS_POLL_INITIAL_SEC: float = 0.25
+LOGS_POLL_MAX_SEC: float = 2.0
+
+# decide turns with the deterministic log rules; the GPT-4o checker only sees turns they can't decide
+LOG_RULES_ENABLED: bool = True
+
+# persistent cache of GPT-4o log verdicts (keyed by model, prompt version and normalized inputs)
+VERDICT_CACHE_ENABLED: bool = True
+VERDICT_CACHE_PATH: str = ".cache/verdicts.sqlite3"
+VERDICT_CACHE_TTL_SEC: float = 30 * 24 * 3600
+VERDICT_CACHE_MAX_ENTRIES: int = 50_000
+
+
+# shared keep-alive pool for the agent SSE endpoint
+HTTP2_ENABLED: bool = True
+HTTP_POOL_MAX_CONNECTIONS: int = 100
+HTTP_POOL_MAX_KEEPALIVE: int = 20
+HTTP_KEEPALIVE_EXPIRY_SEC: float = 30.0
+
+# shared OpenAI clients (one keep-alive pool per endpoint, reused by driver, analyser and embeddings)
+# rpm/tpm: account rate limits the LLM scheduler keeps each endpoint under
+OPENAI_CONNECT_TIMEOUT_SEC: float = 5.0
+OPENAI_ENDPOINTS: dict = {
+    "chat":       {"timeout_sec": 60.0, "max_connections": 50, "max_keepalive": 20, "rpm": 500, "tpm": 30_000},
+    "embeddings": {"timeout_sec": 30.0, "max_connections": 20, "max_keepalive": 10, "rpm": 3_000, "tpm": 1_000_000},
+}
+LLM_MAX_RETRIES: int = 5               # per call, for 429 / 5xx / connection errors
+
+# driver history: recent turns verbatim up to the budget, older ones as a rolling summary
+DRIVER_CONTEXT_BUDGET_TOKENS: int = 1200
+DRIVER_SUMMARY_MAX_TOKENS: int = 300
+
+
+# concurrent multi-session runs
+MAX_CONCURRENT_SESSIONS: int = 10
+WORKER_THREADS: int = 64
+
+
+# open-loop load generation against the agent (/load): Poisson session arrivals, cheap replies
+LOAD_REPLY_SOURCES: tuple = ("scripted", "cached", "llm")
+LOAD_REPLY_SOURCE: str = "scripted"
+LOAD_ARRIVAL_RATE: float = 1.0              # new sessions per second
+LOAD_DURATION_SEC: float = 60
+LOAD_THINK_TIME_SEC: float = 2.0            # mean pause between turns (exponential); 0 = none
+LOAD_MAX_TURNS: int = 5
+LOAD_MAX_IN_FLIGHT: int = 500               # sessions; arrivals beyond this are dropped (and counted)
+LOAD_DRAIN_TIMEOUT_SEC: float = 60          # after the arrival window, then unfinished sessions are cancelled
+REPLY_CACHE_MAX_ENTRIES: int = 5000
+
+# capacity search (/load/capacity): AIMD on concurrent load sessions against a p95 latency SLO
+CAPACITY_SLO_METRICS: tuple = ("ttfb", "first_delta", "total")
+CAPACITY_SLO_METRIC: str = "total"
+CAPACITY_SLO_P95_SEC: float = 10.0
+CAPACITY_START_CONCURRENCY: int = 1
+CAPACITY_ADDITIVE_STEP: int = 2             # sessions added after a step within the SLO
+CAPACITY_DECREASE_FACTOR: float = 0.5       # concurrency multiplier after a violating step
+CAPACITY_MAX_CONCURRENCY: int = 500
+CAPACITY_STEP_SEC: float = 30
+CAPACITY_MIN_STEP_SAMPLES: int = 20         # a step is extended (up to 3x) until it has this many
+CAPACITY_MAX_STEPS: int = 30
+CAPACITY_MAX_DECREASES: int = 3             # stop once AIMD has backed off this many times
+CAPACITY_THINK_TIME_SEC: float = 0.0
+
+
+# background jobs
+MAX_CONCURRENT_JOBS: int = 4
+JOBS_RETENTION: int = 200
+
+
+# per-turn log analysis: "sequential", "pipelined" (overlaps analysis with the next turn)
+# or "batched" (several turns checked in one request)
+ANALYSIS_MODES: tuple = ("sequential", "pipelined", "batched")
+ANALYSIS_MODE: str = "pipelined"
+ANALYSIS_BATCH_MAX_TURNS: int = 8           # turns per batched request
+ANALYSIS_BATCH_MAX_TOKENS: int = 6000       # estimated turn-input tokens per batched request
+
+
+# persistent embedding cache (memory-mapped vectors + LRU index, one directory per model)
+EMBEDDING_CACHE_ENABLED: bool = True
+EMBEDDING_CACHE_DIR: str = ".cache/embeddings"
+EMBEDDING_CACHE_MAX_MB: int = 256
+EMBEDDING_CACHE_DTYPE: str = "float32"     # or "float16" to halve disk/RAM
+
+# persistent run store (SQLite): every RunReport with its turns, written in background batches
+RUN_STORE_ENABLED: bool = True
+RUN_STORE_PATH: str = ".cache/runs.sqlite3"
+RUN_STORE_RETENTION_DAYS: float = 90
+RUN_STORE_MAX_RUNS: int = 100_000
+RUN_STORE_BATCH_SIZE: int = 50
+RUN_STORE_FLUSH_SEC: float = 1.0
+RUN_STORE_COMPACT_EVERY_SEC: float = 3600
+
+# cross-run index of agent questions (int8-quantized embeddings + run/session/turn metadata)
+QUESTION_CORPUS_ENABLED: bool = True
+QUESTION_CORPUS_DIR: str = ".cache/questions"
+
+# latency metrics: recent samples kept per series for the p50/p95/p99 on /metrics
+METRICS_WINDOW: int = 10_000
+
+# record/replay cassettes: one gzip JSONL per /report session (agent SSE lines, logs API payloads, OpenAI calls)
+CASSETTE_RECORD: bool = False
+CASSETTE_DIR: str = ".cache/cassettes"
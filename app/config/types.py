@@ -5,6 +5,32 @@ from datetime import datetime
 from typing import Literal, Optional , Any
 
 
+@dataclass
+class TurnTiming:
+    """Seconds spent in each phase of one turn (None if the phase did not run)."""
+    sse_connect_sec: Optional[float] = None      # request sent -> response headers
+    first_event_sec: Optional[float] = None      # request sent -> first SSE event
+    stream_sec: Optional[float] = None           # response headers -> end of stream
+    logs_sec: Optional[float] = None             # log fetch, including waiting for completeness
+    analysis_sec: Optional[float] = None
+    driver_sec: Optional[float] = None
+
+
+@dataclass
+class StreamStats:
+    """Arrival timing of one SSE response (seconds since the request was sent, unless noted)."""
+    ttfb_sec: Optional[float] = None             # first line of the body
+    first_delta_sec: Optional[float] = None      # first content delta
+    total_sec: Optional[float] = None            # end of stream
+    deltas: int = 0
+    chars: int = 0
+    gap_p50_sec: Optional[float] = None          # gaps between consecutive deltas
+    gap_p95_sec: Optional[float] = None
+    gap_p99_sec: Optional[float] = None
+    max_stall_sec: Optional[float] = None        # largest gap between deltas
+    chars_per_sec: Optional[float] = None        # chars / (last delta - first delta)
+
+
 @dataclass
 class Turn:
     role: Literal["user", "assistant"]
@@ -14,6 +40,10 @@ class Turn:
     ts: datetime
     logs_report: Optional[str] = None
     my_log: dict[str, Any]= None
+    logs_complete: Optional[bool] = None
+    logs_wait_sec: Optional[float] = None
+    timing: Optional[TurnTiming] = None
+    stream: Optional[StreamStats] = None
 
 
 @dataclass
@@ -21,6 +51,11 @@ class ChatResult:
     assistant_text: str
     session_id: Optional[str]
     raw_events_count: int
+    connect_sec: Optional[float] = None
+    first_event_sec: Optional[float] = None
+    stream_sec: Optional[float] = None
+    delta_offsets: Optional[list[float]] = None    # arrival of each content delta, since the request was sent
+    stream: Optional[StreamStats] = None
 
 
 @dataclass
@@ -33,4 +68,97 @@ class RunReport:
     started_at: datetime
     ended_at: datetime
     error: Optional[str]
-    duplicate: Optional[str] = None
\ No newline at end of file
+    duplicate: Optional[str] = None
+    run_id: Optional[str] = None
+    latency: Optional[dict[str, dict[str, float]]] = None     # phase -> count/mean/p50/p95/p99/max
+
+@dataclass
+class SessionSpec:
+    persona: Optional[dict[str, Any]] = None
+    user_id: Optional[str] = None
+    initial_user_message: Optional[str] = None
+    initial_real_estate_message: Optional[str] = None
+
+
+@dataclass
+class RunStats:
+    sessions: int
+    succeeded: int
+    failed: int
+    with_summary: int
+    total_turns: int
+    mean_turns: float
+    mean_duration_sec: float
+    max_duration_sec: float
+    wall_time_sec: float
+    errors: dict[str, int]
+    latency: Optional[dict[str, dict[str, float]]] = None
+
+
+@dataclass
+class EngineReport:
+    reports: list["RunReport"]
+    stats: RunStats
+    started_at: datetime
+    ended_at: datetime
+
+
+@dataclass
+class JobInfo:
+    job_id: str
+    kind: str
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"]
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    ended_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class LoadReport:
+    started_at: datetime
+    ended_at: datetime
+    target_rate: float                  # offered session arrivals per second
+    duration_sec: float                 # arrival window
+    wall_time_sec: float                # including the drain
+    sessions_started: int
+    sessions_completed: int
+    sessions_failed: int
+    sessions_dropped: int               # arrivals refused at max_in_flight
+    sessions_unfinished: int            # cancelled at the drain deadline
+    requests: int                       # agent messages sent
+    errors: int
+    error_rate: float
+    achieved_rps: float                 # agent messages answered per second of wall time
+    errors_by_type: dict[str, int]
+    latency: dict[str, dict[str, float]]            # ttfb / first_delta / total -> percentiles
+    by_turn: dict[int, dict[str, Any]]              # turn index -> requests, errors, error_rate, latency
+    reply_source: Optional[str] = None
+
+
+@dataclass
+class CapacityPoint:
+    step: int
+    concurrency: int
+    duration_sec: float
+    requests: int
+    errors: int
+    throughput_rps: float               # successful agent messages per second
+    p50_sec: Optional[float]
+    p95_sec: Optional[float]
+    p99_sec: Optional[float]
+    within_slo: bool
+    action: Literal["increase", "decrease", "hold"]
+
+
+@dataclass
+class CapacityReport:
+    started_at: datetime
+    ended_at: datetime
+    slo_metric: str
+    slo_p95_sec: float
+    curve: list["CapacityPoint"]                    # one point per step, in order
+    max_sustainable: Optional["CapacityPoint"]      # highest throughput within the SLO and error-free
+    knee: Optional["CapacityPoint"]                 # highest throughput / p95 latency (power)
+    stop_reason: str
+    reply_source: Optional[str] = None
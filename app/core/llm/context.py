@@ -0,0 +1,82 @@
+"""Token-budgeted conversation history for the persona driver."""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import TYPE_CHECKING, Optional
+
+from app.core.llm.tokens import estimate_tokens, MESSAGE_OVERHEAD_TOKENS, CHARS_PER_TOKEN
+from app.core.persona.tracker import extract_last_question
+from app.config.settings import DRIVER_CONTEXT_BUDGET_TOKENS, DRIVER_SUMMARY_MAX_TOKENS
+
+if TYPE_CHECKING:
+    from app.config.types import Turn
+
+# longest excerpt of one message kept in the summary
+SUMMARY_EXCERPT_CHARS = 160
+
+
+def _excerpt(text: str, limit: int = SUMMARY_EXCERPT_CHARS) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= limit else text[: limit - 3].rstrip() + "..."
+
+
+class ConversationContext:
+    """
+    Chooses the history sent with each driver request. The most recent turns are kept
+    verbatim while they fit in `budget_tokens`; turns that fall out of that window are
+    folded, once each, into a rolling extractive summary (the agent's question and the
+    buyer's answer), which keeps only its newest lines within `summary_max_tokens`.
+    One instance per conversation; the window only moves forward.
+    """
+
+    def __init__(
+        self,
+        budget_tokens: int = DRIVER_CONTEXT_BUDGET_TOKENS,
+        summary_max_tokens: int = DRIVER_SUMMARY_MAX_TOKENS,
+    ):
+        if budget_tokens <= MESSAGE_OVERHEAD_TOKENS:
+            # the tail of an over-budget turn must have room for at least one token
+            raise ValueError(f"budget_tokens must be above the {MESSAGE_OVERHEAD_TOKENS}-token message overhead")
+        self.budget_tokens = budget_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self._start = 0                     # first turn still sent verbatim
+        self._lines: list[str] = []
+        self._summary_tokens = 0
+
+    @staticmethod
+    def _cost(turn: "Turn") -> int:
+        return estimate_tokens(turn.content or "") + MESSAGE_OVERHEAD_TOKENS
+
+    def _summarize(self, turn: "Turn") -> None:
+        if turn.role == "assistant":
+            line = f"Agent asked: {_excerpt(extract_last_question(turn.content) or turn.content)}"
+        else:
+            line = f"Buyer answered: {_excerpt(turn.content)}"
+        self._lines.append(line)
+        self._summary_tokens += estimate_tokens(line)
+        while self._summary_tokens > self.summary_max_tokens and len(self._lines) > 1:
+            self._summary_tokens -= estimate_tokens(self._lines.pop(0))
+
+    def window(self, turns: list["Turn"]) -> tuple[Optional[str], list["Turn"]]:
+        """(summary of older turns or None, recent turns that fit the budget)."""
+        used = 0
+        start = len(turns)
+        while start > self._start:
+            cost = self._cost(turns[start - 1])
+            if used + cost > self.budget_tokens:
+                break
+            used += cost
+            start -= 1
+        if start == len(turns) and start > self._start:
+            # the newest turn alone is over budget: send its tail rather than nothing
+            start = len(turns) - 1
+            keep = (self.budget_tokens - MESSAGE_OVERHEAD_TOKENS) * CHARS_PER_TOKEN      # > 0
+            recent = [replace(turns[-1], content=(turns[-1].content or "")[-keep:])]
+        else:
+            recent = list(turns[start:])
+
+        for turn in turns[self._start:start]:
+            self._summarize(turn)
+        self._start = max(self._start, start)
+        return ("\n".join(self._lines) if self._lines else None), recent
@@ -1,54 +1,80 @@
 """GPT-4o driver for generating buyer persona replies."""
 
 import json
-import os
-from typing import TYPE_CHECKING
-
-from dotenv import load_dotenv
-from openai import OpenAI
-
-load_dotenv()
+from typing import TYPE_CHECKING, Optional
 
+from app.clients.openai_registry import get_openai_client, get_async_openai_client
+from app.core.llm.scheduler import get_llm_scheduler, PRIORITY_CRITICAL
+from app.core.llm.tokens import estimate_messages_tokens, usage_summary
 from app.core.persona.prompts import build_driver_messages
 from app.core.logs.analyser import LogAnalyser
-from app.config.logger import get_logger
+from app.config.logger import describe_error, get_logger
 
 if TYPE_CHECKING:
     from app.config.types import Turn
 
 logger = get_logger(__name__)
 
+REPLY_MAX_TOKENS = 100
+
 
 class LLMDriver:
     """Uses OpenAI GPT-4o to generate persona replies."""
 
     def __init__(self, model: str, api_key_env: str = "OPENAI_API_KEY"):
         self.model = model
-        api_key = os.environ.get(api_key_env)
-        if not api_key:
-            logger.error(f"Missing {api_key_env} environment variable")
-            raise ValueError(f"Missing {api_key_env} environment variable")
-        self._client = OpenAI(api_key=api_key)
+        self.api_key_env = api_key_env
+        self._client = get_openai_client("chat", api_key_env)
         logger.info("LLMDriver initialized")
 
+    def _request(self, messages: list[dict]) -> dict:
+        """create() kwargs of a reply."""
+        return {"model": self.model, "messages": messages, "max_tokens": REPLY_MAX_TOKENS, "temperature": 0.4}
+
     def generate_reply(
         self,
         persona: dict,
         last_assistant: str,
         recent_turns: list["Turn"],
+        summary: Optional[str] = None,
     ) -> str:
         """Generate the next user (buyer) message given persona and conversation."""
-        messages = build_driver_messages(persona, last_assistant, recent_turns)
+        request = self._request(build_driver_messages(persona, last_assistant, recent_turns, summary))
+        try:
+            resp = get_llm_scheduler("chat").run_sync(
+                lambda: self._client.chat.completions.create(**request),
+                tokens=estimate_messages_tokens(request["messages"]) + REPLY_MAX_TOKENS,
+                priority=PRIORITY_CRITICAL,
+                request=request,
+            )
+            content = resp.choices[0].message.content
+            logger.info(f"Generated reply successfully ({usage_summary(resp)})")
+            return (content or "").strip()
+        except Exception as e:
+            logger.error(f"Error generating reply: {describe_error(e)}")
+            raise
+
+    async def agenerate_reply(
+        self,
+        persona: dict,
+        last_assistant: str,
+        recent_turns: list["Turn"],
+        summary: Optional[str] = None,
+    ) -> str:
+        """Async generate_reply, on the shared async client (no worker thread per call)."""
+        request = self._request(build_driver_messages(persona, last_assistant, recent_turns, summary))
+        client = get_async_openai_client("chat", self.api_key_env)
         try:
-            resp = self._client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                max_tokens=100,
-                temperature=0.4,
+            # critical path: admitted ahead of queued analyses and embeddings
+            resp = await get_llm_scheduler("chat").run(
+                lambda: client.chat.completions.create(**request),
+                tokens=estimate_messages_tokens(request["messages"]) + REPLY_MAX_TOKENS,
+                priority=PRIORITY_CRITICAL,
+                request=request,
             )
             content = resp.choices[0].message.content
-            logger.info("Generated reply successfully")
+            logger.info(f"Generated reply successfully ({usage_summary(resp)})")
             return (content or "").strip()
         except Exception as e:
-            logger.error(f"Error generating reply: {e}")
+            logger.error(f"Error generating reply: {describe_error(e)}")
             raise
@@ -0,0 +1,133 @@
+"""Cheap buyer reply sources for load generation: scripted from the persona, or cached LLM replies."""
+
+import json
+import re
+from collections import OrderedDict
+from itertools import count
+from typing import TYPE_CHECKING, Optional
+
+from app.core.persona.tracker import extract_last_question
+from app.config.settings import LOAD_REPLY_SOURCES, OPENAI_MODEL, REPLY_CACHE_MAX_ENTRIES
+from app.config.logger import get_logger
+
+if TYPE_CHECKING:
+    from app.config.types import Turn
+
+logger = get_logger(__name__)
+
+
+# question keyword -> persona field answering it (first match wins)
+PERSONA_ANSWERS: tuple[tuple[str, str], ...] = (
+    (r"down ?payment|save[d]?", "down_payment_available"),
+    (r"monthly|per month|mortgage payment", "monthly_payment_target"),
+    (r"budget|price|spend|afford", "purchase_budget_max"),
+    (r"income|earn|salary", "annual_income_usd"),
+    (r"bedroom", "bedrooms_min"),
+    (r"bathroom", "bathrooms_min"),
+    (r"when|timeline|timeframe|date", "target_buy_date"),
+    (r"area|where|location|town|neighbou?rhood", "area_focus"),
+    (r"state", "state_focus"),
+    (r"type of (home|property)|condo|house|townhouse", "property_type"),
+    (r"school|commute|drive|close to|near", "proximity_requirements"),
+    (r"comfortable|scale|ready", "comfort_with_process"),
+    (r"stress|worr|concern", "main_stress"),
+    (r"condition|renovat|fixer|update", "condition_preference"),
+    (r"quiet|noise", "quiet_environment_preference"),
+    (r"safe", "safety_importance"),
+    (r"outdoor|yard|patio|garden", "outdoor_space_required"),
+    (r"why|motivat|reason|life", "motivation"),
+)
+FALLBACK_REPLIES: tuple[str, ...] = (
+    "Yes, that works for me.",
+    "I'm not sure yet, what would you suggest?",
+    "That sounds good, let's continue.",
+    "Can you tell me more about that?",
+)
+
+
+class ScriptedDriver:
+    """
+    Answers the agent's last question from the persona dict by keyword, without any
+    LLM call; questions it cannot match get a rotating generic reply.
+    Drop-in for LLMDriver in load runs, where the driver must not cap the request rate.
+    """
+
+    def __init__(self):
+        self._patterns = [(re.compile(p, re.IGNORECASE), field) for p, field in PERSONA_ANSWERS]
+        self._fallback = count()
+
+    def generate_reply(
+        self,
+        persona: dict,
+        last_assistant: str,
+        recent_turns: list["Turn"],
+        summary: Optional[str] = None,
+    ) -> str:
+        question = extract_last_question(last_assistant) or last_assistant or ""
+        for pattern, field in self._patterns:
+            if field in persona and pattern.search(question):
+                return f"{persona[field]}"
+        return FALLBACK_REPLIES[next(self._fallback) % len(FALLBACK_REPLIES)]
+
+    async def agenerate_reply(
+        self,
+        persona: dict,
+        last_assistant: str,
+        recent_turns: list["Turn"],
+        summary: Optional[str] = None,
+    ) -> str:
+        return self.generate_reply(persona, last_assistant, recent_turns, summary)
+
+
+class CachedDriver:
+    """
+    Wraps a driver and reuses its reply when the same persona is asked the same question
+    (whitespace and case normalized), so repeated agent questions cost one LLM call.
+    LRU-bounded to `max_entries`; in memory only.
+    """
+
+    def __init__(self, driver, max_entries: int = REPLY_CACHE_MAX_ENTRIES):
+        self.driver = driver
+        self.max_entries = max_entries
+        self._replies: OrderedDict[tuple[str, str], str] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(persona: dict, last_assistant: str) -> tuple[str, str]:
+        question = extract_last_question(last_assistant) or last_assistant or ""
+        return json.dumps(persona, sort_keys=True, default=str), " ".join(question.lower().split())
+
+    async def agenerate_reply(
+        self,
+        persona: dict,
+        last_assistant: str,
+        recent_turns: list["Turn"],
+        summary: Optional[str] = None,
+    ) -> str:
+        key = self._key(persona, last_assistant)
+        reply = self._replies.get(key)
+        if reply is not None:
+            self.hits += 1
+            self._replies.move_to_end(key)
+            return reply
+        self.misses += 1
+        reply = await self.driver.agenerate_reply(persona, last_assistant, recent_turns, summary)
+        if reply:
+            self._replies[key] = reply
+            if len(self._replies) > self.max_entries:
+                self._replies.popitem(last=False)
+        return reply
+
+
+def reply_source(kind: str, api_key_env: str = "OPENAI_API_KEY"):
+    """Driver for a load run: "scripted" (no LLM), "cached" (LLM once per question) or "llm"."""
+    if kind not in LOAD_REPLY_SOURCES:
+        raise ValueError(f"Unknown reply source {kind!r}, expected one of {LOAD_REPLY_SOURCES}")
+    if kind == "scripted":
+        return ScriptedDriver()
+
+    from app.core.llm.driver import LLMDriver
+
+    driver = LLMDriver(OPENAI_MODEL, api_key_env=api_key_env)
+    return CachedDriver(driver) if kind == "cached" else driver
@@ -0,0 +1,286 @@
+"""Rate-limit-aware priority scheduler for OpenAI calls (RPM/TPM token buckets, Retry-After)."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from openai import APIConnectionError, APIStatusError, RateLimitError
+
+from app.config.logger import get_logger
+from app.core.replay.cassette import current_cassette, record_openai, replay_openai, replaying
+from app.config.settings import (
+    OPENAI_ENDPOINTS,
+    LLM_MAX_RETRIES,
+    RETRY_BACKOFF_BASE_SEC,
+    RETRY_BACKOFF_MAX_SEC,
+)
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# lower runs first
+PRIORITY_CRITICAL = 0       # on the conversation's critical path (driver replies, interactive queries)
+PRIORITY_BACKGROUND = 10    # deferrable (log analysis, question embeddings)
+
+# longest a waiter sleeps before re-checking the buckets
+MAX_WAIT_SLICE_SEC = 1.0
+
+
+class _Bucket:
+    """Token bucket holding up to `per_minute` units, refilled continuously."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until `amount` is available (0 if it is now)."""
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+
+class _Waiter:
+    def __init__(self, tokens: int, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.tokens = tokens
+        self.cancelled = False
+        self.granted = False
+        self.loop = loop
+        self.future: Optional[asyncio.Future] = loop.create_future() if loop else None
+        self.event: Optional[threading.Event] = None if loop else threading.Event()
+
+    def wake(self) -> None:
+        if self.future is not None:
+            self.loop.call_soon_threadsafe(lambda: self.future.done() or self.future.set_result(None))
+        else:
+            self.event.set()
+
+
+class LLMScheduler:
+    """
+    Admits OpenAI requests within the endpoint's requests-per-minute and tokens-per-minute
+    limits, highest priority first (FIFO within a priority). A request waits until both
+    buckets can pay for it; while one is waiting, nothing of lower priority overtakes it,
+    so critical-path calls never sit behind a deep analysis backlog.
+
+    A 429 pauses admission for the Retry-After the server asked for and retries the
+    request; connection errors and 5xx are retried with jittered backoff. Usable from
+    coroutines (`run`) and from worker threads (`run_sync`).
+    """
+
+    def __init__(self, name: str, rpm: int, tpm: int, max_retries: int = LLM_MAX_RETRIES):
+        self.name = name
+        self.max_retries = max_retries
+        self._requests = _Bucket(rpm)
+        self._tokens = _Bucket(tpm)
+        self._queue: list[tuple[int, int, _Waiter]] = []
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.granted = 0
+        self.rate_limited = 0
+
+    # ---------- admission ----------
+
+    def _grant_locked(self) -> float:
+        """Admit waiters from the head of the queue while the buckets allow; seconds until the next check."""
+        now = time.monotonic()
+        self._requests.refill(now)
+        self._tokens.refill(now)
+        while self._queue:
+            _, _, waiter = self._queue[0]
+            if waiter.cancelled:
+                heapq.heappop(self._queue)
+                continue
+            delay = max(
+                self._paused_until - now,
+                self._requests.wait_for(1),
+                self._tokens.wait_for(waiter.tokens),
+            )
+            if delay > 0:
+                return min(delay, MAX_WAIT_SLICE_SEC)
+            heapq.heappop(self._queue)
+            self._requests.level -= 1
+            self._tokens.level -= min(waiter.tokens, self._tokens.capacity)
+            waiter.granted = True
+            self.granted += 1
+            waiter.wake()
+        return MAX_WAIT_SLICE_SEC
+
+    def _enqueue(self, waiter: _Waiter, priority: int) -> float:
+        with self._lock:
+            heapq.heappush(self._queue, (priority, next(self._seq), waiter))
+            return self._grant_locked()
+
+    def _recheck(self) -> float:
+        with self._lock:
+            return self._grant_locked()
+
+    async def acquire(self, tokens: int, priority: int = PRIORITY_BACKGROUND) -> None:
+        waiter = _Waiter(tokens, asyncio.get_running_loop())
+        delay = self._enqueue(waiter, priority)
+        try:
+            while not waiter.granted:
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter.future), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                delay = self._recheck()
+        except BaseException:
+            waiter.cancelled = True
+            raise
+
+    def acquire_sync(self, tokens: int, priority: int = PRIORITY_BACKGROUND) -> None:
+        waiter = _Waiter(tokens)
+        delay = self._enqueue(waiter, priority)
+        while not waiter.granted:
+            waiter.event.wait(delay)
+            delay = self._recheck()
+
+    def _settle(self, estimated: int, response: Any) -> None:
+        """Correct the token bucket with the usage the API actually reported."""
+        usage = getattr(response, "usage", None)
+        actual = getattr(usage, "total_tokens", None)
+        if isinstance(actual, int):
+            with self._lock:
+                self._tokens.level = min(self._tokens.capacity, self._tokens.level + estimated - actual)
+
+    # ---------- failures ----------
+
+    def _retry_delay(self, exc: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying `exc`, or None if it must not be retried."""
+        if attempt >= self.max_retries:
+            return None
+        backoff = random.uniform(0, min(RETRY_BACKOFF_MAX_SEC, RETRY_BACKOFF_BASE_SEC * (2 ** attempt)))
+        if isinstance(exc, RateLimitError):
+            delay = _retry_after(exc)
+            delay = backoff if delay is None else delay
+            # the limit is account-wide: hold every request, not just this one
+            with self._lock:
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                self.rate_limited += 1
+            logger.info(f"{self.name}: rate limited, pausing {delay:.2f}s")
+            return delay
+        if isinstance(exc, APIConnectionError):
+            return backoff
+        if isinstance(exc, APIStatusError) and exc.status_code >= 500:
+            return backoff
+        return None
+
+    # ---------- cassettes ----------
+
+    def _replayed(self, request: Optional[dict[str, Any]]) -> Optional[Any]:
+        """The current cassette's response to `request` (None: call live, if the cassette allows it)."""
+        if request is None:
+            return None
+        return replay_openai(current_cassette(), self.name, request)
+
+    def _record(self, request: Optional[dict[str, Any]], response: Any) -> None:
+        cassette = current_cassette()
+        if request is not None and cassette is not None and cassette.recording:
+            record_openai(cassette, self.name, request, response)
+
+    # ---------- api ----------
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        tokens: int,
+        priority: int = PRIORITY_BACKGROUND,
+        request: Optional[dict[str, Any]] = None,
+    ) -> T:
+        """
+        Await `call()` once admitted, retrying 429/5xx/connection errors.
+        `request` (the create() kwargs) identifies the call in the current cassette.
+        """
+        if replaying():
+            # answered from the cassette: no rate limits to respect
+            response = self._replayed(request)
+            return response if response is not None else await call()
+        for attempt in itertools.count():
+            await self.acquire(tokens, priority)
+            try:
+                response = await call()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            self._settle(tokens, response)
+            self._record(request, response)
+            return response
+
+    def run_sync(
+        self,
+        call: Callable[[], T],
+        tokens: int,
+        priority: int = PRIORITY_BACKGROUND,
+        request: Optional[dict[str, Any]] = None,
+    ) -> T:
+        """Blocking `run` for worker threads."""
+        if replaying():
+            response = self._replayed(request)
+            return response if response is not None else call()
+        for attempt in itertools.count():
+            self.acquire_sync(tokens, priority)
+            try:
+                response = call()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            self._settle(tokens, response)
+            self._record(request, response)
+            return response
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "queued": sum(1 for _, _, w in self._queue if not w.cancelled),
+                "granted": self.granted,
+                "rate_limited": self.rate_limited,
+            }
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    """Retry-After from a 429 response (retry-after-ms or retry-after seconds), if given."""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) * scale)
+        except ValueError:
+            continue
+    return None
+
+
+# One scheduler per OpenAI endpoint ("chat", "embeddings"), shared process-wide
+_schedulers: dict[str, LLMScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_llm_scheduler(endpoint: str = "chat") -> LLMScheduler:
+    with _schedulers_lock:
+        scheduler = _schedulers.get(endpoint)
+        if scheduler is None:
+            options = OPENAI_ENDPOINTS.get(endpoint) or OPENAI_ENDPOINTS["chat"]
+            scheduler = LLMScheduler(endpoint, options["rpm"], options["tpm"])
+            _schedulers[endpoint] = scheduler
+        return scheduler
@@ -0,0 +1,30 @@
+"""Cheap token estimates for rate limiting and request chunking, and reported usage."""
+
+from typing import Any, Iterable
+
+# ~4 characters per token for English text; per-message framing overhead of the chat format
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a string."""
+    return len(text or "") // CHARS_PER_TOKEN + 1
+
+
+def estimate_messages_tokens(messages: Iterable[dict[str, Any]]) -> int:
+    """Rough prompt token count of a chat completion request."""
+    return sum(estimate_tokens(str(m.get("content") or "")) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def usage_summary(response: Any) -> str:
+    """Prompt/cached/completion token counts the API reported for one call ("" if none)."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return ""
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) or 0
+    return (
+        f"prompt_tokens={getattr(usage, 'prompt_tokens', None)} (cached={cached}), "
+        f"completion_tokens={getattr(usage, 'completion_tokens', None)}"
+    )
@@ -1,32 +1,92 @@
 """Log analyser for phase 2."""
 
 import json
-import os
-from typing import Any
+import re
+from typing import Any, Optional
 
-from dotenv import load_dotenv
-from openai import OpenAI
-
-load_dotenv()
-
-from app.core.logs.checker import build_Logs_checker_prompt
-from app.config.logger import get_logger
+from app.clients.openai_registry import get_openai_client
+from app.core.logs.checker import (
+    build_Logs_checker_prompt, build_Logs_checker_batch_prompt, PROMPT_VERSION,
+)
+from app.core.llm.scheduler import get_llm_scheduler, PRIORITY_BACKGROUND
+from app.core.llm.tokens import estimate_tokens, estimate_messages_tokens, usage_summary
+from app.core.logs.rules import evaluate
+from app.core.logs.verdict_cache import get_verdict_cache, verdict_key
+from app.core.replay.cassette import current_cassette
+from app.config.logger import describe_error, get_logger
+from app.config.settings import (
+    LOG_RULES_ENABLED, VERDICT_CACHE_ENABLED, ANALYSIS_BATCH_MAX_TURNS, ANALYSIS_BATCH_MAX_TOKENS,
+)
 
 logger = get_logger(__name__)
 
+# completion budget per verdict
+VERDICT_MAX_TOKENS = 200
+
 
 class LogAnalyser:
-    """Uses OpenAI GPT-4o to analyze logs."""
+    """Checks logs with the deterministic rules, falling back to OpenAI GPT-4o when they can't decide."""
 
-    def __init__(self, model: str = "gpt-4o", api_key_env: str = "OPENAI_API_KEY"):
+    def __init__(
+        self,
+        model: str = "gpt-4o",
+        api_key_env: str = "OPENAI_API_KEY",
+        use_rules: bool = LOG_RULES_ENABLED,
+        use_cache: bool = VERDICT_CACHE_ENABLED,
+    ):
         self.model = model
-        api_key = os.environ.get(api_key_env)
-        if not api_key:
-            logger.error(f"Missing {api_key_env} environment variable")
-            raise ValueError(f"Missing {api_key_env} environment variable")
-        self._client = OpenAI(api_key=api_key)
+        self.use_rules = use_rules
+        self.use_cache = use_cache
+        self._client = get_openai_client("chat", api_key_env)
         logger.info("LogAnalyser initialized")
 
+    def _precheck(self, last_assistant: str, user_response: str, logs: Any) -> tuple[Optional[str], Optional[str]]:
+        """Rules, then the verdict cache. Returns (verdict or None, cache key to store the LLM verdict under)."""
+        if self.use_rules:
+            verdict = evaluate(last_assistant, user_response, logs)
+            if verdict.decided:
+                logger.info(f"Log analysis decided by rules (normal_path={verdict.report['normal_path']})")
+                return json.dumps(verdict.report, ensure_ascii=False), None
+            logger.info(f"Log rules undecided, asking {self.model}: {verdict.undecided}")
+
+        # temperature 0: the same turn gets the same verdict, so reuse earlier ones
+        # (not while a cassette is current: recordings must hold every request, replays answer from them)
+        if self.use_cache and current_cassette() is None:
+            try:
+                key = verdict_key(self.model, PROMPT_VERSION, last_assistant, user_response, logs)
+                cached = get_verdict_cache().get(key)
+                if cached is not None:
+                    logger.info("Log analysis served from verdict cache")
+                return cached, key
+            except Exception as e:
+                logger.error(f"Verdict cache unavailable: {e}")
+        return None, None
+
+    def _store(self, key: Optional[str], content: str) -> None:
+        if key is None or not content:
+            return
+        try:
+            get_verdict_cache().put(key, content)
+        except Exception as e:
+            logger.error(f"Failed to store verdict in cache: {e}")
+
+    def _complete(self, messages: list[dict], max_tokens: int) -> str:
+        request = {"model": self.model, "messages": messages, "max_tokens": max_tokens, "temperature": 0.0}
+        try:
+            # deferrable: waits behind driver replies when near the rate limit
+            resp = get_llm_scheduler("chat").run_sync(
+                lambda: self._client.chat.completions.create(**request),
+                tokens=estimate_messages_tokens(messages) + max_tokens,
+                priority=PRIORITY_BACKGROUND,
+                request=request,
+            )
+            content = (resp.choices[0].message.content or "").strip()
+            logger.info(f"Log analysis completed successfully ({usage_summary(resp)})")
+            return content
+        except Exception as e:
+            logger.error(f"Error analyzing logs: {describe_error(e)}")
+            raise
+
     def analyse(
         self,
         last_assistant: str,
@@ -34,17 +94,83 @@ class LogAnalyser:
         logs: list[dict[str, Any]],
     ) -> str:
         """Analyze logs for normal path."""
-        messages = build_Logs_checker_prompt(last_assistant, user_response, logs)
-        try:
-            resp = self._client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                max_tokens=200,
-                temperature=0.0,
-            )
-            content = resp.choices[0].message.content
-            logger.info("Log analysis completed successfully")
-            return (content or "").strip()
-        except Exception as e:
-            logger.error(f"Error analyzing logs: {e}")
-            raise
+        verdict, key = self._precheck(last_assistant, user_response, logs)
+        if verdict is not None:
+            return verdict
+
+        content = self._complete(build_Logs_checker_prompt(last_assistant, user_response, logs), VERDICT_MAX_TOKENS)
+        self._store(key, content)
+        return content
+
+    def analyse_batch(
+        self,
+        turns: list[tuple[str, str, Any]],
+        max_turns: int = ANALYSIS_BATCH_MAX_TURNS,
+        max_tokens: int = ANALYSIS_BATCH_MAX_TOKENS,
+    ) -> list[str]:
+        """
+        Verdicts for several (last_assistant, user_response, logs) turns, in order.
+        Turns the rules or the cache can't answer are sent in chunks (at most `max_turns`
+        turns and ~`max_tokens` input tokens each), one request per chunk with the system
+        prompt sent once. A chunk whose answer can't be mapped back falls back to per-turn calls.
+        """
+        results: list[Optional[str]] = [None] * len(turns)
+        keys: list[Optional[str]] = [None] * len(turns)
+        pending: list[int] = []
+        for i, (last_assistant, user_response, logs) in enumerate(turns):
+            results[i], keys[i] = self._precheck(last_assistant, user_response, logs)
+            if results[i] is None:
+                pending.append(i)
+
+        chunk: list[int] = []
+        chunk_tokens = 0
+        for i in pending:
+            cost = estimate_tokens(json.dumps(turns[i], ensure_ascii=False, default=str))
+            if chunk and (len(chunk) >= max_turns or chunk_tokens + cost > max_tokens):
+                self._analyse_chunk(turns, chunk, results, keys)
+                chunk, chunk_tokens = [], 0
+            chunk.append(i)
+            chunk_tokens += cost
+        if chunk:
+            self._analyse_chunk(turns, chunk, results, keys)
+
+        return [r or "" for r in results]
+
+    def _analyse_chunk(
+        self, turns: list[tuple[str, str, Any]], chunk: list[int], results: list, keys: list
+    ) -> None:
+        if len(chunk) == 1:
+            i = chunk[0]
+            results[i] = self._complete(build_Logs_checker_prompt(*turns[i]), VERDICT_MAX_TOKENS)
+            self._store(keys[i], results[i])
+            return
+
+        messages = build_Logs_checker_batch_prompt([turns[i] for i in chunk])
+        content = self._complete(messages, VERDICT_MAX_TOKENS * len(chunk))
+        verdicts = _parse_verdict_array(content, len(chunk))
+        if verdicts is None:
+            logger.error(f"Batched log analysis returned an unusable answer for {len(chunk)} turns; checking them one by one")
+            for i in chunk:
+                results[i] = self._complete(build_Logs_checker_prompt(*turns[i]), VERDICT_MAX_TOKENS)
+                self._store(keys[i], results[i])
+            return
+
+        logger.info(f"Batched log analysis: {len(chunk)} turns in one request")
+        for i, verdict in zip(chunk, verdicts):
+            results[i] = json.dumps(verdict, ensure_ascii=False)
+            self._store(keys[i], results[i])
+
+
+def _parse_verdict_array(content: str, expected: int) -> Optional[list]:
+    """The JSON array of per-turn verdicts, or None if it isn't one of the expected length."""
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", content.strip())
+    try:
+        data = json.loads(text)
+    except Exception:
+        return None
+    if isinstance(data, dict):
+        # some answers wrap the array, e.g. {"turns": [...]}
+        data = next((v for v in data.values() if isinstance(v, list)), None)
+    if not isinstance(data, list) or len(data) != expected or not all(isinstance(v, dict) for v in data):
+        return None
+    return data
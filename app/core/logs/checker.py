@@ -1,6 +1,8 @@
 """System prompt and message builder for the log checker."""
 
+import hashlib
 import json
+import re
 from typing import Any
 from app.core.persona.persona import fields
 
@@ -153,17 +155,31 @@ Return ONLY one JSON object:
 
 """
 
+def render_static_prompt(prompt: str) -> str:
+    """
+    Fill the parts of Logs_checker_prompt that never change ({fields}) and point the per-turn
+    placeholders at the user message, where the turn data is actually sent. Rendered once, so
+    the system message is byte-identical on every call (provider-side prompt caching can hit).
+    """
+    rendered = prompt.replace("{fields}", fields.strip())
+    for placeholder in ("{user_response}", "{last_real_message}", "{act_logs}"):
+        rendered = rendered.replace(placeholder, "(given in the user message)")
+    rendered = re.sub(r"[ \t]+\n", "\n", rendered)
+    rendered = re.sub(r"\n{3,}", "\n\n", rendered)
+    return rendered.strip() + "\n"
+
+
+LOGS_CHECKER_SYSTEM: str = render_static_prompt(Logs_checker_prompt)
+
+# changes whenever the rendered prompt does; part of the verdict cache key
+PROMPT_VERSION: str = hashlib.sha256(LOGS_CHECKER_SYSTEM.encode("utf-8")).hexdigest()[:16]
+
 #fields: str = """calculator_offered,life_trigger_type,motivation_mode,pre_approval_status,readiness_state,sense_of_control,trigger_recency,decision_confidence,self_trust_level,desire_for_stability,future_pull_clarity,decision_type,primary_driver,initial_interest,ownership_identity_alignment,deadline_type,urgency_level,annual_income_usd,avoid,cost_of_living_priority,metro_preference,proximity_requirements,state_focus,bathrooms_min,bedrooms_max,bedrooms_min,down_payment_available,financing_type,flexibilities,monthly_payment_target,non_negotiables,outdoor_space_required,property_type,purchase_price_target"""
 
 
-def build_Logs_checker_prompt(
-    last_real_message: str,
-    user_response: str,
-    logs: list[dict[str, Any]],
-) -> list[dict]:
-    """Build messages for GPT-4o log checker (phase 2)."""
-    act_logs = json.dumps(logs, ensure_ascii=False, indent=2)
-    user_content = (
+def _turn_content(last_real_message: str, user_response: str, logs: list[dict[str, Any]]) -> str:
+    act_logs = json.dumps(logs, ensure_ascii=False, separators=(",", ":"))
+    return (
         "Last real agent message:\n"
         f"{last_real_message}\n\n"
         "User response:\n"
@@ -172,12 +188,42 @@ def build_Logs_checker_prompt(
         f"{act_logs}\n"
     )
 
+
+def build_Logs_checker_prompt(
+    last_real_message: str,
+    user_response: str,
+    logs: list[dict[str, Any]],
+) -> list[dict]:
+    """Build messages for GPT-4o log checker (phase 2)."""
+    user_content = _turn_content(last_real_message, user_response, logs)
+
     return [
-        {"role": "system", "content": Logs_checker_prompt},
+        {"role": "system", "content": LOGS_CHECKER_SYSTEM},
         {"role": "user", "content": user_content},
     ]
 
 
+def build_Logs_checker_batch_prompt(
+    turns: list[tuple[str, str, Any]],
+) -> list[dict]:
+    """
+    Build messages checking several turns in one request: the static system prompt is
+    sent once, followed by every (agent message, user response, logs) triple.
+    The model must answer with a JSON array holding one verdict per turn, in order.
+    """
+    parts = [
+        f"You are checking {len(turns)} turns. Apply the task above to each turn independently.\n"
+        f"Return ONLY a JSON array of exactly {len(turns)} objects, one per turn in the given order, "
+        "each in the OUTPUT FORMAT above.\n"
+    ]
+    for i, (last_real_message, user_response, logs) in enumerate(turns, start=1):
+        parts.append(f"\n=== TURN {i} ===\n" + _turn_content(last_real_message, user_response, logs))
+
+    return [
+        {"role": "system", "content": LOGS_CHECKER_SYSTEM},
+        {"role": "user", "content": "".join(parts)},
+    ]
+
 
 
 """
@@ -1,19 +1,39 @@
 # app/core/logs/reader.py
 from __future__ import annotations
 
+import asyncio
 import re
-from typing import Any, Optional
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional
 import json
 from app.clients.logs_client import LogsApiClient
 from app.config.logger import get_logger
+from app.core.replay.cassette import current_cassette
+from app.config.settings import (
+    LOGS_REQUIRED_TYPES,
+    LOGS_WAIT_DEADLINE_SEC,
+    LOGS_POLL_INITIAL_SEC,
+    LOGS_POLL_MAX_SEC,
+)
 
 logger = get_logger(__name__)
 
 
+@dataclass
+class LogsPollResult:
+    logs: Any                       # prepare_logs() output, or [] if nothing arrived
+    complete: bool                  # every required/expected log type arrived before the deadline
+    missing: list[str] = field(default_factory=list)
+    waited_sec: float = 0.0
+    attempts: int = 0
+
+
 class LogsReader:
     """
     Keeps a per-(user_id, session_id) cursor of the last max log id seen.
-    get_logs() returns ONLY new records since last call, but only:
+    get_logs() fetches ONLY records newer than the cursor (paginated, nothing dropped
+    on busy turns) and returns, from those, only:
       - log_type
       - error_message (if present)
     """
@@ -51,52 +71,113 @@ class LogsReader:
             }
 
         """
-        key = (user_id, session_id)
-
-        resp = self._client.fetch_logs(user_id=user_id, session_id=session_id, limit=limit)
-        if not resp.success or not resp.logs:
+        new_logs = self.fetch_new_logs(user_id, session_id, limit, prime_if_first_time)
+        if not new_logs:
             return []
 
-        # Collect ids present in the payload
-        ids: list[int] = []
-        for l in resp.logs:
-            log_id = self._safe_int(l.get("id"))
-            if log_id is not None:
-                ids.append(log_id)
+        out = self.prepare_logs(new_logs)
 
-        if not ids:
-            return []
+        return out
 
-        current_max_id = max(ids)
+    def fetch_new_logs(
+        self,
+        user_id: str,
+        session_id: str,
+        limit: int = 200,
+        prime_if_first_time: bool = True,
+    ) -> list[dict[str, Any]]:
+        """Raw log rows newer than the cursor, ascending by id; advances the cursor."""
+        key = (user_id, session_id)
         prev_max_id = self._last_max_id.get(key)
 
-        # Update cursor immediately
-        self._last_max_id[key] = current_max_id
-
-        # Prime on first call (default behavior)
+        # Prime on first call (default behavior): remember the newest id, return nothing
         if prev_max_id is None and prime_if_first_time:
+            resp = self._client.fetch_logs(user_id=user_id, session_id=session_id, limit=limit)
+            ids = [i for i in (self._safe_int(l.get("id")) for l in resp.logs) if i is not None]
+            if resp.success and ids:
+                self._last_max_id[key] = max(ids)
             return []
 
+        # Only rows newer than the cursor are transferred, page by page until exhausted.
         # If prev_max_id is None but we don't want priming, treat it as 0
-        if prev_max_id is None:
-            prev_max_id = 0
-
-        # Filter only NEW logs
-        new_logs: list[dict[str, Any]] = []
-        for l in resp.logs:
-            log_id = self._safe_int(l.get("id"))
-            if log_id is not None and log_id > prev_max_id:
-                new_logs.append(l)
+        resp = self._client.fetch_logs_since(
+            user_id=user_id,
+            session_id=session_id,
+            since_id=prev_max_id or 0,
+            page_size=limit,
+        )
+        if not resp.success or not resp.logs:
+            return []
 
+        new_logs = [l for l in resp.logs if self._safe_int(l.get("id")) is not None]
         if not new_logs:
             return []
 
-        # Sort ascending by id for stable chronological output
+        # Sort ascending by id for stable chronological output, then advance the cursor
         new_logs.sort(key=lambda x: self._safe_int(x.get("id")) or 0)
+        self._last_max_id[key] = self._safe_int(new_logs[-1].get("id"))
+        return new_logs
 
-        out = self.prepare_logs(new_logs)
+    async def wait_for_logs(
+        self,
+        user_id: str,
+        session_id: str,
+        limit: int = 200,
+        required: Iterable[str] = LOGS_REQUIRED_TYPES,
+        expected: Iterable[str] = (),
+        deadline_sec: float = LOGS_WAIT_DEADLINE_SEC,
+    ) -> LogsPollResult:
+        """
+        Poll for this turn's logs until every required + expected log type is present,
+        an error log shows up, or `deadline_sec` passes. Backs off exponentially between
+        polls (LOGS_POLL_INITIAL_SEC doubling up to LOGS_POLL_MAX_SEC). Some pipeline
+        stages (memory_extraction, slow_path) write their logs after the SSE stream ends;
+        reading once would hand them to the next turn.
 
-        return out
+        Never primes: this turn's rows may already be there, so with no cursor yet (e.g. the
+        first turn, or every earlier turn came back empty) the first poll reads from id 0.
+
+        With a cassette current, the number of polls is recorded; a replay makes exactly
+        that many polls, without sleeping, so each one gets the recorded payload.
+        """
+        wanted = list(dict.fromkeys([*required, *expected]))
+        started = time.monotonic()
+        delay = LOGS_POLL_INITIAL_SEC
+        rows: list[dict[str, Any]] = []
+        attempts = 0
+        cassette = current_cassette()
+        replay = cassette.next("logs_wait") if cassette is not None and cassette.replaying else None
+
+        while True:
+            attempts += 1
+            rows += await asyncio.to_thread(self.fetch_new_logs, user_id, session_id, limit, False)
+            present = {l.get("log_type") for l in rows}
+            missing = [t for t in wanted if t not in present]
+            errored = "error" in present or any(l.get("error_message") for l in rows)
+            if replay is not None:
+                if attempts >= replay["attempts"]:
+                    break
+                continue
+            waited = time.monotonic() - started
+            if not missing or errored or waited + delay > deadline_sec:
+                break
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, LOGS_POLL_MAX_SEC)
+
+        waited = time.monotonic() - started
+        if cassette is not None and cassette.recording:
+            cassette.record("logs_wait", {"session_id": session_id, "attempts": attempts, "waited_sec": round(waited, 3)})
+        if missing:
+            logger.info(f"Logs incomplete after {waited:.2f}s ({attempts} polls), missing: {missing}")
+        else:
+            logger.info(f"Logs complete after {waited:.2f}s ({attempts} polls)")
+        return LogsPollResult(
+            logs=self.prepare_logs(rows) if rows else [],
+            complete=not missing,
+            missing=missing,
+            waited_sec=waited,
+            attempts=attempts,
+        )
 
     def prepare_logs(self, new_logs) -> dict[str, Any]:
 
@@ -105,9 +186,11 @@ class LogsReader:
         extraction_answers: list[str] = []
         error_messages:     list[str] = []
         memories:           list[str] = []
+        seen_types:         list[str] = []
 
         for l in new_logs:
             logtype = l.get("log_type")
+            seen_types.append(logtype if isinstance(logtype, str) else "unknown")
             raw_resp = l.get("response")
             log_error = l.get("error_message")
             
@@ -166,27 +249,28 @@ class LogsReader:
 
 
         # -------- build final output --------
+        # every log type that actually arrived, once, in arrival order
         out: dict[str, Any] = {
-            "log_type": ["main_model", "intent_classifier"],
+            "log_type": list(dict.fromkeys(seen_types)),
             "intent_classifier": intent_response,
         }
 
+        # extraction runs inside main_model (<!--EXTRACT:...-->) and errors may sit on any log
         if extraction_answers:
-            out["log_type"].append("extraction_model")
+            if "extraction_model" not in out["log_type"]:
+                out["log_type"].append("extraction_model")
             out["extraction_answers"] = extraction_answers
 
         if memories:
-           out["log_type"].append("memory_extraction")
+           if "memory_extraction" not in out["log_type"]:
+               out["log_type"].append("memory_extraction")
            out["Memories"] = memories
         
         if error_messages:
-            out["log_type"].append("error")
+            if "error" not in out["log_type"]:
+                out["log_type"].append("error")
             out["error_message"] = " | ".join(dict.fromkeys(error_messages))
 
-        # default: include type once
-        if logtype not in out["log_type"]:
-                out["log_type"].append(logtype if isinstance(logtype, str) else "unknown")
-
         logger.info(f"Prepared logs: {out}")
         return out
 
@@ -0,0 +1,84 @@
+"""Deterministic log-checker rules; the LLM checker is only needed when these can't decide."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from app.core.persona.tracker import is_question
+
+CRITICAL_LOGS = ("intent_classifier", "main_model")
+
+# replies that never carry an answer to a field question
+NON_ANSWERS = {
+    "ok", "okay", "yes", "sure", "thanks", "thank you", "got it", "fine",
+    "i'm not sure what to say", "not sure", "i don't know",
+}
+
+_PROPERTY_SEARCH = re.compile(r"property[_ ]search", re.IGNORECASE)
+
+
+@dataclass
+class RuleVerdict:
+    decided: bool                   # False -> the LLM checker must judge this turn
+    report: dict[str, Any]          # same keys as the Logs_checker_prompt output
+    undecided: list[str] = field(default_factory=list)
+
+
+def _is_non_answer(text: str) -> bool:
+    t = re.sub(r"[^\w\s']", "", (text or "").lower()).strip()
+    return not t or t in NON_ANSWERS
+
+
+def evaluate(last_assistant: str, user_response: str, logs: Any) -> RuleVerdict:
+    """
+    Apply the Logs_checker_prompt rules to prepare_logs() output:
+      - an error log makes the path abnormal (Log_error)
+      - intent_classifier and main_model are always expected
+      - intent property_search expects web_search; web_search on general chat is unexpected
+      - memory_extraction on a non-answer reply is unexpected
+    Any violation decides the turn (normal_path false). Without one, two cases still need
+    judgement: a question was asked and answered but nothing was extracted, and answers were
+    extracted but memory_extraction didn't run (were preferences revealed?).
+    """
+    prepared = logs if isinstance(logs, dict) else {}
+    present = [t for t in prepared.get("log_type") or [] if t]
+    intent: Optional[str] = prepared.get("intent_classifier")
+    answers = prepared.get("extraction_answers") or []
+    property_search = bool(intent and _PROPERTY_SEARCH.search(intent))
+    non_answer = _is_non_answer(user_response)
+
+    lost: list[str] = [t for t in CRITICAL_LOGS if t not in present]
+    lost_reasons: list[str] = [f"{', '.join(lost)} always expected but missing"] if lost else []
+    unexpected: list[str] = []
+    unexpected_reasons: list[str] = []
+    if property_search and "web_search" not in present:
+        lost.append("web_search")
+        lost_reasons.append("property_search intent without web_search")
+    if "web_search" in present and intent and not property_search:
+        unexpected.append("web_search")
+        unexpected_reasons.append("web_search ran on a general_chat intent")
+    if "memory_extraction" in present and non_answer:
+        unexpected.append("memory_extraction")
+        unexpected_reasons.append("memory_extraction ran on a generic reply")
+
+    error = prepared.get("error_message")
+    report: dict[str, Any] = {
+        "normal_path": not (error or lost or unexpected),
+        "Log_error": {"name": "error", "details": error} if error else None,
+        "actual": {"log_type": present},
+        "intent_response": intent,
+        "extraction_answers": answers,
+        "Lost_expected_logs": {"log_type": lost, "reason": "; ".join(lost_reasons)} if lost else None,
+        "unexpected_logs": {"log_type": unexpected, "reason": "; ".join(unexpected_reasons)} if unexpected else None,
+    }
+    if not report["normal_path"]:
+        return RuleVerdict(decided=True, report=report)
+
+    undecided: list[str] = []
+    if not answers and is_question(last_assistant) and not non_answer:
+        undecided.append("extraction_model: did the reply answer the question?")
+    if answers and "memory_extraction" not in present:
+        undecided.append("memory_extraction: did the reply reveal preferences?")
+    return RuleVerdict(decided=not undecided, report=report, undecided=undecided)
@@ -0,0 +1,122 @@
+"""Persistent cache of LLM log-checker verdicts (SQLite)."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from app.config.logger import get_logger
+from app.config.settings import VERDICT_CACHE_PATH, VERDICT_CACHE_TTL_SEC, VERDICT_CACHE_MAX_ENTRIES
+
+logger = get_logger(__name__)
+
+# expired/over-size rows are pruned every this many stores
+PRUNE_EVERY = 100
+
+
+def verdict_key(model: str, prompt_version: str, last_assistant: str, user_response: str, logs: Any) -> str:
+    """Canonical hash of everything the verdict depends on (whitespace-normalized text, key-sorted logs)."""
+    payload = {
+        "model": model,
+        "prompt": prompt_version,
+        "assistant": " ".join((last_assistant or "").split()),
+        "user": " ".join((user_response or "").split()),
+        "logs": logs,
+    }
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class VerdictCache:
+    """
+    key -> verdict text, with created/accessed timestamps. Entries older than `ttl_sec`
+    are misses; beyond `max_entries` the least recently read ones are dropped. The key
+    includes the prompt version, so editing Logs_checker_prompt invalidates old verdicts.
+    Safe to share between threads.
+    """
+
+    def __init__(self, path: str, ttl_sec: float, max_entries: int):
+        self.path = path
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS verdicts ("
+            "key TEXT PRIMARY KEY, verdict TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS verdicts_accessed ON verdicts(accessed_at)")
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT verdict FROM verdicts WHERE key = ? AND created_at >= ?", (key, now - self.ttl_sec)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE verdicts SET accessed_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, verdict: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO verdicts (key, verdict, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, verdict, now, now),
+            )
+            self.stores += 1
+            if self.stores % PRUNE_EVERY == 0:
+                self._prune(now)
+            self._db.commit()
+
+    def _prune(self, now: float) -> None:
+        expired = self._db.execute("DELETE FROM verdicts WHERE created_at < ?", (now - self.ttl_sec,)).rowcount
+        over = self._db.execute(
+            "DELETE FROM verdicts WHERE key IN ("
+            "SELECT key FROM verdicts ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        ).rowcount
+        if expired or over:
+            logger.info(f"Verdict cache pruned {expired} expired, {over} least recently used")
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Convenience singleton shared by all analysers
+_cache_singleton: Optional[VerdictCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_verdict_cache() -> VerdictCache:
+    global _cache_singleton
+
+    with _cache_lock:
+        if _cache_singleton is None:
+            _cache_singleton = VerdictCache(VERDICT_CACHE_PATH, VERDICT_CACHE_TTL_SEC, VERDICT_CACHE_MAX_ENTRIES)
+        return _cache_singleton
@@ -0,0 +1,188 @@
+"""Process-wide latency metrics: per-turn phase timings, SSE stream statistics, percentiles and Prometheus text output."""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from dataclasses import fields
+from typing import TYPE_CHECKING, Iterable, Optional
+
+import numpy as np
+
+from app.config.settings import METRICS_WINDOW
+from app.config.types import StreamStats, TurnTiming
+
+if TYPE_CHECKING:
+    from app.config.types import ChatResult, Turn
+
+# TurnTiming field "<phase>_sec" -> phase label
+PHASES = tuple(f.name[: -len("_sec")] for f in fields(TurnTiming))
+QUANTILES = (0.5, 0.95, 0.99)
+
+# StreamStats field -> run-level latency key
+STREAM_STATS = {
+    "ttfb_sec": "sse_ttfb",
+    "first_delta_sec": "sse_first_delta",
+    "total_sec": "sse_total",
+    "gap_p95_sec": "sse_delta_gap_p95",
+    "max_stall_sec": "sse_max_stall",
+    "chars_per_sec": "sse_chars_per_sec",
+}
+
+TURN_PHASE_METRIC = "tester_turn_phase_seconds"
+METRIC_HELP = {
+    TURN_PHASE_METRIC: "Time spent in each phase of a conversation turn.",
+    "tester_sse_ttfb_seconds": "Agent response: request sent to first line of the SSE body.",
+    "tester_sse_first_delta_seconds": "Agent response: request sent to first content delta.",
+    "tester_sse_total_seconds": "Agent response: request sent to end of stream.",
+    "tester_sse_delta_gap_seconds": "Agent response: time between consecutive content deltas.",
+    "tester_sse_max_stall_seconds": "Agent response: largest gap between content deltas, per response.",
+    "tester_sse_chars_per_second": "Agent response: characters streamed per second between first and last delta.",
+}
+
+
+def percentiles(values: Iterable[float]) -> dict[str, float]:
+    """count / mean / p50 / p95 / p99 / max of a set of samples ({} if empty)."""
+    data = np.fromiter(values, dtype=np.float64)
+    if data.size == 0:
+        return {}
+    p50, p95, p99 = np.percentile(data, [q * 100 for q in QUANTILES])
+    return {
+        "count": int(data.size),
+        "mean": round(float(data.mean()), 4),
+        "p50": round(float(p50), 4),
+        "p95": round(float(p95), 4),
+        "p99": round(float(p99), 4),
+        "max": round(float(data.max()), 4),
+    }
+
+
+def latency_summary(turns: Iterable["Turn"]) -> Optional[dict[str, dict[str, float]]]:
+    """Per-phase and per-SSE-statistic percentiles over the timed turns (None if no turn has timings)."""
+    samples: dict[str, list[float]] = {key: [] for key in (*PHASES, *STREAM_STATS.values())}
+    for turn in turns:
+        if turn.timing is not None:
+            for phase in PHASES:
+                value = getattr(turn.timing, f"{phase}_sec")
+                if value is not None:
+                    samples[phase].append(value)
+        if turn.stream is not None:
+            for field, key in STREAM_STATS.items():
+                value = getattr(turn.stream, field)
+                if value is not None:
+                    samples[key].append(value)
+    summary = {phase: percentiles(values) for phase, values in samples.items() if values}
+    return summary or None
+
+
+class _Series:
+    """Recent samples (sliding window, for quantiles) plus lifetime count and sum."""
+
+    def __init__(self, window: int):
+        self.samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.samples.append(value)
+        self.count += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """
+    Latency series keyed by metric name and labels. Quantiles are computed over the
+    last `window` samples of each series; `_count` and `_sum` cover the process lifetime.
+    """
+
+    def __init__(self, window: int = METRICS_WINDOW):
+        self.window = window
+        self._series: dict[tuple[str, tuple[tuple[str, str], ...]], _Series] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(self.window)
+            series.observe(value)
+
+    def snapshot(self) -> dict[str, list[dict]]:
+        """metric name -> [{labels, count, sum, quantiles}, ...]."""
+        with self._lock:
+            items = [(name, dict(labels), list(s.samples), s.count, s.sum) for (name, labels), s in self._series.items()]
+        out: dict[str, list[dict]] = {}
+        for name, labels, samples, count, total in sorted(items, key=lambda i: (i[0], sorted(i[1].items()))):
+            quantiles = np.percentile(samples, [q * 100 for q in QUANTILES]) if samples else []
+            out.setdefault(name, []).append({
+                "labels": labels,
+                "count": count,
+                "sum": total,
+                "quantiles": dict(zip(QUANTILES, (float(v) for v in quantiles))),
+            })
+        return out
+
+    def render(self) -> str:
+        """Prometheus text exposition format (every series as a summary)."""
+        lines: list[str] = []
+        for name, series in self.snapshot().items():
+            lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+            lines.append(f"# TYPE {name} summary")
+            for s in series:
+                labels = ",".join(f'{k}="{v}"' for k, v in s["labels"].items())
+                sep = "," if labels else ""
+                for q, value in s["quantiles"].items():
+                    lines.append(f'{name}{{{labels}{sep}quantile="{q}"}} {value:.6f}')
+                suffix = f"{{{labels}}}" if labels else ""
+                lines.append(f"{name}_sum{suffix} {s['sum']:.6f}")
+                lines.append(f"{name}_count{suffix} {s['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def record_phase(timing: Optional[TurnTiming], phase: str, seconds: Optional[float]) -> None:
+    """Store one phase duration on the turn and in the process-wide metrics."""
+    if seconds is None:
+        return
+    if timing is not None:
+        setattr(timing, f"{phase}_sec", round(seconds, 4))
+    get_metrics().observe(TURN_PHASE_METRIC, seconds, phase=phase)
+
+
+def record_stream(turn: "Turn", result: "ChatResult") -> None:
+    """Record the SSE phases and stream statistics measured by ChatClient for one message."""
+    record_phase(turn.timing, "sse_connect", result.connect_sec)
+    record_phase(turn.timing, "first_event", result.first_event_sec)
+    record_phase(turn.timing, "stream", result.stream_sec)
+
+    stats: Optional[StreamStats] = result.stream
+    if stats is None:
+        return
+    turn.stream = stats
+    metrics = get_metrics()
+    for name, value in (
+        ("tester_sse_ttfb_seconds", stats.ttfb_sec),
+        ("tester_sse_first_delta_seconds", stats.first_delta_sec),
+        ("tester_sse_total_seconds", stats.total_sec),
+        ("tester_sse_max_stall_seconds", stats.max_stall_sec),
+        ("tester_sse_chars_per_second", stats.chars_per_sec),
+    ):
+        if value is not None:
+            metrics.observe(name, value)
+    offsets = result.delta_offsets or []
+    for prev, cur in zip(offsets, offsets[1:]):
+        metrics.observe("tester_sse_delta_gap_seconds", cur - prev)
+
+
+# Convenience singleton shared by orchestrators and the /metrics route
+_metrics_singleton: Optional[MetricsRegistry] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    global _metrics_singleton
+
+    with _metrics_lock:
+        if _metrics_singleton is None:
+            _metrics_singleton = MetricsRegistry()
+        return _metrics_singleton
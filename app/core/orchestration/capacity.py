@@ -0,0 +1,196 @@
+"""Capacity search: AIMD on concurrent load sessions until the agent's p95 latency SLO is found."""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional
+
+from app.config.types import CapacityPoint, CapacityReport
+from app.config.settings import (
+    API_URL,
+    LOAD_MAX_TURNS,
+    CAPACITY_SLO_METRICS,
+    CAPACITY_SLO_METRIC,
+    CAPACITY_SLO_P95_SEC,
+    CAPACITY_START_CONCURRENCY,
+    CAPACITY_ADDITIVE_STEP,
+    CAPACITY_DECREASE_FACTOR,
+    CAPACITY_MAX_CONCURRENCY,
+    CAPACITY_STEP_SEC,
+    CAPACITY_MIN_STEP_SAMPLES,
+    CAPACITY_MAX_STEPS,
+    CAPACITY_MAX_DECREASES,
+    CAPACITY_THINK_TIME_SEC,
+)
+from app.core.orchestration.load import RequestSample, load_generator
+from app.core.metrics.registry import percentiles
+
+from app.config.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class capacity_search:
+    """
+    Closed-loop capacity search. `concurrency` workers each run load sessions back to back;
+    after every step (`step_sec`, extended up to 3x until `min_step_samples` messages),
+    the step's p95 of `slo_metric` decides the next concurrency:
+      - within the SLO and no errors: + `additive_step`
+      - otherwise:                    x `decrease_factor`
+    Workers above a lowered concurrency leave at their next turn. The search stops after
+    `max_decreases` backoffs (AIMD has bracketed the capacity), at `max_concurrency`, or
+    after `max_steps`. Each step is one point of the throughput/latency curve.
+    """
+
+    def __init__(
+        self,
+        driver,
+        slo_p95_sec: float = CAPACITY_SLO_P95_SEC,
+        slo_metric: str = CAPACITY_SLO_METRIC,
+        start_concurrency: int = CAPACITY_START_CONCURRENCY,
+        additive_step: int = CAPACITY_ADDITIVE_STEP,
+        decrease_factor: float = CAPACITY_DECREASE_FACTOR,
+        max_concurrency: int = CAPACITY_MAX_CONCURRENCY,
+        step_sec: float = CAPACITY_STEP_SEC,
+        min_step_samples: int = CAPACITY_MIN_STEP_SAMPLES,
+        max_steps: int = CAPACITY_MAX_STEPS,
+        max_decreases: int = CAPACITY_MAX_DECREASES,
+        think_time_sec: float = CAPACITY_THINK_TIME_SEC,
+        max_turns: int = LOAD_MAX_TURNS,
+        api_url: str = API_URL,
+        personas: Optional[list[dict]] = None,
+        seed: Optional[int] = None,
+    ):
+        if slo_metric not in CAPACITY_SLO_METRICS:
+            raise ValueError(f"Unknown slo_metric {slo_metric!r}, expected one of {CAPACITY_SLO_METRICS}")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1")
+        self.slo_p95_sec = slo_p95_sec
+        self.slo_metric = slo_metric
+        self.start_concurrency = max(1, start_concurrency)
+        self.additive_step = max(1, additive_step)
+        self.decrease_factor = decrease_factor
+        self.max_concurrency = max(self.start_concurrency, max_concurrency)
+        self.step_sec = step_sec
+        self.min_step_samples = min_step_samples
+        self.max_steps = max_steps
+        self.max_decreases = max_decreases
+        self.personas = personas or [None]
+        self._sessions = load_generator(
+            driver, think_time_sec=think_time_sec, max_turns=max_turns, api_url=api_url, seed=seed,
+        )
+        self._target = 0
+        self._workers: dict[int, asyncio.Task] = {}
+        self._samples: list[RequestSample] = []
+        logger.info(
+            f"Capacity search initialized (slo: p95 {slo_metric} <= {slo_p95_sec}s, "
+            f"start={self.start_concurrency}, +{self.additive_step} / x{decrease_factor})"
+        )
+
+    def _record(self, sample: RequestSample) -> None:
+        self._samples.append(sample)
+
+    async def _worker(self, worker_id: int) -> None:
+        sessions = 0
+        while worker_id < self._target:
+            persona = self.personas[(worker_id + sessions) % len(self.personas)]
+            await self._sessions.run_session(persona, self._record, lambda: worker_id < self._target)
+            sessions += 1
+
+    def _scale(self, concurrency: int) -> None:
+        """Set the target; start workers for free slots below it (extra ones leave on their own)."""
+        self._target = concurrency
+        for worker_id in range(concurrency):
+            task = self._workers.get(worker_id)
+            if task is None or task.done():
+                self._workers[worker_id] = asyncio.create_task(self._worker(worker_id))
+
+    async def _measure(self) -> tuple[list[RequestSample], float]:
+        self._samples = samples = []
+        started = time.perf_counter()
+        await asyncio.sleep(self.step_sec)
+        while len(samples) < self.min_step_samples and time.perf_counter() - started < 3 * self.step_sec:
+            await asyncio.sleep(min(1.0, self.step_sec / 10))
+        return samples, time.perf_counter() - started
+
+    def _point(self, step: int, concurrency: int, samples: list[RequestSample], duration: float) -> CapacityPoint:
+        ok = [s for s in samples if not s.error]
+        errors = len(samples) - len(ok)
+        stats = percentiles(getattr(s, self.slo_metric) for s in ok if getattr(s, self.slo_metric) is not None)
+        p95 = stats.get("p95")
+        return CapacityPoint(
+            step=step,
+            concurrency=concurrency,
+            duration_sec=round(duration, 3),
+            requests=len(samples),
+            errors=errors,
+            throughput_rps=round(len(ok) / duration, 3) if duration > 0 else 0.0,
+            p50_sec=stats.get("p50"),
+            p95_sec=p95,
+            p99_sec=stats.get("p99"),
+            within_slo=errors == 0 and p95 is not None and p95 <= self.slo_p95_sec,
+            action="hold",
+        )
+
+    async def run(self) -> CapacityReport:
+        """Run AIMD steps until a stop condition; return the curve, knee and max sustainable point."""
+        started_at = datetime.utcnow()
+        concurrency = self.start_concurrency
+        curve: list[CapacityPoint] = []
+        decreases = 0
+        stop_reason = "max_steps"
+        try:
+            for step in range(self.max_steps):
+                self._scale(concurrency)
+                samples, duration = await self._measure()
+                point = self._point(step, concurrency, samples, duration)
+                if not point.within_slo:
+                    point.action = "decrease"
+                    decreases += 1
+                    next_concurrency = max(1, int(concurrency * self.decrease_factor))
+                elif concurrency < self.max_concurrency:
+                    point.action = "increase"
+                    next_concurrency = min(self.max_concurrency, concurrency + self.additive_step)
+                else:
+                    next_concurrency = concurrency
+                curve.append(point)
+                logger.info(
+                    f"Capacity step {step}: concurrency={concurrency}, {point.throughput_rps} rps, "
+                    f"p95={point.p95_sec}s, errors={point.errors} -> {point.action}"
+                )
+
+                if decreases >= self.max_decreases:
+                    stop_reason = f"converged after {decreases} decreases"
+                    break
+                if point.action == "hold":
+                    stop_reason = "max_concurrency reached within the SLO"
+                    break
+                concurrency = next_concurrency
+        finally:
+            self._target = 0
+            workers = list(self._workers.values())
+            self._workers.clear()
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        sustainable = [p for p in curve if p.within_slo]
+        powered = [p for p in curve if p.errors == 0 and p.p95_sec]
+        report = CapacityReport(
+            started_at=started_at,
+            ended_at=datetime.utcnow(),
+            slo_metric=self.slo_metric,
+            slo_p95_sec=self.slo_p95_sec,
+            curve=curve,
+            max_sustainable=max(sustainable, key=lambda p: p.throughput_rps, default=None),
+            knee=max(powered, key=lambda p: p.throughput_rps / p.p95_sec, default=None),
+            stop_reason=stop_reason,
+        )
+        if report.max_sustainable is not None:
+            logger.info(
+                f"Capacity search finished ({stop_reason}): {report.max_sustainable.throughput_rps} rps "
+                f"at concurrency {report.max_sustainable.concurrency}"
+            )
+        else:
+            logger.info(f"Capacity search finished ({stop_reason}): no step met the SLO")
+        return report
@@ -1,11 +1,13 @@
 """Orchestrator: run the conversation loop until summary or limits."""
 
+import asyncio
+import time
 from datetime import datetime
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
 from uuid import uuid4
 
-from app.config.types import RunReport, Turn
-from app.config.settings import LOGS_API_URL, LOGS_LIMIT, USER_ID
+from app.config.types import RunReport, Turn, TurnTiming
+from app.config.settings import LOGS_API_URL, LOGS_LIMIT, LOGS_EXPECTED_TYPES
 
 from app.core.persona.persona import persona_context
 from app.core.persona.tracker import  is_question, stop_condition, extract_last_question #, deduplicate_questions
@@ -13,8 +15,10 @@ from app.core.persona.tracker import  is_question, stop_condition, extract_last_
 from app.clients.logs_client import LogsApiClient
 from app.core.logs.reader import LogsReader
 from app.core.logs.analyser import LogAnalyser
+from app.core.llm.context import ConversationContext
+from app.core.metrics.registry import latency_summary, record_phase, record_stream
 
-from app.config.logger import get_logger
+from app.config.logger import describe_error, get_logger
 
 if TYPE_CHECKING:
     from app.clients.chat_client import ChatClient
@@ -40,12 +44,22 @@ class chat_orchestrator:
         self.log_analyser = LogAnalyser()
         logger.info("Orchestrator initialized")
 
-    def run(self, initial_user_message: str, initial_real_estate_message: str) -> RunReport:
-        """Run the conversation until stop condition or limits."""
+    async def run(
+        self,
+        initial_user_message: str,
+        initial_real_estate_message: str,
+        persona: Optional[dict] = None,
+        on_event: Optional[Callable[[str, dict], Awaitable[None]]] = None,
+    ) -> RunReport:
+        """
+        Run the conversation until stop condition or limits.
+        If given, `on_event("turn", {...})` is awaited as soon as each turn completes.
+        """
         started_at = datetime.utcnow()
         turns: list[Turn] = []
         session_id: Optional[str] = str(uuid4())
-        persona = persona_context()
+        user_id = self.chat.user_id
+        persona = dict(persona) if persona else persona_context()
         current_user_message = initial_user_message
         assistant_text = initial_real_estate_message
 
@@ -60,6 +74,7 @@ class chat_orchestrator:
             retry_count=retry_count,
         )
         logs_reader = LogsReader(logs_client)
+        context = ConversationContext()
         Questions= []
 
         try:
@@ -71,25 +86,28 @@ class chat_orchestrator:
                     logger.error("max_total_seconds exceeded")
                     return RunReport(
                         success=False,
-                        user_id = USER_ID,
+                        user_id = user_id,
                         session_id= session_id, 
                         turns=turns,
                         final_summary=None,
                         started_at=started_at,
                         ended_at=datetime.utcnow(),
                         error="max_total_seconds exceeded",
+                        latency=latency_summary(turns),
                     )
 
                 # 1) Start Chat real_estate
-                turns.append(Turn(role="assistant", user_id=  USER_ID, session_id= session_id,content=assistant_text, ts=datetime.utcnow()))     # why do u need to buy
-                turns.append(Turn(role="user",      user_id=  USER_ID, session_id= session_id, content=current_user_message, ts=datetime.utcnow()))     # hello i need ... for stability 
+                turns.append(Turn(role="assistant", user_id=  user_id, session_id= session_id,content=assistant_text, ts=datetime.utcnow()))     # why do u need to buy
+                turns.append(Turn(role="user",      user_id=  user_id, session_id= session_id, content=current_user_message, ts=datetime.utcnow()))     # hello i need ... for stability 
+                timing = turns[-1].timing = TurnTiming()
 
                 logger.info(f"real_estate_message = {assistant_text}")
                 logger.info(f"Turn {turn_index + 1}: user msg (len={len(current_user_message)})")
 
                 # 2) send message (SSE) >>> Let Response , Take Logs
-                result = self.chat.send_message(current_user_message, session_id)  # very good - stability , when > logs
+                result = await self.chat.send_message(current_user_message, session_id)  # very good - stability , when > logs
                 session_id = result.session_id or session_id
+                record_stream(turns[-1], result)
 
                
 
@@ -100,26 +118,32 @@ class chat_orchestrator:
                 
                 # 3) --- read logs for THIS message only ---
                 # We rely on cursor-by-max-id. Since session starts new (session_id=None),
-                # first call should safely return logs for first message too, so prime_if_first_time=False.
+                # the first poll reads from id 0 and returns logs for the first message too.
                 
+                started = time.perf_counter()
                 try:
-                    user_id = getattr(self.chat, "user_id", None)
                     if user_id and session_id:
-                        new_logs = logs_reader.get_logs(
+                        poll = await logs_reader.wait_for_logs(
                             user_id=user_id,
                             session_id=session_id,
                             limit=LOGS_LIMIT,
-                            prime_if_first_time=False if turn_index == 0 else True,
+                            expected=LOGS_EXPECTED_TYPES,
                         )
-                        turns[-1].my_log = new_logs
-                        logger.info(f"report_logs: {new_logs}")
+                        turns[-1].my_log = poll.logs
+                        turns[-1].logs_complete = poll.complete
+                        turns[-1].logs_wait_sec = poll.waited_sec
+                        logger.info(f"report_logs: {poll.logs}")
 
                 except Exception as e:
                     logger.error(f"Failed to read logs: {e}")
+                record_phase(timing, "logs", time.perf_counter() - started)
                             
 
                 # 4) NOW take the Real_estate response
                 assistant_text = result.assistant_text.strip()   # very good - stability , when
+
+                if on_event is not None:
+                    await on_event("turn", {"index": turn_index, "turns": turns[-2:]})
                 
             
                 # 5) determine if response is Q or stop
@@ -140,17 +164,22 @@ class chat_orchestrator:
                 
                 if stopped:
                      return RunReport(success=True,
-                                        user_id = USER_ID,
+                                        user_id = user_id,
                                         session_id= session_id, 
                                         turns=turns, 
                                         final_summary=assistant_text,
                                         started_at=started_at,
-                                        ended_at=datetime.utcnow(),error=None,)
+                                        ended_at=datetime.utcnow(),error=None,
+                                        latency=latency_summary(turns),)
 
                 
                 if is_q:      # if true   > generate new user message , give it to current_user_message
-                    recent = turns[-10:] if len(turns) >= 10 else turns
-                    current_user_message = self.driver.generate_reply(persona, assistant_text, recent)     # 6 months
+                    summary, recent = context.window(turns)
+                    started = time.perf_counter()
+                    current_user_message = await self.driver.agenerate_reply(     # 6 months
+                        persona, assistant_text, recent, summary
+                    )
+                    record_phase(timing, "driver", time.perf_counter() - started)
 
                     if not current_user_message:
                         current_user_message = "I'm not sure what to say."
@@ -162,23 +191,25 @@ class chat_orchestrator:
             logger.info("max_turns exceeded")
             return RunReport(
                 success=True,
-                user_id = USER_ID,
+                user_id = user_id,
                 session_id= session_id,
                 turns=turns,
                 final_summary=None,
                 started_at=started_at,
                 ended_at=datetime.utcnow(),
                 error="max_turns exceeded",
+                latency=latency_summary(turns),
             )
         except Exception as e:
-            logger.error(f"Exception in run: {e}")
+            logger.error(f"Exception in run: {describe_error(e)}")
             return RunReport(
                 success=False,
-                user_id = USER_ID,
+                user_id = user_id,
                 session_id= session_id,
                 turns=turns,
                 final_summary=None,
                 started_at=started_at,
                 ended_at=datetime.utcnow(),
-                error=str(e),
+                error=describe_error(e),
+                latency=latency_summary(turns),
             )
@@ -0,0 +1,121 @@
+"""Run engine: execute many report sessions concurrently with a bounded limit."""
+
+import asyncio
+from collections import Counter
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional
+from uuid import uuid4
+
+from app.config.types import EngineReport, RunReport, RunStats, SessionSpec
+from app.config.settings import (
+    API_URL,
+    LOGS_API_URL,
+    TIMEOUT_SEC,
+    RETRY_COUNT,
+    MAX_TURNS,
+    MAX_TOTAL_SECONDS,
+    MAX_CONCURRENT_SESSIONS,
+    INITIAL_USER_MESSAGE,
+    INITIAL_REAL_Estate_MESSAGE,
+)
+from app.clients.chat_client import ChatClient
+from app.core.orchestration.report import report_orchestrator
+from app.core.metrics.registry import latency_summary
+
+from app.config.logger import describe_error, get_logger
+
+if TYPE_CHECKING:
+    from app.core.llm.driver import LLMDriver
+
+logger = get_logger(__name__)
+
+
+def summarize_reports(reports: list[RunReport], wall_time_sec: float) -> RunStats:
+    """Aggregate per-session reports into run-level stats."""
+    durations = [(r.ended_at - r.started_at).total_seconds() for r in reports]
+    user_turns = [sum(1 for t in r.turns if t.role == "user") for r in reports]
+    errors = Counter(r.error or "unknown" for r in reports if not r.success)
+    n = len(reports)
+    return RunStats(
+        sessions=n,
+        succeeded=sum(1 for r in reports if r.success),
+        failed=sum(1 for r in reports if not r.success),
+        with_summary=sum(1 for r in reports if r.final_summary),
+        total_turns=sum(user_turns),
+        mean_turns=sum(user_turns) / n if n else 0.0,
+        mean_duration_sec=sum(durations) / n if n else 0.0,
+        max_duration_sec=max(durations, default=0.0),
+        wall_time_sec=wall_time_sec,
+        errors=dict(errors),
+        latency=latency_summary(t for r in reports for t in r.turns),
+    )
+
+
+class run_engine:
+    """Runs N report sessions concurrently, each with its own persona and user id."""
+
+    def __init__(
+        self,
+        driver: "LLMDriver",
+        max_concurrency: int = MAX_CONCURRENT_SESSIONS,
+        max_turns: int = MAX_TURNS,
+        max_total_seconds: int = MAX_TOTAL_SECONDS,
+        api_url: str = API_URL,
+        logs_api_url: str = LOGS_API_URL,
+    ):
+        self.driver = driver
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_turns = max_turns
+        self.max_total_seconds = max_total_seconds
+        self.api_url = api_url
+        self.logs_api_url = logs_api_url
+        logger.info(f"Run engine initialized (max_concurrency={self.max_concurrency})")
+
+    async def _run_session(self, index: int, spec: SessionSpec, run_id: str) -> RunReport:
+        """Run one session; never raises so one failure cannot cancel its siblings."""
+        user_id = spec.user_id or str(uuid4())
+        started_at = datetime.utcnow()
+        try:
+            chat = ChatClient(self.api_url, user_id, TIMEOUT_SEC, RETRY_COUNT)
+            orchestrator = report_orchestrator(
+                chat, self.driver, self.max_turns, self.max_total_seconds, logs_api_url=self.logs_api_url,
+            )
+            report = await orchestrator.run(
+                spec.initial_user_message or INITIAL_USER_MESSAGE,
+                spec.initial_real_estate_message or INITIAL_REAL_Estate_MESSAGE,
+                persona=spec.persona,
+                run_id=run_id,
+            )
+            logger.info(f"Session {index + 1} finished: success={report.success}, session_id={report.session_id}")
+            return report
+        except Exception as e:
+            logger.error(f"Session {index + 1} crashed: {describe_error(e)}")
+            return RunReport(
+                success=False,
+                user_id=user_id,
+                session_id=None,
+                turns=[],
+                final_summary=None,
+                started_at=started_at,
+                ended_at=datetime.utcnow(),
+                error=describe_error(e),
+                run_id=run_id,
+            )
+
+    async def run(self, sessions: list[SessionSpec]) -> EngineReport:
+        """Run all sessions with at most `max_concurrency` in flight; reports keep input order."""
+        started_at = datetime.utcnow()
+        run_id = str(uuid4())     # shared by the batch's sessions in the question corpus
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def bounded(index: int, spec: SessionSpec) -> RunReport:
+            async with semaphore:
+                return await self._run_session(index, spec, run_id)
+
+        logger.info(f"Starting {len(sessions)} sessions (run_id={run_id})")
+        reports = await asyncio.gather(*(bounded(i, s) for i, s in enumerate(sessions)))
+        ended_at = datetime.utcnow()
+
+        stats = summarize_reports(list(reports), (ended_at - started_at).total_seconds())
+        logger.info(f"Run engine finished: {stats.succeeded}/{stats.sessions} succeeded in {stats.wall_time_sec:.1f}s")
+        return EngineReport(reports=list(reports), stats=stats, started_at=started_at, ended_at=ended_at)
@@ -0,0 +1,108 @@
+"""Background job runner: submit runs, poll status by job id, cancel."""
+
+import asyncio
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional
+from uuid import uuid4
+
+from app.config.types import JobInfo
+from app.config.settings import MAX_CONCURRENT_JOBS, JOBS_RETENTION
+
+from app.config.logger import describe_error, get_logger
+
+logger = get_logger(__name__)
+
+FINISHED = ("succeeded", "failed", "cancelled")
+
+
+class job_runner:
+    """
+    Runs submitted coroutines as asyncio tasks on a bounded pool of `max_workers` slots.
+    Jobs beyond the limit wait in status "queued". Finished jobs are kept (with their
+    result) until `retention` newer jobs have finished.
+    """
+
+    def __init__(self, max_workers: int = MAX_CONCURRENT_JOBS, retention: int = JOBS_RETENTION):
+        self.max_workers = max(1, max_workers)
+        self.retention = retention
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._jobs: "OrderedDict[str, JobInfo]" = OrderedDict()
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._results: dict[str, Any] = {}
+        logger.info(f"Job runner initialized (max_workers={self.max_workers})")
+
+    def submit(self, kind: str, factory: Callable[[], Awaitable[Any]]) -> JobInfo:
+        """Schedule `factory()` and return immediately with the queued job."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+        job = JobInfo(job_id=str(uuid4()), kind=kind, status="queued", created_at=datetime.utcnow())
+        self._jobs[job.job_id] = job
+        self._tasks[job.job_id] = asyncio.create_task(self._execute(job, factory))
+        logger.info(f"Job {job.job_id} ({kind}) queued")
+        return job
+
+    async def _execute(self, job: JobInfo, factory: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            async with self._slots:
+                job.status = "running"
+                job.started_at = datetime.utcnow()
+                logger.info(f"Job {job.job_id} running")
+                self._results[job.job_id] = await factory()
+                job.status = "succeeded"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            logger.info(f"Job {job.job_id} cancelled")
+        except Exception as e:
+            job.status = "failed"
+            job.error = describe_error(e)
+            logger.error(f"Job {job.job_id} failed: {e}")
+        finally:
+            job.ended_at = datetime.utcnow()
+            self._tasks.pop(job.job_id, None)
+            self._prune()
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond the retention limit."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED]
+        for job_id in finished[: max(0, len(finished) - self.retention)]:
+            self._jobs.pop(job_id, None)
+            self._results.pop(job_id, None)
+
+    def get(self, job_id: str) -> Optional[JobInfo]:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> list[JobInfo]:
+        return list(self._jobs.values())
+
+    def result(self, job_id: str) -> Any:
+        return self._results.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[JobInfo]:
+        """Request cancellation; the job moves to "cancelled" once its task unwinds."""
+        job = self._jobs.get(job_id)
+        task = self._tasks.get(job_id)
+        if job is not None and task is not None and not task.done():
+            task.cancel()
+        return job
+
+    async def shutdown(self) -> None:
+        """Cancel every unfinished job and wait for them to unwind."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# Convenience singleton shared by the routes
+_runner_singleton: Optional[job_runner] = None
+
+
+def get_job_runner() -> job_runner:
+    global _runner_singleton
+
+    if _runner_singleton is None:
+        _runner_singleton = job_runner()
+    return _runner_singleton
@@ -0,0 +1,239 @@
+"""Open-loop load generator: persona-driven sessions against the agent at a target arrival rate."""
+
+import asyncio
+import random
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Optional
+from uuid import uuid4
+
+import httpx
+
+from app.config.types import LoadReport, Turn, TurnTiming
+from app.config.settings import (
+    API_URL,
+    TIMEOUT_SEC,
+    INITIAL_USER_MESSAGE,
+    INITIAL_REAL_Estate_MESSAGE,
+    LOAD_ARRIVAL_RATE,
+    LOAD_DURATION_SEC,
+    LOAD_THINK_TIME_SEC,
+    LOAD_MAX_TURNS,
+    LOAD_MAX_IN_FLIGHT,
+    LOAD_DRAIN_TIMEOUT_SEC,
+)
+from app.clients.chat_client import ChatClient
+from app.core.persona.persona import persona_context
+from app.core.persona.tracker import is_question, stop_condition
+from app.core.llm.context import ConversationContext
+from app.core.metrics.registry import percentiles, record_phase, record_stream
+
+from app.config.logger import get_logger
+
+logger = get_logger(__name__)
+
+# ChatResult / StreamStats timings reported per request
+LATENCY_FIELDS = ("ttfb", "first_delta", "total")
+
+
+@dataclass
+class RequestSample:
+    """Outcome of one agent message: error type, or its latencies (seconds since sent)."""
+    turn_index: int
+    error: Optional[str] = None
+    ttfb: Optional[float] = None
+    first_delta: Optional[float] = None
+    total: Optional[float] = None
+
+
+def _error_type(e: Exception) -> str:
+    if isinstance(e, httpx.HTTPStatusError):
+        return f"HTTP {e.response.status_code}"
+    return type(e).__name__
+
+
+def _latency(samples: list[RequestSample]) -> dict[str, dict[str, float]]:
+    out = {}
+    for field in LATENCY_FIELDS:
+        stats = percentiles(getattr(s, field) for s in samples if getattr(s, field) is not None)
+        if stats:
+            out[field] = stats
+    return out
+
+
+class load_generator:
+    """
+    Starts sessions as a Poisson process at `arrival_rate` per second for `duration_sec`
+    (open loop: arrivals do not wait for earlier sessions), each running the orchestrator
+    turn loop with an exponential think time between turns. Log reading and analysis are
+    skipped so only the agent is loaded, and the driver is expected to be a cheap reply
+    source (see app.core.llm.replies). Messages are sent without retries so every failure
+    counts as an error.
+    """
+
+    def __init__(
+        self,
+        driver,
+        arrival_rate: float = LOAD_ARRIVAL_RATE,
+        duration_sec: float = LOAD_DURATION_SEC,
+        think_time_sec: float = LOAD_THINK_TIME_SEC,
+        max_turns: int = LOAD_MAX_TURNS,
+        max_in_flight: int = LOAD_MAX_IN_FLIGHT,
+        drain_timeout_sec: float = LOAD_DRAIN_TIMEOUT_SEC,
+        api_url: str = API_URL,
+        personas: Optional[list[dict]] = None,
+        seed: Optional[int] = None,
+    ):
+        if arrival_rate <= 0 or duration_sec <= 0:
+            raise ValueError("arrival_rate and duration_sec must be > 0")
+        self.driver = driver
+        self.arrival_rate = arrival_rate
+        self.duration_sec = duration_sec
+        self.think_time_sec = max(0.0, think_time_sec)
+        self.max_turns = max_turns
+        self.max_in_flight = max(1, max_in_flight)
+        self.drain_timeout_sec = drain_timeout_sec
+        self.api_url = api_url
+        self.personas = personas or [None]
+        self._rng = random.Random(seed)
+        logger.info(
+            f"Load generator initialized (rate={arrival_rate}/s, duration={duration_sec}s, "
+            f"think_time={think_time_sec}s, max_turns={max_turns})"
+        )
+
+    async def run_session(
+        self,
+        persona: Optional[dict],
+        record: Callable[[RequestSample], None],
+        keep_going: Optional[Callable[[], bool]] = None,
+    ) -> bool:
+        """
+        One conversation, passing every message's sample to `record`; False on the first
+        failed message. `keep_going()` is checked before each later turn (False ends the session).
+        """
+        chat = ChatClient(self.api_url, str(uuid4()), TIMEOUT_SEC, 1)
+        persona = dict(persona) if persona else persona_context()
+        session_id: Optional[str] = str(uuid4())
+        context = ConversationContext()
+        turns: list[Turn] = []
+        message, assistant_text = INITIAL_USER_MESSAGE, INITIAL_REAL_Estate_MESSAGE
+
+        for turn_index in range(self.max_turns):
+            if turn_index and self.think_time_sec:
+                await asyncio.sleep(self._rng.expovariate(1.0 / self.think_time_sec))
+            if turn_index and keep_going is not None and not keep_going():
+                break
+
+            for role, content in (("assistant", assistant_text), ("user", message)):
+                turns.append(Turn(role=role, user_id=chat.user_id, session_id=session_id, content=content, ts=datetime.utcnow()))
+            timing = turns[-1].timing = TurnTiming()
+            try:
+                result = await chat.send_message(message, session_id)
+            except Exception as e:
+                record(RequestSample(turn_index, error=_error_type(e)))
+                return False
+            record_stream(turns[-1], result)
+            stream = result.stream
+            record(RequestSample(
+                turn_index,
+                ttfb=stream.ttfb_sec if stream else None,
+                first_delta=stream.first_delta_sec if stream else None,
+                total=stream.total_sec if stream else None,
+            ))
+
+            session_id = result.session_id or session_id
+            assistant_text = result.assistant_text.strip()
+            if stop_condition(assistant_text):
+                break
+            if is_question(assistant_text):
+                summary, recent = context.window(turns)
+                started = time.perf_counter()
+                message = await self.driver.agenerate_reply(persona, assistant_text, recent, summary)
+                record_phase(timing, "driver", time.perf_counter() - started)
+                message = message or "I'm not sure what to say."
+            else:
+                message = "Okay."
+        return True
+
+    async def run(self) -> LoadReport:
+        """Generate arrivals for `duration_sec`, drain, and aggregate per-request samples."""
+        started_at = datetime.utcnow()
+        origin = time.perf_counter()
+        samples: list[RequestSample] = []
+        in_flight: set[asyncio.Task] = set()
+        sessions: list[asyncio.Task] = []
+        dropped = 0
+
+        arrival = 0.0
+        while True:
+            arrival += self._rng.expovariate(self.arrival_rate)
+            if arrival >= self.duration_sec:
+                break
+            await asyncio.sleep(max(0.0, origin + arrival - time.perf_counter()))
+            if len(in_flight) >= self.max_in_flight:
+                dropped += 1
+                continue
+            persona = self.personas[len(sessions) % len(self.personas)]
+            task = asyncio.create_task(self.run_session(persona, samples.append))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+            sessions.append(task)
+        logger.info(f"Load arrivals done: {len(sessions)} sessions started, {dropped} dropped; draining")
+
+        unfinished = 0
+        if in_flight:
+            _, pending = await asyncio.wait(set(in_flight), timeout=self.drain_timeout_sec)
+            unfinished = len(pending)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        wall_time_sec = time.perf_counter() - origin
+
+        outcomes = [t.result() if not t.cancelled() and t.exception() is None else None for t in sessions]
+        # a session that raised outside send_message (e.g. the reply source) failed without a request error
+        crashed = Counter(
+            f"session: {_error_type(t.exception())}" for t in sessions if not t.cancelled() and t.exception() is not None
+        )
+
+        errors = [s for s in samples if s.error]
+        ok = [s for s in samples if not s.error]
+        by_turn: dict[int, dict[str, Any]] = {}
+        grouped: dict[int, list[RequestSample]] = defaultdict(list)
+        for s in samples:
+            grouped[s.turn_index].append(s)
+        for turn_index in sorted(grouped):
+            group = grouped[turn_index]
+            n_errors = sum(1 for s in group if s.error)
+            by_turn[turn_index] = {
+                "requests": len(group),
+                "errors": n_errors,
+                "error_rate": round(n_errors / len(group), 4),
+                "latency": _latency([s for s in group if not s.error]),
+            }
+
+        report = LoadReport(
+            started_at=started_at,
+            ended_at=datetime.utcnow(),
+            target_rate=self.arrival_rate,
+            duration_sec=self.duration_sec,
+            wall_time_sec=round(wall_time_sec, 3),
+            sessions_started=len(sessions),
+            sessions_completed=sum(1 for o in outcomes if o is True),
+            sessions_failed=sum(1 for o in outcomes if o is False) + sum(crashed.values()),
+            sessions_dropped=dropped,
+            sessions_unfinished=unfinished,
+            requests=len(samples),
+            errors=len(errors),
+            error_rate=round(len(errors) / len(samples), 4) if samples else 0.0,
+            achieved_rps=round(len(ok) / wall_time_sec, 3) if wall_time_sec > 0 else 0.0,
+            errors_by_type=dict(Counter(s.error for s in errors) + crashed),
+            latency=_latency(ok),
+            by_turn=by_turn,
+        )
+        logger.info(
+            f"Load run finished: {report.requests} requests, {report.achieved_rps} rps, "
+            f"error_rate={report.error_rate}, sessions {report.sessions_completed}/{report.sessions_started}"
+        )
+        return report
@@ -1,20 +1,31 @@
 """Orchestrator: run the conversation loop until summary or limits."""
 
+import asyncio
+import time
 from datetime import datetime
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
 from uuid import uuid4
 
-from app.config.types import RunReport, Turn
-from app.config.settings import LOGS_API_URL, LOGS_LIMIT, USER_ID
+from app.config.types import RunReport, Turn, TurnTiming
+from app.config.settings import (
+    LOGS_API_URL, LOGS_LIMIT, LOGS_EXPECTED_TYPES, ANALYSIS_MODE, ANALYSIS_MODES, ANALYSIS_BATCH_MAX_TURNS,
+    QUESTION_CORPUS_ENABLED,
+)
 
 from app.core.persona.persona import persona_context
-from app.core.persona.tracker import  is_question, stop_condition, extract_last_question , deduplicate_questions
+from app.core.persona.tracker import  is_question, stop_condition, extract_last_question , QuestionDeduplicator
+from app.core.persona.corpus import get_question_corpus
 
-from app.clients.logs_client import LogsApiClient
+from app.clients.embeddings import generate_embeddings
+
+from app.clients.logs_client import LogsApiClient, _cursor_support
 from app.core.logs.reader import LogsReader
 from app.core.logs.analyser import LogAnalyser
+from app.core.llm.context import ConversationContext
+from app.core.metrics.registry import latency_summary, record_phase, record_stream
+from app.core.replay.cassette import replaying, session_cassette, use_cassette
 
-from app.config.logger import get_logger
+from app.config.logger import describe_error, get_logger
 
 if TYPE_CHECKING:
     from app.clients.chat_client import ChatClient
@@ -23,8 +34,23 @@ if TYPE_CHECKING:
 logger = get_logger(__name__)
 
 
+EventCallback = Callable[[str, dict], Awaitable[None]]
+
+
 class report_orchestrator:
-    """Runs the chat loop: send user message, get assistant, decide next or stop."""
+    """
+    Runs the chat loop: send user message, get assistant, decide next or stop.
+
+    analysis_mode:
+      - "sequential": fetch logs -> analyse -> driver reply -> next agent call, strictly in order.
+      - "pipelined":  turn N's analysis runs in the background while the driver reply and the
+                      agent call for turn N+1 proceed. Turn N's log fetch must still finish before
+                      turn N+1 is sent (the logs cursor would otherwise pick up N+1's logs).
+                      All outstanding analyses are joined, in turn order, before the run returns.
+      - "batched":    like pipelined, but turns are collected and checked ANALYSIS_BATCH_MAX_TURNS
+                      at a time (and at the end of the run) in one request each, so turn events
+                      arrive per batch.
+    """
 
     def __init__(
         self,
@@ -32,20 +58,190 @@ class report_orchestrator:
         driver: "LLMDriver",
         max_turns: int,
         max_total_seconds: int,
+        analysis_mode: str = ANALYSIS_MODE,
+        logs_api_url: str = LOGS_API_URL,
     ):
+        if analysis_mode not in ANALYSIS_MODES:
+            raise ValueError(f"Unknown analysis_mode {analysis_mode!r}, expected one of {ANALYSIS_MODES}")
         self.chat = chat
         self.driver = driver
         self.max_turns = max_turns
         self.max_total_seconds = max_total_seconds
+        self.analysis_mode = analysis_mode
+        self.logs_api_url = logs_api_url
         self.log_analyser = LogAnalyser()
-        logger.info("Orchestrator initialized")
+        logger.info(f"Orchestrator initialized (analysis_mode={analysis_mode})")
+
+    async def _fetch_logs(
+        self, logs_reader: LogsReader, user_id: str, session_id: Optional[str], turn: Turn
+    ):
+        """Wait for the logs produced by THIS message only (until complete or deadline); [] if unavailable."""
+        # We rely on cursor-by-max-id. Since session starts new (session_id=None),
+        # the first poll reads from id 0 and returns logs for the first message too.
+        started = time.perf_counter()
+        try:
+            if user_id and session_id:
+                poll = await logs_reader.wait_for_logs(
+                    user_id=user_id,
+                    session_id=session_id,
+                    limit=LOGS_LIMIT,
+                    expected=LOGS_EXPECTED_TYPES,
+                )
+                turn.logs_complete = poll.complete
+                turn.logs_wait_sec = poll.waited_sec
+                return poll.logs
+        except Exception as e:
+            logger.error(f"Failed to read logs: {e}")
+        finally:
+            record_phase(turn.timing, "logs", time.perf_counter() - started)
+        return []
+
+    async def _analyse_turn(
+        self,
+        logs: "asyncio.Future | list",
+        last_assistant: str,
+        user_response: str,
+        turn_pair: list[Turn],
+        turn_index: int,
+        previous: Optional[asyncio.Task],
+        on_event: Optional[EventCallback],
+    ) -> None:
+        """Analyse one turn's logs, attach the report, then emit the turn (after the previous one)."""
+        new_logs = await logs if isinstance(logs, asyncio.Future) else logs
+
+        # new logs : json -- send it to llm with last user message and real_estate response
+        started = time.perf_counter()
+        report_logs = await asyncio.to_thread(
+            self.log_analyser.analyse,
+            last_assistant=last_assistant,
+            user_response=user_response,
+            logs=new_logs,
+        )
+        record_phase(turn_pair[-1].timing, "analysis", time.perf_counter() - started)
+        logger.info(f"report_logs: {report_logs}")
+        turn_pair[-1].logs_report = report_logs
 
-    def run(self, initial_user_message: str, initial_real_estate_message: str) -> RunReport:
-        """Run the conversation until stop condition or limits."""
+        # keep events in turn order even if a later analysis finishes first
+        if previous is not None:
+            await asyncio.shield(previous)
+        if on_event is not None:
+            await on_event("turn", {"index": turn_index, "turns": turn_pair})
+
+    async def _analyse_batch(
+        self,
+        batch: list[tuple["asyncio.Future", str, str, list[Turn], int]],
+        previous: Optional[asyncio.Task],
+        on_event: Optional[EventCallback],
+    ) -> None:
+        """Analyse several turns in one request, attach the reports, then emit the turns in order."""
+        items = []
+        for logs, last_assistant, user_response, _, _ in batch:
+            items.append((last_assistant, user_response, await logs))
+        started = time.perf_counter()
+        reports = await asyncio.to_thread(self.log_analyser.analyse_batch, items)
+        elapsed = time.perf_counter() - started
+        for (_, _, _, turn_pair, _), report_logs in zip(batch, reports):
+            turn_pair[-1].logs_report = report_logs
+            # each turn waited for the whole batch request
+            record_phase(turn_pair[-1].timing, "analysis", elapsed)
+
+        if previous is not None:
+            await asyncio.shield(previous)
+        if on_event is not None:
+            for _, _, _, turn_pair, turn_index in batch:
+                await on_event("turn", {"index": turn_index, "turns": turn_pair})
+
+    def _record_question(
+        self, dedup: QuestionDeduplicator, question: str, run_id: str, session_id: Optional[str], turn_index: int,
+    ) -> Optional[dict]:
+        """Embed once; feed the per-run deduplicator and the cross-run question corpus."""
+        embedding = generate_embeddings([question])[0]
+        repeat = dedup.add_embedding(question, embedding)
+        if QUESTION_CORPUS_ENABLED and not replaying():
+            try:
+                get_question_corpus().add(question, embedding, run_id, session_id, turn_index)
+            except Exception as e:
+                logger.error(f"Failed to add question to corpus: {e}")
+        return repeat
+
+    async def _track_question(
+        self,
+        dedup: QuestionDeduplicator,
+        question: Optional[str],
+        run_id: str,
+        session_id: Optional[str],
+        turn_index: int,
+        previous: Optional[asyncio.Task],
+        on_event: Optional[EventCallback],
+    ) -> None:
+        """Feed one question to the live deduplicator (after the previous one, to keep greedy order)."""
+        if previous is not None:
+            await asyncio.shield(previous)
+        question = question.strip() if question else ""
+        if not question:
+            return
+        try:
+            repeat = await asyncio.to_thread(self._record_question, dedup, question, run_id, session_id, turn_index)
+        except Exception as e:
+            logger.error(f"Failed to check question for duplicates: {e}")
+            return
+        if repeat is not None:
+            logger.info(f"Repeated question at turn {turn_index + 1}: {question!r} ~ {repeat['Q']!r} (n={repeat['n']})")
+            if on_event is not None:
+                await on_event("duplicate", {"index": turn_index, "question": question, **repeat})
+
+    async def run(
+        self,
+        initial_user_message: str,
+        initial_real_estate_message: str,
+        persona: Optional[dict] = None,
+        on_event: Optional[EventCallback] = None,
+        run_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+    ) -> RunReport:
+        """
+        Run the conversation until stop condition or limits.
+        If given, `on_event("turn", {...})` is awaited as soon as each turn completes.
+        `run_id` groups sessions of one batch in the question corpus (a fresh id if omitted);
+        `session_id` is the one sent with the first message (a fresh id if omitted).
+        With CASSETTE_RECORD on, the session's traffic is recorded to a cassette (app.core.replay).
+        """
+        run_id = run_id or str(uuid4())
+        session_id = session_id or str(uuid4())
+        persona = dict(persona) if persona else persona_context()
+        cassette = session_cassette(session_id, {
+            "run_id": run_id,
+            "user_id": self.chat.user_id,
+            "session_id": session_id,
+            "persona": persona,
+            "initial_user_message": initial_user_message,
+            "initial_real_estate_message": initial_real_estate_message,
+            "max_turns": self.max_turns,
+            "max_total_seconds": self.max_total_seconds,
+            "analysis_mode": self.analysis_mode,
+            "logs_api_url": self.logs_api_url,
+            "logs_cursor_support": _cursor_support.get(self.logs_api_url),
+        })
+        with use_cassette(cassette):
+            report = await self._run(
+                initial_user_message, initial_real_estate_message, persona, on_event, run_id, session_id,
+            )
+            if cassette is not None:
+                cassette.meta.update(final_session_id=report.session_id, success=report.success, error=report.error)
+        return report
+
+    async def _run(
+        self,
+        initial_user_message: str,
+        initial_real_estate_message: str,
+        persona: dict,
+        on_event: Optional[EventCallback],
+        run_id: str,
+        session_id: Optional[str],
+    ) -> RunReport:
         started_at = datetime.utcnow()
         turns: list[Turn] = []
-        session_id: Optional[str] = str(uuid4())
-        persona = persona_context()
+        user_id = self.chat.user_id
         current_user_message = initial_user_message
         assistant_text = initial_real_estate_message
 
@@ -55,13 +251,22 @@ class report_orchestrator:
         retry_count = getattr(self.chat, "retry_count", 1)
 
         logs_client = LogsApiClient(
-            logs_api_url=LOGS_API_URL,
+            logs_api_url=self.logs_api_url,
             timeout_sec=timeout_sec,
             retry_count=retry_count,
         )
         logs_reader = LogsReader(logs_client)
+        context = ConversationContext()
+
+        dedup = QuestionDeduplicator()
+        dedup_task: Optional[asyncio.Task] = None
+        analyses: list[asyncio.Task] = []       # pipelined/batched mode: one per turn/batch, in turn order
+        batch: list[tuple] = []                 # batched mode: turns not yet sent for analysis
+        logs_task: Optional[asyncio.Task] = None
 
-        asked_Questions= []
+        success = True
+        final_summary: Optional[str] = None
+        error: Optional[str] = "max_turns exceeded"
         try:
             for turn_index in range(self.max_turns):
 
@@ -69,72 +274,62 @@ class report_orchestrator:
                 elapsed = (datetime.utcnow() - started_at).total_seconds()
                 if elapsed >= self.max_total_seconds:
                     logger.error("max_total_seconds exceeded")
-                    
-                    # Check duplicated Quesions
-                    duplicated = deduplicate_questions(asked_Questions)               
-                    
-                    return RunReport(
-                        success=False,
-                        user_id = USER_ID,
-                        session_id= session_id, 
-                        turns=turns,
-                        final_summary=None,
-                        started_at=started_at,
-                        ended_at=datetime.utcnow(),
-                        error="max_total_seconds exceeded",
-                        duplicate= duplicated
-                        
-                    )
+                    success, error = False, "max_total_seconds exceeded"
+                    break
 
                 # 1) Start Chat real_estate
-                turns.append(Turn(role="assistant", user_id=  USER_ID, session_id= session_id,content=assistant_text, ts=datetime.utcnow()))     # why do u need to buy
-                turns.append(Turn(role="user",      user_id=  USER_ID, session_id= session_id, content=current_user_message, ts=datetime.utcnow()))     # hello i need ... for stability 
+                turns.append(Turn(role="assistant", user_id=  user_id, session_id= session_id,content=assistant_text, ts=datetime.utcnow()))     # why do u need to buy
+                turns.append(Turn(role="user",      user_id=  user_id, session_id= session_id, content=current_user_message, ts=datetime.utcnow()))     # hello i need ... for stability 
+                timing = turns[-1].timing = TurnTiming()
 
                 logger.info(f"real_estate_message = {assistant_text}")
                 logger.info(f"Turn {turn_index + 1}: user msg (len={len(current_user_message)})")
 
-                # 4) send message (SSE) >>> Let Response , Take Logs
-                result = self.chat.send_message(current_user_message, session_id)  # very good - stability , when > logs
-                session_id = result.session_id or session_id
+                # previous turn's logs must be read before this message creates new ones
+                if logs_task is not None:
+                    await logs_task
+                # surface a failed background analysis as early as sequential mode would
+                for task in analyses:
+                    if task.done() and not task.cancelled() and task.exception() is not None:
+                        raise task.exception()
 
-               
+                # 2) send message (SSE) >>> Let Response , Take Logs
+                result = await self.chat.send_message(current_user_message, session_id)  # very good - stability , when > logs
+                session_id = result.session_id or session_id
+                record_stream(turns[-1], result)
 
                 # Update session_id in all existing turns
                 for turn in turns:
                     turn.session_id = session_id
 
-                
                 # return : new response from real estate , with result LOGS   
                 # take logs to analysis now ,, then take this response in next turn
 
-                # 2) --- read logs for THIS message only ---
-                # We rely on cursor-by-max-id. Since session starts new (session_id=None),
-                # first call should safely return logs for first message too, so prime_if_first_time=False.
-                try:
-                    user_id = getattr(self.chat, "user_id", None)
-                    if user_id and session_id:
-                        new_logs = logs_reader.get_logs(
-                            user_id=user_id,
-                            session_id=session_id,
-                            limit=LOGS_LIMIT,
-                            prime_if_first_time=False if turn_index == 0 else True,
-                        )
-
-                except Exception as e:
-                    logger.error(f"Failed to read logs: {e}")
-
-                # 3) check logs
-                """new logs : json -- send it to llm with last user message and real_estate response """
-                report_logs = self.log_analyser.analyse(last_assistant=assistant_text, user_response=current_user_message, logs=new_logs)
-
-                logger.info(f"report_logs: {report_logs}")
+                # 3) read logs for THIS message, then check them
+                if self.analysis_mode == "pipelined":
+                    logs_task = asyncio.create_task(self._fetch_logs(logs_reader, user_id, session_id, turns[-1]))
+                    analyses.append(asyncio.create_task(self._analyse_turn(
+                        logs_task, assistant_text, current_user_message, turns[-2:], turn_index,
+                        analyses[-1] if analyses else None, on_event,
+                    )))
+                elif self.analysis_mode == "batched":
+                    logs_task = asyncio.create_task(self._fetch_logs(logs_reader, user_id, session_id, turns[-1]))
+                    batch.append((logs_task, assistant_text, current_user_message, turns[-2:], turn_index))
+                    if len(batch) >= ANALYSIS_BATCH_MAX_TURNS:
+                        analyses.append(asyncio.create_task(
+                            self._analyse_batch(batch, analyses[-1] if analyses else None, on_event)
+                        ))
+                        batch = []
+                else:
+                    new_logs = await self._fetch_logs(logs_reader, user_id, session_id, turns[-1])
+                    await self._analyse_turn(
+                        new_logs, assistant_text, current_user_message, turns[-2:], turn_index, None, on_event,
+                    )
 
-                # 4) send message (SSE)  NOW take the response
+                # 4) NOW take the response
                 assistant_text = result.assistant_text.strip()   # very good - stability , when
-                
-                turns[-1].logs_report = report_logs
 
-                # 4) determine if response is Q or stop
+                # 5) determine if response is Q or stop
                 is_q = is_question(assistant_text)
                 stopped = stop_condition(assistant_text)
                 logger.info(
@@ -143,28 +338,26 @@ class report_orchestrator:
                 )
                 # GET last qustion fore repeat Test
                 last_question = extract_last_question(assistant_text)
-                asked_Questions.append(last_question)
                 logger.info(f"last_question : {last_question}")
-            
-            
+                if last_question:
+                    dedup_task = asyncio.create_task(
+                        self._track_question(
+                            dedup, last_question, run_id, session_id, turn_index, dedup_task, on_event,
+                        )
+                    )
+
                 if stopped:
-                    # Check duplicated Quesions
-                    duplicated = deduplicate_questions(asked_Questions)               
-            
-                    return RunReport(success=True,
-                                        user_id = USER_ID,
-                                        session_id= session_id, 
-                                        turns=turns, 
-                                        final_summary=assistant_text,
-                                        started_at=started_at,
-                                        ended_at=datetime.utcnow(),error=None,
-                                        duplicate= duplicated)
-
-                
+                    final_summary, error = assistant_text, None
+                    break
+
                 if is_q:      
                     # if true   > generate new user message , give it to current_user_message
-                    recent = turns[-10:] if len(turns) >= 10 else turns
-                    current_user_message = self.driver.generate_reply(persona, assistant_text, recent)     # 6 months
+                    summary, recent = context.window(turns)
+                    started = time.perf_counter()
+                    current_user_message = await self.driver.agenerate_reply(     # 6 months
+                        persona, assistant_text, recent, summary
+                    )
+                    record_phase(timing, "driver", time.perf_counter() - started)
 
                     if not current_user_message:
                         current_user_message = "I'm not sure what to say."
@@ -172,38 +365,49 @@ class report_orchestrator:
                     current_user_message = "Okay."
 
                 logger.info(f"final message to new turn--- current_user_message: {current_user_message}")
-
-
-
-            # Check duplicated Quesions
-            duplicated = deduplicate_questions(asked_Questions)               
-            
-            logger.info("max_turns exceeded")
-            return RunReport(
-                success=True,
-                user_id = USER_ID,
-                session_id= session_id,
-                turns=turns,
-                final_summary=None,
-                started_at=started_at,
-                ended_at=datetime.utcnow(),
-                error="max_turns exceeded",
-                duplicate= duplicated
-            )
+            else:
+                logger.info("max_turns exceeded")
+
+            if batch:
+                analyses.append(asyncio.create_task(
+                    self._analyse_batch(batch, analyses[-1] if analyses else None, on_event)
+                ))
+                batch = []
+
+            # join outstanding analyses in turn order; the first failure fails the run
+            for task in analyses:
+                await task
         except Exception as e:
-            logger.error(f"Exception in run: {e}")
-
-            # Check duplicated Quesions
-            duplicated = deduplicate_questions(asked_Questions)               
-           
-            return RunReport(
-                success=False,
-                user_id = USER_ID,
-                session_id= session_id,
-                turns=turns,
-                final_summary=None,
-                started_at=started_at,
-                ended_at=datetime.utcnow(),
-                error=str(e),
-                duplicate= duplicated
-            )
+            logger.error(f"Exception in run: {describe_error(e)}")
+            success, final_summary, error = False, None, describe_error(e)
+            await asyncio.gather(*analyses, return_exceptions=True)
+        finally:
+            for task in analyses:
+                if not task.done():
+                    task.cancel()
+            if logs_task is not None and not logs_task.done():
+                logs_task.cancel()
+
+        # Check duplicated Quesions (all fed live; wait for the last one)
+        if dedup_task is not None:
+            await dedup_task
+        duplicated = dedup.duplicates()
+        latency = latency_summary(turns)
+        if latency:
+            logger.info("Run latency p50/p95 (s): " + ", ".join(
+                f"{phase}={stats['p50']}/{stats['p95']}" for phase, stats in latency.items()
+            ))
+
+        return RunReport(
+            success=success,
+            user_id = user_id,
+            session_id= session_id,
+            turns=turns,
+            final_summary=final_summary,
+            started_at=started_at,
+            ended_at=datetime.utcnow(),
+            error=error,
+            duplicate= duplicated,
+            run_id=run_id,
+            latency=latency,
+        )
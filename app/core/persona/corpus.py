@@ -0,0 +1,378 @@
+"""Cross-run index of every agent question, for repetition analytics."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.core.persona.tracker import DUPLICATE_THRESHOLD, QuestionDeduplicator
+from app.config.logger import get_logger
+from app.config.settings import QUESTION_CORPUS_DIR
+
+logger = get_logger(__name__)
+
+CODES_FILE = "codes.i8"
+SCALES_FILE = "scales.f32"
+META_FILE = "meta.jsonl"
+CLUSTERS_FILE = "clusters.i32"
+REPS_FILE = "reps.i32"
+INFO_FILE = "info.json"
+SCAN_BLOCK_ROWS = 8192
+
+
+def quantize(v: np.ndarray) -> tuple[np.ndarray, float]:
+    """Unit-normalize, then scale into int8 with one float scale per row (~4x smaller than float32)."""
+    v = np.asarray(v, dtype=np.float32)
+    v = v / (np.linalg.norm(v) + 1e-12)
+    scale = float(np.abs(v).max()) / 127.0 or 1.0
+    return np.round(v / scale).astype(np.int8), scale
+
+
+def _epoch(ts: Optional[str]) -> float:
+    try:
+        return datetime.fromisoformat(ts).replace(tzinfo=timezone.utc).timestamp()
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _iso(epoch: float) -> Optional[str]:
+    if np.isnan(epoch):
+        return None
+    return datetime.fromtimestamp(float(epoch), timezone.utc).replace(tzinfo=None).isoformat()
+
+
+class _Interned:
+    """Distinct values of a string column (None included), numbered in order of first appearance."""
+
+    def __init__(self):
+        self.values: List[Optional[str]] = []
+        self._ids: Dict[Optional[str], int] = {}
+
+    def id(self, value: Optional[str]) -> int:
+        i = self._ids.get(value)
+        if i is None:
+            i = self._ids[value] = len(self.values)
+            self.values.append(value)
+        return i
+
+
+class QuestionCorpus:
+    """
+    Append-only store of agent questions across runs: int8-quantized unit embeddings
+    plus (run_id, session_id, turn_index, text). Supports nearest-neighbour search and
+    "how often is this asked across sessions" aggregates.
+
+    Per-row metadata is kept in numpy columns (run and session ids interned to integers,
+    turn index, epoch timestamp) plus one list of texts; meta.jsonl is the durable copy.
+
+    Repetition clusters use the deduplicate_questions semantics (greedy, cosine >=
+    DUPLICATE_THRESHOLD) and are maintained online as questions are added. Each row's
+    cluster id and the row of each cluster's representative are appended to disk too,
+    so a restart restores the clusters instead of re-running the greedy pass.
+    """
+
+    def __init__(self, root: str, threshold: float = DUPLICATE_THRESHOLD):
+        self.root = root
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._clear()
+        self._load()
+
+    def _clear(self) -> None:
+        self.dim: Optional[int] = None
+        self._n = 0
+        self._codes = np.empty((0, 0), dtype=np.int8)
+        self._scales = np.empty(0, dtype=np.float32)
+        self._runs = np.empty(0, dtype=np.int32)
+        self._sessions = np.empty(0, dtype=np.int32)
+        self._turns = np.empty(0, dtype=np.int32)
+        self._ts = np.empty(0, dtype=np.float64)
+        self._cluster_ids = np.empty(0, dtype=np.int32)
+        self._texts: List[str] = []
+        self._run_names = _Interned()
+        self._session_names = _Interned()
+        self._clusters = QuestionDeduplicator(self.threshold)
+        self._cluster_sessions: List[set] = []
+
+    # ---------- persistence ----------
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _load(self) -> None:
+        if not os.path.exists(self._path(INFO_FILE)):
+            return
+        try:
+            with open(self._path(INFO_FILE), "r", encoding="utf-8") as f:
+                self.dim = int(json.load(f)["dim"])
+            codes = self._read_array(CODES_FILE, np.int8)
+            scales = self._read_array(SCALES_FILE, np.float32)
+            meta, meta_ends = self._read_meta()
+            # a crash mid-append can leave the files at different lengths (or a torn meta line)
+            n = min(len(codes) // self.dim, len(scales), len(meta))
+            self._truncate(n, meta_ends[n - 1] if n else 0)
+            self._resize(n)
+            self._codes[:] = codes[: n * self.dim].reshape(n, self.dim)
+            self._scales[:] = scales[:n]
+            for i, m in enumerate(meta[:n]):
+                self._set_meta(i, m.get("text"), m.get("run_id"), m.get("session_id"), m.get("turn_index"), _epoch(m.get("ts")))
+            self._n = n
+            del meta
+
+            restored = self._restore_clusters(n)
+            new_reps = [i for i in range(restored, n) if self._cluster(i)]
+            if restored < n:
+                self._append_clusters(self._cluster_ids[restored:n], new_reps)
+                logger.info(f"Question corpus: clustered {n - restored} questions missing from {CLUSTERS_FILE}")
+            logger.info(f"Question corpus loaded: {n} questions, {len(self._cluster_sessions)} clusters")
+        except Exception as e:
+            logger.error(f"Question corpus at {self.root} unreadable, starting empty: {e}")
+            self._clear()
+
+    def _read_array(self, name: str, dtype) -> np.ndarray:
+        path = self._path(name)
+        return np.fromfile(path, dtype=dtype) if os.path.exists(path) else np.empty(0, dtype=dtype)
+
+    def _read_meta(self) -> tuple[List[Dict[str, Any]], List[int]]:
+        """Complete meta rows, and the byte offset where each one ends; stops at a torn line."""
+        meta: List[Dict[str, Any]] = []
+        ends: List[int] = []
+        if not os.path.exists(self._path(META_FILE)):
+            return meta, ends
+        offset = 0
+        with open(self._path(META_FILE), "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    meta.append(json.loads(line))
+                except ValueError:
+                    break
+                ends.append(offset)
+        return meta, ends
+
+    def _restore_clusters(self, n: int) -> int:
+        """
+        Restore the saved cluster assignment of the first rows; returns how many rows it covers.
+        Rows past that (written before a crash, or a corpus from before the cluster files) are
+        left for the greedy pass. Anything inconsistent discards the saved clusters altogether.
+        """
+        clusters = self._read_array(CLUSTERS_FILE, np.int32)
+        reps = self._read_array(REPS_FILE, np.int32)
+        k = min(len(clusters), n)
+        clusters = clusters[:k]
+        reps = reps[: int(np.searchsorted(reps, k))]
+        valid = (
+            np.all(np.diff(reps) > 0)
+            and (not k or (clusters.min() >= 0 and clusters.max() < len(reps)))
+            and np.array_equal(clusters[reps], np.arange(len(reps)))
+        )
+        if not valid:
+            logger.info("Question corpus: saved clusters inconsistent with the questions, re-clustering")
+            k, clusters, reps = 0, clusters[:0], reps[:0]
+        for name, size in ((CLUSTERS_FILE, k * 4), (REPS_FILE, len(reps) * 4)):
+            path = self._path(name)
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                os.truncate(path, size)
+        if not k:
+            return 0
+
+        self._cluster_ids[:k] = clusters
+        self._clusters.restore(
+            self._codes[reps].astype(np.float32) * self._scales[reps, None],
+            [self._texts[r] for r in reps],
+            np.bincount(clusters, minlength=len(reps)).tolist(),
+        )
+        self._cluster_sessions = [set() for _ in range(len(reps))]
+        pairs = np.unique((clusters.astype(np.int64) << 32) | self._sessions[:k].astype(np.int64))
+        for c, s in zip((pairs >> 32).tolist(), (pairs & 0xFFFFFFFF).tolist()):
+            self._cluster_sessions[c].add(s)
+        return k
+
+    def _truncate(self, n: int, meta_bytes: int) -> None:
+        """Cut every file back to its first n rows, so the next append lines the rows up again."""
+        sizes = ((CODES_FILE, n * self.dim), (SCALES_FILE, n * 4), (META_FILE, meta_bytes))
+        for name, size in sizes:
+            path = self._path(name)
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                os.truncate(path, size)
+                logger.info(f"Question corpus: {name} truncated to {n} rows after an interrupted append")
+
+    def _append_files(self, code: np.ndarray, scale: float, meta: Dict[str, Any]) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        if not os.path.exists(self._path(INFO_FILE)):
+            with open(self._path(INFO_FILE), "w", encoding="utf-8") as f:
+                json.dump({"dim": self.dim}, f)
+        with open(self._path(CODES_FILE), "ab") as f:
+            f.write(code.tobytes())
+        with open(self._path(SCALES_FILE), "ab") as f:
+            f.write(np.float32(scale).tobytes())
+        with open(self._path(META_FILE), "a", encoding="utf-8") as f:
+            f.write(json.dumps(meta, ensure_ascii=False) + "\n")
+
+    def _append_clusters(self, cluster_ids: np.ndarray, new_reps: List[int]) -> None:
+        # reps first: a cluster id on disk always has its representative saved
+        with open(self._path(REPS_FILE), "ab") as f:
+            f.write(np.asarray(new_reps, dtype=np.int32).tobytes())
+        with open(self._path(CLUSTERS_FILE), "ab") as f:
+            f.write(np.asarray(cluster_ids, dtype=np.int32).tobytes())
+
+    # ---------- indexing ----------
+
+    def _resize(self, rows: int) -> None:
+        """Reallocate every column to `rows` rows, keeping the first _n."""
+        n = self._n
+        codes = np.empty((rows, self.dim), dtype=np.int8)
+        if n:
+            codes[:n] = self._codes[:n]
+        self._codes = codes
+        for name in ("_scales", "_runs", "_sessions", "_turns", "_ts", "_cluster_ids"):
+            old = getattr(self, name)
+            column = np.empty(rows, dtype=old.dtype)
+            column[:n] = old[:n]
+            setattr(self, name, column)
+
+    def _set_meta(self, i: int, text: str, run_id, session_id, turn_index, ts: float) -> None:
+        self._texts.append(text)
+        self._runs[i] = self._run_names.id(run_id)
+        self._sessions[i] = self._session_names.id(session_id)
+        self._turns[i] = -1 if turn_index is None else turn_index
+        self._ts[i] = ts
+
+    def _vector(self, i: int) -> np.ndarray:
+        return self._codes[i].astype(np.float32) * self._scales[i]
+
+    def _cluster(self, i: int) -> bool:
+        """Assign row i to a cluster; True if it started a new one."""
+        rep, is_new = self._clusters.assign(self._texts[i], self._vector(i))
+        if is_new:
+            self._cluster_sessions.append(set())
+        self._cluster_sessions[rep].add(int(self._sessions[i]))
+        self._cluster_ids[i] = rep
+        return is_new
+
+    def _row(self, i: int) -> Dict[str, Any]:
+        turn = int(self._turns[i])
+        return {
+            "text": self._texts[i],
+            "run_id": self._run_names.values[self._runs[i]],
+            "session_id": self._session_names.values[self._sessions[i]],
+            "turn_index": None if turn < 0 else turn,
+            "ts": _iso(self._ts[i]),
+        }
+
+    def add(
+        self,
+        text: str,
+        embedding,
+        run_id: Optional[str],
+        session_id: Optional[str],
+        turn_index: int,
+    ) -> None:
+        code, scale = quantize(embedding)
+        now = datetime.now(timezone.utc)
+        meta = {
+            "text": text,
+            "run_id": run_id,
+            "session_id": session_id,
+            "turn_index": turn_index,
+            "ts": now.replace(tzinfo=None).isoformat(),
+        }
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(code.shape[0])
+            if code.shape[0] != self.dim:
+                raise ValueError(f"Embedding dim {code.shape[0]} != corpus dim {self.dim}")
+            if self._n == self._codes.shape[0]:
+                self._resize(max(1024, self._n * 2))
+            i = self._n
+            self._codes[i] = code
+            self._scales[i] = scale
+            self._set_meta(i, text, run_id, session_id, turn_index, now.timestamp())
+            self._n += 1
+            is_new = self._cluster(i)
+            self._append_files(code, scale, meta)
+            self._append_clusters(self._cluster_ids[i : i + 1], [i] if is_new else [])
+
+    # ---------- queries ----------
+
+    def _scores(self, query) -> np.ndarray:
+        """Cosine similarity of the query against every stored question (block-wise dequantization)."""
+        q = np.asarray(query, dtype=np.float32)
+        q = q / (np.linalg.norm(q) + 1e-12)
+        out = np.empty(self._n, dtype=np.float32)
+        for start in range(0, self._n, SCAN_BLOCK_ROWS):
+            end = min(start + SCAN_BLOCK_ROWS, self._n)
+            out[start:end] = (self._codes[start:end].astype(np.float32) @ q) * self._scales[start:end]
+        return out
+
+    def nearest(self, query, k: int = 10) -> List[Dict[str, Any]]:
+        """The k most similar stored questions, best first."""
+        with self._lock:
+            if not self._n:
+                return []
+            scores = self._scores(query)
+            k = min(k, self._n)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [{**self._row(i), "similarity": float(scores[i])} for i in top]
+
+    def frequency(self, query, threshold: Optional[float] = None) -> Dict[str, Any]:
+        """How often questions similar to `query` (cosine >= threshold) were asked, across runs/sessions."""
+        threshold = self.threshold if threshold is None else threshold
+        with self._lock:
+            if not self._n:
+                return {"matches": 0, "sessions": 0, "runs": 0, "total_questions": 0, "examples": []}
+            scores = self._scores(query)
+            hits = np.flatnonzero(scores >= threshold)
+            hits = hits[np.argsort(-scores[hits])]
+            return {
+                "matches": int(len(hits)),
+                "sessions": int(len(np.unique(self._sessions[hits]))),
+                "runs": int(len(np.unique(self._runs[hits]))),
+                "total_questions": self._n,
+                "examples": [{**self._row(i), "similarity": float(scores[i])} for i in hits[:5]],
+            }
+
+    def top_repeated(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most-asked question clusters: representative text, times asked, distinct sessions."""
+        with self._lock:
+            counts = self._clusters.counts
+            order = sorted(range(len(counts)), key=lambda c: -counts[c])[:limit]
+            return [
+                {"Q": self._clusters.rep_texts[c], "n": counts[c], "sessions": len(self._cluster_sessions[c])}
+                for c in order
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "questions": self._n,
+                "clusters": len(self._cluster_sessions),
+                "sessions": len(self._session_names.values),
+                "runs": len(self._run_names.values),
+                "dim": self.dim,
+                "bytes": int(self._n * ((self.dim or 0) + 4)),
+            }
+
+
+# Convenience singleton shared by orchestrators and routes
+_corpus_singleton: Optional[QuestionCorpus] = None
+_corpus_lock = threading.Lock()
+
+
+def get_question_corpus() -> QuestionCorpus:
+    global _corpus_singleton
+
+    with _corpus_lock:
+        if _corpus_singleton is None:
+            _corpus_singleton = QuestionCorpus(QUESTION_CORPUS_DIR)
+        return _corpus_singleton
@@ -1,7 +1,8 @@
 """System prompt and message builder for the persona driver and log checker."""
 
 import json
-from typing import TYPE_CHECKING, Any
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Optional
 
 if TYPE_CHECKING:
     from app.config.types import Turn
@@ -157,14 +158,22 @@ Rules:
 
 
 
-def build_driver_messages(
-    persona: dict,
-    last_assistant: str,
-    recent_turns: list["Turn"],
-) -> list[dict]:
-    """Build messages for the GPT-4o driver: system + persona context + recent turns + last assistant."""
-    messages = [
-        {"role": "system", "content": DRIVER_SYSTEM_PROMPT},
+# rendered once: byte-identical system message on every driver call
+DRIVER_SYSTEM: str = DRIVER_SYSTEM_PROMPT.replace("{fields}", fields).strip() + "\n"
+
+
+@lru_cache(maxsize=256)
+def _persona_preamble(persona_json: str) -> tuple[dict, ...]:
+    """
+    System + persona + acknowledgement: the stable prefix of every driver request for one persona.
+    About 650 tokens for the default persona, under the provider's 1024-token prompt-caching
+    minimum, so it is not cached on its own; driver calls get cache hits only once the session's
+    history carries the prompt past that minimum (history is appended after this prefix, until
+    older turns start folding into the summary that follows it).
+    """
+    persona = json.loads(persona_json)
+    return (
+        {"role": "system", "content": DRIVER_SYSTEM},
         {
             "role": "user",
             "content": "Persona (use only this when answering):\n"
@@ -174,7 +183,25 @@ def build_driver_messages(
             "role": "assistant",
             "content": "Understood. I'll answer only what the agent asks, briefly and in character.",
         },
-    ]
+    )
+
+
+def persona_preamble(persona: dict) -> list[dict]:
+    """Cached persona preamble messages (copies, safe to extend)."""
+    return [dict(m) for m in _persona_preamble(json.dumps(persona, ensure_ascii=False, default=str))]
+
+
+def build_driver_messages(
+    persona: dict,
+    last_assistant: str,
+    recent_turns: list["Turn"],
+    summary: Optional[str] = None,
+) -> list[dict]:
+    """Build messages for the GPT-4o driver: system + persona context + [summary] + recent turns + last assistant."""
+    messages = persona_preamble(persona)
+    if summary:
+        # after the cached preamble, so the stable prefix is unchanged
+        messages.append({"role": "user", "content": "Earlier in the conversation (summary):\n" + summary})
     for t in recent_turns:
         messages.append({"role": t.role, "content": t.content})
     messages.append({"role": "assistant", "content": last_assistant})
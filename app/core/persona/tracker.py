@@ -1,6 +1,7 @@
 from __future__ import annotations
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 import re
+import threading
 import numpy as np
 
 from app.clients.embeddings import generate_embeddings
@@ -19,47 +20,105 @@ def cosine_sim_matrix(E: np.ndarray) -> np.ndarray:
     return En @ En.T  # (n,n)
 
 
-def deduplicate_questions(questions: List[str], threshold: float = 0.87) -> List[Dict[str, Dict[str, Any]]]:
+DUPLICATE_THRESHOLD: float = 0.87
+
+
+class QuestionDeduplicator:
+    """
+    Online form of deduplicate_questions: feed questions one at a time (e.g. one per turn).
+    Keeps an L2-normalized matrix of representative questions; each new question is
+    assigned to its most similar representative with one matrix-vector product, or becomes
+    a new representative if the best similarity is below `threshold`.
+    Same greedy semantics (and results) as the batch version. Thread-safe, so one instance
+    can also be shared across sessions.
+    """
+
+    def __init__(self, threshold: float = DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self._reps: Optional[np.ndarray] = None     # (capacity, dim), rows [:_n] in use
+        self._n = 0
+        self.counts: List[int] = []
+        self.rep_texts: List[str] = []
+        self._lock = threading.Lock()
+
+    def add(self, question: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Embed and assign one question; returns {"Q", "n"} of its representative if it is a repeat."""
+        q = question.strip() if question else ""
+        if not q:
+            return None
+        return self.add_embedding(q, generate_embeddings([q])[0])
+
+    def add_embedding(self, question: str, embedding) -> Optional[Dict[str, Any]]:
+        rep, is_new = self.assign(question, embedding)
+        if is_new:
+            return None
+        return {"Q": self.rep_texts[rep], "n": self.counts[rep]}
+
+    def assign(self, question: str, embedding) -> tuple[int, bool]:
+        """Assign one question; returns (representative index, whether it started a new representative)."""
+        v = np.asarray(embedding, dtype=np.float32)
+        v = v / (np.linalg.norm(v) + 1e-12)
+
+        with self._lock:
+            if self._n:
+                sims = self._reps[: self._n] @ v
+                best = int(np.argmax(sims))
+                if float(sims[best]) >= self.threshold:
+                    self.counts[best] += 1
+                    return best, False
+
+            if self._reps is None:
+                self._reps = np.empty((16, v.shape[0]), dtype=np.float32)
+            elif self._n == self._reps.shape[0]:
+                grown = np.empty((self._n * 2, self._reps.shape[1]), dtype=np.float32)
+                grown[: self._n] = self._reps[: self._n]
+                self._reps = grown
+            self._reps[self._n] = v
+            self._n += 1
+            self.counts.append(1)
+            self.rep_texts.append(question)
+            return self._n - 1, True
+
+    def restore(self, vectors: np.ndarray, rep_texts: List[str], counts: List[int]) -> None:
+        """Replace the state with saved representatives (same order as assign created them)."""
+        v = np.asarray(vectors, dtype=np.float32)
+        v = v / (np.linalg.norm(v, axis=1, keepdims=True) + 1e-12)
+        with self._lock:
+            self._reps = np.empty((max(16, len(v)), v.shape[1]), dtype=np.float32) if len(v) else None
+            if len(v):
+                self._reps[: len(v)] = v
+            self._n = len(v)
+            self.counts = list(counts)
+            self.rep_texts = list(rep_texts)
+
+    def duplicates(self) -> List[Dict[str, Dict[str, Any]]]:
+        """Representatives seen more than once, in the deduplicate_questions output format."""
+        with self._lock:
+            return [
+                {f"Quesion_{k+1}": {"Q": self.rep_texts[k], "n": self.counts[k]}}
+                for k in range(len(self.rep_texts))
+                if self.counts[k] > 1
+            ]
+
+
+def deduplicate_questions(questions: List[str], threshold: float = DUPLICATE_THRESHOLD) -> List[Dict[str, Dict[str, Any]]]:
     """
     Return only semantically duplicated questions (count > 1) at the end of the session.
     Each entry representative question and how many times similar versions appeared.
-    Apply it in the final step of Test 
+    Batch wrapper around QuestionDeduplicator (one embeddings call for all questions).
     """
     qs = [q.strip() for q in questions if q and q.strip()]
     if not qs:
         return []
 
     embs = np.array(generate_embeddings(qs), dtype=np.float32)  # batch :contentReference[oaicite:4]{index=4}
-    S = cosine_sim_matrix(embs)
-
-    # greedily assign each question to an existing representative
-    reps: List[int] = []
-    counts: List[int] = []
-    rep_texts: List[str] = []
-
-    for i, q in enumerate(qs):
-        if not reps:
-            reps.append(i); counts.append(1); rep_texts.append(q)
-            continue
-
-        best_rep = -1
-        best_sim = -1.0
-        for r_idx, r in enumerate(reps):
-            sim = float(S[i, r])
-            if sim > best_sim:
-                best_sim, best_rep = sim, r_idx
-
-        if best_sim >= threshold:
-            counts[best_rep] += 1
-        else:
-            reps.append(i); counts.append(1); rep_texts.append(q)
+
+    dedup = QuestionDeduplicator(threshold)
+    for q, e in zip(qs, embs):
+        dedup.add_embedding(q, e)
 
     # output in your requested format
-    return [
-        {f"Quesion_{k+1}": {"Q": rep_texts[k], "n": counts[k]}}
-        for k in range(len(rep_texts))
-        if counts[k] > 1
-    ]
+    return dedup.duplicates()
 
 
 
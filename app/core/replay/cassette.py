@@ -0,0 +1,242 @@
+"""Record/replay cassettes: one gzip JSONL file of a session's agent, logs API and OpenAI traffic."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import importlib
+import json
+import os
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Iterator, Literal, Optional
+
+import httpx
+
+from app.config.logger import get_logger
+from app.config.settings import CASSETTE_RECORD, CASSETTE_DIR
+
+logger = get_logger(__name__)
+
+CASSETTE_VERSION = 2
+
+# the cassette of the current session; asyncio tasks and asyncio.to_thread inherit it
+_current: ContextVar[Optional["Cassette"]] = ContextVar("cassette", default=None)
+
+
+class CassetteMiss(Exception):
+    """Replay found no recorded entry for a request."""
+
+
+def _digest(*parts: Any) -> str:
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+class Cassette:
+    """
+    Entries per channel, in call order:
+      - "sse":       message sent, session id, raw SSE lines read by ChatClient._parse_sse
+      - "logs":      LogsApiClient.fetch_logs query params and JSON payload
+      - "logs_wait": number of polls LogsReader.wait_for_logs made for one turn
+      - "openai":    create() kwargs and response of each chat / embeddings SDK call
+    Replay pops "sse" and "logs_wait" in order; "logs" and "openai" by a key of the
+    request (FIFO per key), so concurrent analyses and driver calls may interleave freely.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: Literal["record", "replay"],
+        meta: Optional[dict[str, Any]] = None,
+        allow_live: bool = False,
+    ):
+        self.path = path
+        self.mode = mode
+        self.meta: dict[str, Any] = dict(meta or {})
+        self.allow_live = allow_live        # replay: send requests without a recording to the network
+        self.entries: list[dict[str, Any]] = []
+        self.hits = 0
+        self.misses = 0
+        self._ordered: dict[str, deque] = defaultdict(deque)
+        self._keyed: dict[tuple[str, str], deque] = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    # ---------- record ----------
+
+    def record(self, channel: str, entry: dict[str, Any], key: Optional[str] = None) -> None:
+        item = {"ch": channel, **({"key": key} if key is not None else {}), **entry}
+        with self._lock:
+            self.entries.append(item)
+
+    def save(self) -> None:
+        """Write header + entries as gzip JSON lines (atomic rename)."""
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        header = {"cassette": CASSETTE_VERSION, "saved_at": datetime.utcnow().isoformat(), **self.meta}
+        tmp = self.path + ".tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            for item in (header, *self.entries):
+                f.write(json.dumps(item, ensure_ascii=False, separators=(",", ":"), default=str))
+                f.write("\n")
+        os.replace(tmp, self.path)
+        logger.info(f"Cassette saved: {self.path} ({len(self.entries)} entries)")
+
+    # ---------- replay ----------
+
+    @classmethod
+    def load(cls, path: str, allow_live: bool = False) -> "Cassette":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+        if not lines or lines[0].get("cassette") != CASSETTE_VERSION:
+            raise ValueError(f"{path} is not a version {CASSETTE_VERSION} cassette")
+        header = lines[0]
+        cassette = cls(path, "replay", meta={k: v for k, v in header.items() if k not in ("cassette", "saved_at")},
+                       allow_live=allow_live)
+        cassette.entries = lines[1:]
+        for item in cassette.entries:
+            if "key" in item:
+                cassette._keyed[(item["ch"], item["key"])].append(item)
+            else:
+                cassette._ordered[item["ch"]].append(item)
+        return cassette
+
+    def _pop(self, queue: Optional[deque]) -> Optional[dict[str, Any]]:
+        with self._lock:
+            if queue:
+                self.hits += 1
+                return queue.popleft()
+            self.misses += 1
+            return None
+
+    def next(self, channel: str) -> Optional[dict[str, Any]]:
+        """The next unplayed entry of an ordered channel (None if exhausted)."""
+        return self._pop(self._ordered.get(channel))
+
+    def take(self, channel: str, key: str) -> Optional[dict[str, Any]]:
+        """The next unplayed entry recorded under `key` (None if there is none)."""
+        return self._pop(self._keyed.get((channel, key)))
+
+    def pending(self, channel: str) -> list[dict[str, Any]]:
+        """Unplayed entries of an ordered channel, in order."""
+        with self._lock:
+            return list(self._ordered.get(channel, ()))
+
+    def stats(self) -> dict[str, Any]:
+        channels: dict[str, int] = defaultdict(int)
+        for item in self.entries:
+            channels[item["ch"]] += 1
+        return {"path": self.path, "mode": self.mode, "entries": dict(channels), "hits": self.hits, "misses": self.misses}
+
+
+def current_cassette() -> Optional[Cassette]:
+    return _current.get()
+
+
+def replaying() -> bool:
+    cassette = _current.get()
+    return cassette is not None and cassette.replaying
+
+
+def logs_key(params: dict[str, Any]) -> str:
+    return _digest(params)
+
+
+@contextmanager
+def use_cassette(cassette: Optional[Cassette]) -> Iterator[Optional[Cassette]]:
+    """Make `cassette` current in this context; a recording is saved on exit (even after errors)."""
+    if cassette is None:
+        yield None
+        return
+    token = _current.set(cassette)
+    try:
+        yield cassette
+    finally:
+        _current.reset(token)
+        if cassette.recording:
+            try:
+                cassette.save()
+            except Exception as e:
+                logger.error(f"Failed to save cassette {cassette.path}: {e}")
+
+
+def session_cassette(name: str, meta: dict[str, Any]) -> Optional[Cassette]:
+    """A new recording under CASSETTE_DIR if CASSETTE_RECORD is on (and no cassette is active)."""
+    if not CASSETTE_RECORD or _current.get() is not None:
+        return None
+    return Cassette(os.path.join(CASSETTE_DIR, f"{name}.jsonl.gz"), "record", meta=meta)
+
+
+# ---------- agent SSE stream ----------
+
+class RecordedStream:
+    """
+    Stands in for the httpx response in ChatClient._parse_sse: replays recorded lines,
+    or (with `source`) passes the live lines through and keeps a copy in `lines`.
+    """
+
+    def __init__(self, lines: Optional[list[str]] = None, source: Optional[httpx.Response] = None):
+        self.lines = list(lines or [])
+        self.source = source
+
+    async def aiter_lines(self):
+        if self.source is None:
+            for line in self.lines:
+                yield line
+            return
+        async for line in self.source.aiter_lines():
+            if line:
+                self.lines.append(line)
+            yield line
+
+
+# ---------- OpenAI calls ----------
+
+def openai_key(endpoint: str, request: dict[str, Any]) -> str:
+    """Key of one SDK call: the endpoint ("chat", "embeddings") and the create() kwargs."""
+    return _digest(endpoint, request)
+
+
+def _response_class(name: str) -> type:
+    module, _, qualname = name.rpartition(".")
+    return getattr(importlib.import_module(module), qualname)
+
+
+def replay_openai(cassette: Cassette, endpoint: str, request: dict[str, Any]) -> Optional[Any]:
+    """
+    The recorded response of a create() call, rebuilt as the SDK's response model;
+    None if it was not recorded and the cassette allows live calls.
+    """
+    key = openai_key(endpoint, request)
+    entry = cassette.take("openai", key)
+    if entry is None:
+        if cassette.allow_live:
+            return None
+        logger.error(f"Cassette miss: {endpoint} call ({key}) not in {cassette.path}")
+        raise CassetteMiss(f"No recorded response for the {endpoint} call ({key})")
+    return _response_class(entry["type"]).model_validate(entry["response"])
+
+
+def record_openai(cassette: Cassette, endpoint: str, request: dict[str, Any], response: Any) -> None:
+    response_type = type(response)
+    cassette.record(
+        "openai",
+        {
+            "endpoint": endpoint,
+            "request": request,
+            "type": f"{response_type.__module__}.{response_type.__qualname__}",
+            "response": response.model_dump(mode="json"),
+        },
+        key=openai_key(endpoint, request),
+    )
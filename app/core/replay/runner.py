@@ -0,0 +1,172 @@
+"""Offline replay of recorded sessions: the whole report orchestrator, or only the log analysis stage."""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import sys
+import time
+from dataclasses import asdict
+from typing import Any, Optional
+
+from app.config.types import RunReport
+from app.config.settings import (
+    LOGS_API_URL, LOGS_LIMIT, LOGS_EXPECTED_TYPES, OPENAI_MODEL, TIMEOUT_SEC, ANALYSIS_BATCH_MAX_TURNS,
+)
+from app.clients.chat_client import ChatClient
+from app.clients.logs_client import LogsApiClient, _cursor_support
+from app.core.logs.reader import LogsReader
+from app.core.persona.tracker import is_question, stop_condition, extract_last_question
+from app.core.replay.cassette import Cassette, use_cassette
+
+from app.config.logger import get_logger
+
+logger = get_logger(__name__)
+
+# the agent is never contacted during a replay
+REPLAY_API_URL = "cassette://agent"
+
+
+def _restore_cursor_support(cassette: Cassette) -> None:
+    """Start from the logs API cursor support known when the session was recorded (same requests)."""
+    logs_api_url = cassette.meta.get("logs_api_url", LOGS_API_URL)
+    known = cassette.meta.get("logs_cursor_support")
+    if known is None:
+        _cursor_support.pop(logs_api_url, None)
+    else:
+        _cursor_support[logs_api_url] = known
+
+
+async def replay_session(path: str, allow_live: bool = False) -> tuple[RunReport, dict[str, Any]]:
+    """
+    Re-run report_orchestrator on a cassette: agent responses, logs and OpenAI answers come
+    from the recording, polls and rate limits do not wait. Returns the report and cassette stats.
+    """
+    from app.core.llm.driver import LLMDriver
+    from app.core.orchestration.report import report_orchestrator
+
+    cassette = Cassette.load(path, allow_live=allow_live)
+    meta = cassette.meta
+    _restore_cursor_support(cassette)
+    with use_cassette(cassette):
+        chat = ChatClient(REPLAY_API_URL, meta["user_id"], TIMEOUT_SEC, 1)
+        orchestrator = report_orchestrator(
+            chat, LLMDriver(OPENAI_MODEL), meta["max_turns"], meta["max_total_seconds"], meta["analysis_mode"],
+            logs_api_url=meta.get("logs_api_url", LOGS_API_URL),
+        )
+        report = await orchestrator.run(
+            meta["initial_user_message"],
+            meta["initial_real_estate_message"],
+            persona=meta["persona"],
+            run_id=meta["run_id"],
+            session_id=meta["session_id"],
+        )
+    return report, cassette.stats()
+
+
+async def replay_analysis(path: str, allow_live: bool = False) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """
+    Re-run only the analysis stage on a cassette: per turn, the recorded agent response and
+    logs go through LogsReader (prepare_logs), LogAnalyser (the Logs checker prompt) and the
+    tracker heuristics. The driver's replies are not regenerated; the recorded messages are used.
+    """
+    from app.core.logs.analyser import LogAnalyser
+
+    cassette = Cassette.load(path, allow_live=allow_live)
+    meta = cassette.meta
+    _restore_cursor_support(cassette)
+    turns: list[dict[str, Any]] = []
+    with use_cassette(cassette):
+        chat = ChatClient(REPLAY_API_URL, meta["user_id"], TIMEOUT_SEC, 1)
+        reader = LogsReader(LogsApiClient(meta.get("logs_api_url", LOGS_API_URL), TIMEOUT_SEC, 1))
+        analyser = LogAnalyser()
+        session_id: Optional[str] = meta["session_id"]
+        assistant_text = meta["initial_real_estate_message"]
+
+        for turn_index, entry in enumerate(cassette.pending("sse")):
+            result = await chat.send_message(entry["content"], entry["session_id"])
+            session_id = result.session_id or session_id
+            poll = await reader.wait_for_logs(
+                user_id=meta["user_id"],
+                session_id=session_id,
+                limit=LOGS_LIMIT,
+                expected=LOGS_EXPECTED_TYPES,
+            )
+            reply = result.assistant_text.strip()
+            turns.append({
+                "index": turn_index,
+                "assistant": assistant_text,
+                "user": entry["content"],
+                "logs": poll.logs,
+                "logs_complete": poll.complete,
+                "reply": reply,
+                "is_question": is_question(reply),
+                "stop_condition": stop_condition(reply),
+                "last_question": extract_last_question(reply),
+            })
+            assistant_text = reply
+
+        items = [(t["assistant"], t["user"], t["logs"]) for t in turns]
+        if meta.get("analysis_mode") == "batched":
+            for start in range(0, len(items), ANALYSIS_BATCH_MAX_TURNS):
+                chunk = turns[start:start + ANALYSIS_BATCH_MAX_TURNS]
+                try:
+                    verdicts = await asyncio.to_thread(analyser.analyse_batch, items[start:start + len(chunk)])
+                except Exception as e:
+                    verdicts = [f"error: {e}"] * len(chunk)
+                for turn, verdict in zip(chunk, verdicts):
+                    turn["logs_report"] = verdict
+        else:
+            for turn, (last_assistant, user_response, logs) in zip(turns, items):
+                try:
+                    turn["logs_report"] = await asyncio.to_thread(analyser.analyse, last_assistant, user_response, logs)
+                except Exception as e:
+                    turn["logs_report"] = f"error: {e}"
+    return turns, cassette.stats()
+
+
+def _cassette_paths(paths: list[str]) -> list[str]:
+    out: list[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            out += sorted(glob.glob(os.path.join(path, "*.jsonl.gz")))
+        else:
+            out.append(path)
+    return out
+
+
+async def _main(args: argparse.Namespace) -> int:
+    failures = 0
+    sink = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    for path in _cassette_paths(args.paths):
+        started = time.perf_counter()
+        try:
+            if args.analysis_only:
+                turns, stats = await replay_analysis(path, args.allow_live)
+                out = {"cassette": path, "turns": turns}
+            else:
+                report, stats = await replay_session(path, args.allow_live)
+                out = {"cassette": path, "report": asdict(report)}
+        except Exception as e:
+            failures += 1
+            logger.error(f"Replay of {path} failed: {e}")
+            out, stats = {"cassette": path, "error": str(e)}, {}
+        out["stats"] = {**stats, "replay_sec": round(time.perf_counter() - started, 3)}
+        print(json.dumps(out, ensure_ascii=False, default=str), file=sink, flush=True)
+    if args.out:
+        sink.close()
+    return 1 if failures else 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("paths", nargs="+", help="cassette files or directories of *.jsonl.gz cassettes")
+    parser.add_argument("--analysis-only", action="store_true", help="replay logs + analysis + tracker only")
+    parser.add_argument("--out", help="write the JSON lines here instead of stdout (logs go to stdout)")
+    parser.add_argument("--allow-live", action="store_true", help="send unrecorded OpenAI requests (e.g. an edited prompt)")
+    return asyncio.run(_main(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
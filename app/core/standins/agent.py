@@ -0,0 +1,156 @@
+"""Stand-in real-estate agent: SSE chat endpoint plus the logs API fed by its turns."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Optional
+from uuid import uuid4
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.core.logs.rules import NON_ANSWERS
+
+AGENT_QUESTIONS: tuple[str, ...] = (
+    "What's your budget for the purchase?",
+    "How many bedrooms do you need?",
+    "Which area or neighborhood are you focusing on?",
+    "When are you planning to buy?",
+    "How much do you have saved for a down payment?",
+    "What monthly payment would you be comfortable with?",
+    "Is a quiet environment important to you?",
+    "Do you need to be close to schools or your workplace?",
+)
+FILLER = "Thanks for sharing that, it helps me understand your situation. "
+SUMMARY = (
+    "Based on our conversation, here is a summary of what you are looking for. "
+    "I've gathered all the information I need to start the search."
+)
+
+
+@dataclass
+class AgentConfig:
+    """Shape and timing of the stand-in agent's responses and logs."""
+    ttfb_sec: float = 0.0               # request received -> first SSE event
+    deltas: int = 20                    # content deltas per response
+    delta_chars: int = 12
+    delta_interval_sec: float = 0.0     # between deltas
+    jitter: float = 0.0                 # +/- fraction applied to every delay
+    summary_after: int = 6              # the N-th message of a session gets the closing summary
+    new_session_ids: bool = False       # assign a session id instead of echoing the client's
+    error_rate: float = 0.0             # fraction of messages answered with HTTP 500
+    logs_delay_sec: float = 0.0         # a turn's logs become visible this long after its stream ends
+    log_prompt_chars: int = 2000        # size of the `prompt` column of each main_model row
+    seed: Optional[int] = None
+
+
+class LogStore:
+    """In-memory logs table, indexed by (user_id, session_id); rows are visible once their time has come."""
+
+    def __init__(self):
+        self._rows: dict[tuple[str, str], list[dict[str, Any]]] = {}
+        self._ids = itertools.count(1)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def add(self, user_id: str, session_id: str, rows: list[dict[str, Any]], visible_at: float) -> None:
+        with self._lock:
+            table = self._rows.setdefault((user_id, session_id), [])
+            for row in rows:
+                table.append({"id": next(self._ids), "_visible_at": visible_at, **row})
+            self._size += len(rows)
+
+    def query(self, user_id: str, session_id: str, limit: int, since_id: Optional[int]) -> list[dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            rows = [r for r in self._rows.get((user_id, session_id), ()) if r["_visible_at"] <= now]
+        if since_id is not None:
+            rows = [r for r in rows if r["id"] > since_id][:limit]
+        else:
+            rows = rows[-limit:][::-1]      # newest first, like the real endpoint without a cursor
+        return [{k: v for k, v in r.items() if k != "_visible_at"} for r in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._size
+
+
+class StandInAgent:
+    """Routes of the agent (`POST /chat`) and of its logs API (`GET /logs/api`)."""
+
+    def __init__(self, config: AgentConfig):
+        self.config = config
+        self.logs = LogStore()
+        self.messages = 0
+        self._turns: dict[str, int] = {}
+        self._rng = random.Random(config.seed)
+        self.router = APIRouter()
+        self.router.add_api_route("/chat", self.chat, methods=["POST"])
+        self.router.add_api_route("/logs/api", self.logs_api, methods=["GET"])
+
+    def _delay(self, seconds: float) -> float:
+        if seconds <= 0 or not self.config.jitter:
+            return max(0.0, seconds)
+        return max(0.0, seconds * (1 + self._rng.uniform(-self.config.jitter, self.config.jitter)))
+
+    def _reply(self, turn: int) -> str:
+        config = self.config
+        if turn >= config.summary_after:
+            return SUMMARY
+        question = AGENT_QUESTIONS[(turn - 1) % len(AGENT_QUESTIONS)]
+        size = max(len(question), config.deltas * config.delta_chars)
+        filler = (FILLER * (size // len(FILLER) + 1))[: size - len(question)]
+        return filler + question
+
+    def _log_rows(self, user_id: str, session_id: str, content: str, reply: str) -> list[dict[str, Any]]:
+        answered = content.strip().strip(".!").lower() not in NON_ANSWERS
+        extract = [{"qid": f"q{self._turns[session_id]}", "answer": content}] if answered else []
+        base = {"user_id": user_id, "session_id": session_id, "error_message": None}
+        memory = f"- {content}\n"
+        return [
+            {**base, "log_type": "intent_classifier", "response": "general_chat", "prompt": content},
+            {
+                **base,
+                "log_type": "main_model",
+                "prompt": "### WHAT YOU REMEMBER\n" + memory * max(1, self.config.log_prompt_chars // len(memory)),
+                "response": f"{reply}\n<!--EXTRACT:{json.dumps(extract)}-->",
+            },
+        ]
+
+    async def chat(self, request: Request):
+        body = await request.json()
+        user_id = str(body.get("userId") or "")
+        content = str(body.get("content") or "")
+        session_id = body.get("session_id")
+        if not session_id or (self.config.new_session_ids and session_id not in self._turns):
+            session_id = f"sess-{uuid4()}"
+        self.messages += 1
+        if self.config.error_rate and self._rng.random() < self.config.error_rate:
+            return JSONResponse({"error": "stand-in failure"}, status_code=500)
+
+        turn = self._turns[session_id] = self._turns.get(session_id, 0) + 1
+        reply = self._reply(turn)
+        rows = self._log_rows(user_id, session_id, content, reply)
+        step = max(1, -(-len(reply) // max(1, self.config.deltas)))
+
+        async def events() -> AsyncIterator[str]:
+            await asyncio.sleep(self._delay(self.config.ttfb_sec))
+            yield f"data: {json.dumps({'type': 'session', 'session_id': session_id})}\n\n"
+            for start in range(0, len(reply), step):
+                if start:
+                    await asyncio.sleep(self._delay(self.config.delta_interval_sec))
+                yield f"data: {json.dumps({'type': 'content', 'delta': reply[start:start + step]})}\n\n"
+            self.logs.add(user_id, session_id, rows, time.monotonic() + self._delay(self.config.logs_delay_sec))
+            yield 'data: {"type": "done"}\n\n'
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def logs_api(self, user_id: str, session_id: str, limit: int = 200, since_id: Optional[int] = None):
+        rows = self.logs.query(user_id, session_id, limit, since_id)
+        return {"success": True, "logs": rows, "count": len(rows)}
@@ -0,0 +1,105 @@
+"""Stand-in OpenAI API: chat completions (buyer replies and log verdicts) and embeddings."""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from itertools import count
+from typing import Any
+
+import numpy as np
+from fastapi import APIRouter, Request
+
+from app.core.llm.replies import FALLBACK_REPLIES
+from app.core.llm.tokens import estimate_tokens
+
+# a normal-path verdict in the Logs_checker_prompt output format
+VERDICT: dict[str, Any] = {
+    "normal_path": True,
+    "Log_error": None,
+    "actual": ["intent_classifier", "main_model", "extraction_model"],
+    "intent_response": "general_chat",
+    "extraction_answers": None,
+    "Lost_expected_logs": {"log_type": [], "reason": None},
+    "unexpected_logs": {"log_type": [], "reason": None},
+}
+_BATCH = re.compile(r"You are checking (\d+) turns")
+
+
+@dataclass
+class OpenAIConfig:
+    latency_sec: float = 0.0            # per request
+    embedding_dim: int = 1536
+
+
+class StandInOpenAI:
+    """
+    Routes under /v1. Completions at temperature 0 are log checks and get a normal-path
+    verdict (a JSON array of them for batched checks); other completions are buyer replies.
+    Embeddings are deterministic per text, so repeated questions are exact duplicates.
+    """
+
+    def __init__(self, config: OpenAIConfig):
+        self.config = config
+        self.requests = 0
+        self._replies = count()
+        self.router = APIRouter(prefix="/v1")
+        self.router.add_api_route("/chat/completions", self.chat_completions, methods=["POST"])
+        self.router.add_api_route("/embeddings", self.embeddings, methods=["POST"])
+
+    def _embed(self, text: str, encoding_format: str) -> Any:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.config.embedding_dim, dtype=np.float32)
+        if encoding_format == "base64":
+            # what the SDK asks for by default: little-endian float32 bytes
+            return base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii")
+        return vector.tolist()
+
+    async def chat_completions(self, request: Request):
+        body = await request.json()
+        self.requests += 1
+        if self.config.latency_sec > 0:
+            await asyncio.sleep(self.config.latency_sec)
+        messages = body.get("messages") or []
+        prompt = "".join(str(m.get("content") or "") for m in messages)
+        if body.get("temperature") == 0:
+            batch = _BATCH.search(prompt)
+            content = json.dumps([VERDICT] * int(batch.group(1)) if batch else VERDICT)
+        else:
+            content = FALLBACK_REPLIES[next(self._replies) % len(FALLBACK_REPLIES)]
+        prompt_tokens, completion_tokens = estimate_tokens(prompt), estimate_tokens(content)
+        return {
+            "id": f"chatcmpl-standin-{self.requests}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body.get("model", ""),
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    async def embeddings(self, request: Request):
+        body = await request.json()
+        self.requests += 1
+        if self.config.latency_sec > 0:
+            await asyncio.sleep(self.config.latency_sec)
+        texts = body.get("input") or []
+        texts = [texts] if isinstance(texts, str) else texts
+        tokens = sum(estimate_tokens(str(t)) for t in texts)
+        encoding_format = body.get("encoding_format") or "float"
+        return {
+            "object": "list",
+            "model": body.get("model", ""),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": self._embed(str(t), encoding_format)}
+                for i, t in enumerate(texts)
+            ],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
@@ -0,0 +1,100 @@
+"""Serve the stand-in agent, logs API and OpenAI API from a background thread of this process."""
+
+from __future__ import annotations
+
+import os
+import socket
+import threading
+import time
+from typing import Optional
+
+import uvicorn
+from fastapi import FastAPI
+
+from app.config.logger import get_logger
+from app.core.standins.agent import AgentConfig, StandInAgent
+from app.core.standins.openai_api import OpenAIConfig, StandInOpenAI
+
+logger = get_logger(__name__)
+
+# stand-in OpenAI key, used only if none is configured
+STANDIN_API_KEY = "sk-standin"
+
+
+class StandInServers:
+    """
+    One local HTTP server (127.0.0.1, free port) with the three stand-ins:
+      - api_url:         POST  .../chat       SSE agent (AgentConfig)
+      - logs_api_url:    GET   .../logs/api   logs written by the agent's turns
+      - openai_base_url: POST  .../v1/...     chat completions and embeddings (OpenAIConfig)
+    Use as a context manager. While it runs, OPENAI_BASE_URL points at it (and OPENAI_API_KEY
+    is set if missing); OpenAI clients are cached per process, so enter it before the first one
+    is created and keep one instance per process (swap `agent.config` / `openai.config` to
+    change the stand-ins' behaviour between runs).
+    """
+
+    def __init__(self, agent: Optional[AgentConfig] = None, openai: Optional[OpenAIConfig] = None):
+        self.agent = StandInAgent(agent or AgentConfig())
+        self.openai = StandInOpenAI(openai or OpenAIConfig())
+        self.app = FastAPI(title="AI_Tester stand-ins", docs_url=None, redoc_url=None, openapi_url=None)
+        self.app.include_router(self.agent.router)
+        self.app.include_router(self.openai.router)
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+        self._env: dict[str, Optional[str]] = {}
+        self.base_url = ""
+
+    @property
+    def api_url(self) -> str:
+        return f"{self.base_url}/chat"
+
+    @property
+    def logs_api_url(self) -> str:
+        return f"{self.base_url}/logs/api"
+
+    @property
+    def openai_base_url(self) -> str:
+        return f"{self.base_url}/v1"
+
+    def start(self, timeout_sec: float = 10.0) -> "StandInServers":
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("127.0.0.1", 0))
+        self.base_url = f"http://127.0.0.1:{sock.getsockname()[1]}"
+        config = uvicorn.Config(self.app, log_level="warning", access_log=False, lifespan="off")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(
+            target=self._server.run, kwargs={"sockets": [sock]}, name="standin-servers", daemon=True,
+        )
+        self._thread.start()
+        deadline = time.monotonic() + timeout_sec
+        while not self._server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("Stand-in servers failed to start")
+            time.sleep(0.01)
+
+        for name, value in (("OPENAI_BASE_URL", self.openai_base_url), ("OPENAI_API_KEY", STANDIN_API_KEY)):
+            self._env[name] = os.environ.get(name)
+            if name == "OPENAI_BASE_URL" or not os.environ.get(name):
+                os.environ[name] = value
+        logger.info(f"Stand-in servers listening on {self.base_url}")
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+        for name, value in self._env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        self._env.clear()
+        self._server = self._thread = None
+
+    def __enter__(self) -> "StandInServers":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,363 @@
+"""Persistent, indexed store of run reports and their turns (SQLite, batched background writes)."""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Optional
+
+from app.config.types import RunReport
+from app.config.logger import get_logger
+from app.config.settings import (
+    RUN_STORE_ENABLED,
+    RUN_STORE_PATH,
+    RUN_STORE_RETENTION_DAYS,
+    RUN_STORE_MAX_RUNS,
+    RUN_STORE_BATCH_SIZE,
+    RUN_STORE_FLUSH_SEC,
+    RUN_STORE_COMPACT_EVERY_SEC,
+)
+
+logger = get_logger(__name__)
+
+AUTO_VACUUM_INCREMENTAL = 2     # PRAGMA auto_vacuum value
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id        TEXT,
+    session_id    TEXT,
+    user_id       TEXT,
+    agent_url     TEXT,
+    kind          TEXT NOT NULL,
+    success       INTEGER NOT NULL,
+    error         TEXT,
+    final_summary TEXT,
+    duplicate     TEXT,
+    n_turns       INTEGER NOT NULL,
+    started_at    REAL NOT NULL,
+    ended_at      REAL NOT NULL,
+    extra         TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_run_id     ON runs(run_id);
+CREATE INDEX IF NOT EXISTS runs_session_id ON runs(session_id);
+CREATE INDEX IF NOT EXISTS runs_user_id    ON runs(user_id);
+CREATE INDEX IF NOT EXISTS runs_agent_time ON runs(agent_url, started_at);
+CREATE INDEX IF NOT EXISTS runs_started_at ON runs(started_at);
+
+CREATE TABLE IF NOT EXISTS turns (
+    run_pk        INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    idx           INTEGER NOT NULL,
+    role          TEXT NOT NULL,
+    content       TEXT,
+    ts            REAL,
+    logs_report   TEXT,
+    my_log        TEXT,
+    extra         TEXT,
+    PRIMARY KEY (run_pk, idx)
+) WITHOUT ROWID;
+"""
+
+RUN_COLUMNS = (
+    "id", "run_id", "session_id", "user_id", "agent_url", "kind", "success", "error",
+    "final_summary", "duplicate", "n_turns", "started_at", "ended_at", "extra",
+)
+# Turn fields with their own column; any other field goes into `extra` as JSON
+TURN_FIELDS = ("role", "content", "ts", "logs_report", "my_log", "user_id", "session_id")
+RUN_FIELDS = (
+    "run_id", "session_id", "user_id", "success", "error", "final_summary",
+    "duplicate", "started_at", "ended_at", "turns",
+)
+
+
+def _ts(value: Optional[datetime]) -> Optional[float]:
+    return value.timestamp() if isinstance(value, datetime) else None
+
+
+def _iso(value: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(value).isoformat() if value is not None else None
+
+
+def _json(value: Any) -> Optional[str]:
+    return None if value is None else json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _load(value: Optional[str]) -> Any:
+    return None if value is None else json.loads(value)
+
+
+class RunStore:
+    """
+    Keeps every RunReport with its turns (my_log, logs_report) and duplicates in SQLite,
+    indexed by run_id, session_id, user_id, agent endpoint and start time.
+
+    `save()` only enqueues: a writer thread commits queued reports in batches (up to
+    `batch_size` or every `flush_sec`), so the conversation loop never waits on disk.
+    Retention (age and count) and incremental vacuum run every `compact_every_sec`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        retention_days: float = RUN_STORE_RETENTION_DAYS,
+        max_runs: int = RUN_STORE_MAX_RUNS,
+        batch_size: int = RUN_STORE_BATCH_SIZE,
+        flush_sec: float = RUN_STORE_FLUSH_SEC,
+        compact_every_sec: float = RUN_STORE_COMPACT_EVERY_SEC,
+    ):
+        self.path = path
+        self.retention_days = retention_days
+        self.max_runs = max_runs
+        self.batch_size = batch_size
+        self.flush_sec = flush_sec
+        self.compact_every_sec = compact_every_sec
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._db = self._connect()
+        if self._db.execute("PRAGMA auto_vacuum").fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+            # a store created without it: VACUUM once so incremental_vacuum can return space
+            logger.info(f"Run store {path}: enabling incremental auto_vacuum (one-off VACUUM)")
+            self._db.execute("VACUUM")
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+        self._read_lock = threading.Lock()
+
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._last_compact = time.monotonic()
+        self._writer = threading.Thread(target=self._write_loop, name="run-store-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        # before anything initialises a new file (journal_mode does): fixed at creation
+        db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("PRAGMA foreign_keys=ON")
+        return db
+
+    # ---------- writes ----------
+
+    def save(self, report: RunReport, kind: str, agent_url: Optional[str] = None) -> None:
+        """Queue a finished report for storage (non-blocking)."""
+        self._queue.put((report, kind, agent_url))
+
+    def _write_loop(self) -> None:
+        db = self._connect()
+        closing = False
+        while not closing:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self.flush_sec)
+                if item is None:
+                    closing = True
+                else:
+                    batch.append(item)
+                while len(batch) < self.batch_size and not closing:
+                    item = self._queue.get_nowait()
+                    if item is None:
+                        closing = True
+                    else:
+                        batch.append(item)
+            except queue.Empty:
+                pass
+
+            if batch:
+                try:
+                    with db:
+                        for report, kind, agent_url in batch:
+                            self._insert(db, report, kind, agent_url)
+                    logger.info(f"Run store: wrote {len(batch)} reports")
+                except Exception as e:
+                    logger.error(f"Run store: failed to write {len(batch)} reports: {e}")
+
+            if time.monotonic() - self._last_compact >= self.compact_every_sec:
+                self._compact(db)
+        db.close()
+
+    @staticmethod
+    def _insert(db: sqlite3.Connection, report: RunReport, kind: str, agent_url: Optional[str]) -> None:
+        data = asdict(report)
+        extra = {k: v for k, v in data.items() if k not in RUN_FIELDS}
+        cur = db.execute(
+            "INSERT INTO runs (run_id, session_id, user_id, agent_url, kind, success, error, final_summary, "
+            "duplicate, n_turns, started_at, ended_at, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                report.run_id, report.session_id, report.user_id, agent_url, kind, int(bool(report.success)),
+                report.error, report.final_summary, _json(report.duplicate), len(report.turns),
+                _ts(report.started_at), _ts(report.ended_at), _json(extra or None),
+            ),
+        )
+        run_pk = cur.lastrowid
+        rows = []
+        for i, turn in enumerate(data["turns"]):
+            turn_extra = {k: v for k, v in turn.items() if k not in TURN_FIELDS and v is not None}
+            rows.append((
+                run_pk, i, turn["role"], turn["content"], _ts(turn["ts"]), turn["logs_report"],
+                _json(turn["my_log"]), _json(turn_extra or None),
+            ))
+        db.executemany(
+            "INSERT INTO turns (run_pk, idx, role, content, ts, logs_report, my_log, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def _compact(self, db: sqlite3.Connection) -> dict[str, int]:
+        """Drop runs past retention (age, then count) and return freed pages to the OS."""
+        self._last_compact = time.monotonic()
+        cutoff = time.time() - self.retention_days * 86400
+        try:
+            with db:
+                expired = db.execute("DELETE FROM runs WHERE started_at < ?", (cutoff,)).rowcount
+                over = db.execute(
+                    "DELETE FROM runs WHERE id IN (SELECT id FROM runs ORDER BY id DESC LIMIT -1 OFFSET ?)",
+                    (self.max_runs,),
+                ).rowcount
+            # through sqlite3_exec: a single execute() step frees only one page
+            db.executescript("PRAGMA incremental_vacuum;")
+            db.execute("PRAGMA optimize")
+            if expired or over:
+                logger.info(f"Run store compacted: {expired} expired, {over} over the {self.max_runs}-run limit")
+            return {"expired": expired, "over_limit": over}
+        except Exception as e:
+            logger.error(f"Run store compaction failed: {e}")
+            return {"expired": 0, "over_limit": 0}
+
+    def compact(self) -> dict[str, int]:
+        """Apply retention now (from the caller's thread)."""
+        with self._read_lock:
+            return self._compact(self._db)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Write everything still queued, then stop the writer."""
+        self._queue.put(None)
+        self._writer.join(timeout)
+        self._db.close()
+
+    # ---------- reads ----------
+
+    def _run_row(self, row: tuple) -> dict[str, Any]:
+        run = dict(zip(RUN_COLUMNS, row))
+        run["success"] = bool(run["success"])
+        run["duplicate"] = _load(run["duplicate"])
+        run["started_at"] = _iso(run["started_at"])
+        run["ended_at"] = _iso(run["ended_at"])
+        extra = _load(run.pop("extra")) or {}
+        return {**run, **extra}
+
+    def query(
+        self,
+        run_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        agent_url: Optional[str] = None,
+        kind: Optional[str] = None,
+        success: Optional[bool] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 50,
+        cursor: Optional[int] = None,
+    ) -> dict[str, Any]:
+        """Run summaries (no turns), newest first; pass `next_cursor` back as `cursor` for the next page."""
+        where, params = [], []
+        for column, value in (
+            ("run_id", run_id), ("session_id", session_id), ("user_id", user_id),
+            ("agent_url", agent_url), ("kind", kind),
+        ):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if success is not None:
+            where.append("success = ?")
+            params.append(int(success))
+        if since is not None:
+            where.append("started_at >= ?")
+            params.append(since.timestamp())
+        if until is not None:
+            where.append("started_at < ?")
+            params.append(until.timestamp())
+        if cursor is not None:
+            where.append("id < ?")
+            params.append(cursor)
+
+        sql = f"SELECT {', '.join(RUN_COLUMNS)} FROM runs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC LIMIT ?"
+        with self._read_lock:
+            rows = self._db.execute(sql, (*params, limit + 1)).fetchall()
+        runs = [self._run_row(r) for r in rows[:limit]]
+        return {"runs": runs, "next_cursor": runs[-1]["id"] if len(rows) > limit else None}
+
+    def get(self, id: int) -> Optional[dict[str, Any]]:
+        """One stored run with its turns."""
+        with self._read_lock:
+            row = self._db.execute(f"SELECT {', '.join(RUN_COLUMNS)} FROM runs WHERE id = ?", (id,)).fetchone()
+            if row is None:
+                return None
+            turn_rows = self._db.execute(
+                "SELECT role, content, ts, logs_report, my_log, extra FROM turns WHERE run_pk = ? ORDER BY idx",
+                (id,),
+            ).fetchall()
+        run = self._run_row(row)
+        run["turns"] = [
+            {
+                "role": role, "content": content, "ts": _iso(ts), "logs_report": logs_report,
+                "my_log": _load(my_log), **(_load(extra) or {}),
+            }
+            for role, content, ts, logs_report, my_log, extra in turn_rows
+        ]
+        return run
+
+    def stats(self) -> dict[str, Any]:
+        with self._read_lock:
+            runs, first, last = self._db.execute("SELECT COUNT(*), MIN(started_at), MAX(started_at) FROM runs").fetchone()
+            turns = self._db.execute("SELECT COUNT(*) FROM turns").fetchone()[0]
+        return {"runs": runs, "turns": turns, "oldest": _iso(first), "newest": _iso(last), "queued": self._queue.qsize()}
+
+
+# Convenience singleton shared by routes and the application lifespan
+_store_singleton: Optional[RunStore] = None
+_store_lock = threading.Lock()
+
+
+def get_run_store() -> RunStore:
+    global _store_singleton
+
+    with _store_lock:
+        if _store_singleton is None:
+            _store_singleton = RunStore(RUN_STORE_PATH)
+        return _store_singleton
+
+
+def open_run_store() -> None:
+    """Open the store ahead of the first report, if enabled (called from a thread at application startup)."""
+    if RUN_STORE_ENABLED:
+        get_run_store()
+
+
+def save_report(report: RunReport, kind: str, agent_url: Optional[str] = None) -> None:
+    """Queue a finished report for the run store, if enabled; never raises into the run."""
+    if not RUN_STORE_ENABLED:
+        return
+    try:
+        get_run_store().save(report, kind, agent_url)
+    except Exception as e:
+        logger.error(f"Failed to queue report for the run store: {e}")
+
+
+def close_run_store() -> None:
+    """Flush and close the store if it was opened (called on application shutdown)."""
+    global _store_singleton
+
+    with _store_lock:
+        if _store_singleton is not None:
+            _store_singleton.close()
+            _store_singleton = None
@@ -0,0 +1,51 @@
+"""FastAPI routes for background job status, results and cancellation."""
+
+from typing import List
+
+from fastapi import APIRouter, HTTPException
+from fastapi.encoders import jsonable_encoder
+
+from app.config.types import JobInfo
+from app.core.orchestration.jobs import get_job_runner
+
+from app.config.logger import get_logger
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+
+def _get_or_404(job_id: str) -> JobInfo:
+    job = get_job_runner().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job
+
+
+@router.get("/", response_model=List[JobInfo], response_model_exclude_none=True)
+async def list_jobs():
+    """List known jobs, oldest first."""
+    return get_job_runner().jobs()
+
+
+@router.get("/{job_id}", response_model=JobInfo, response_model_exclude_none=True)
+async def job_status(job_id: str):
+    """Return the status of a job."""
+    return _get_or_404(job_id)
+
+
+@router.get("/{job_id}/result")
+async def job_result(job_id: str):
+    """Return the job's report once it has succeeded (409 while queued/running)."""
+    job = _get_or_404(job_id)
+    if job.status != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status}")
+    return jsonable_encoder(get_job_runner().result(job_id), exclude_none=True)
+
+
+@router.post("/{job_id}/cancel", response_model=JobInfo, response_model_exclude_none=True)
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job."""
+    _get_or_404(job_id)
+    logger.info(f"Cancelling job {job_id}")
+    return get_job_runner().cancel(job_id)
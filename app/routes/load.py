@@ -0,0 +1,159 @@
+"""FastAPI routes for open-loop load runs and capacity search against the agent."""
+
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from app.config.types import CapacityReport, JobInfo, LoadReport
+from app.config.settings import (
+    LOAD_REPLY_SOURCES,
+    LOAD_REPLY_SOURCE,
+    LOAD_ARRIVAL_RATE,
+    LOAD_DURATION_SEC,
+    LOAD_THINK_TIME_SEC,
+    LOAD_MAX_TURNS,
+    LOAD_MAX_IN_FLIGHT,
+    CAPACITY_SLO_METRICS,
+    CAPACITY_SLO_METRIC,
+    CAPACITY_SLO_P95_SEC,
+    CAPACITY_START_CONCURRENCY,
+    CAPACITY_ADDITIVE_STEP,
+    CAPACITY_DECREASE_FACTOR,
+    CAPACITY_MAX_CONCURRENCY,
+    CAPACITY_STEP_SEC,
+    CAPACITY_MAX_STEPS,
+    CAPACITY_THINK_TIME_SEC,
+)
+from app.core.llm.replies import reply_source
+from app.core.orchestration.load import load_generator
+from app.core.orchestration.capacity import capacity_search
+from app.core.orchestration.jobs import get_job_runner
+
+from app.config.logger import get_logger
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+
+class LoadRequest(BaseModel):
+    arrival_rate: float = LOAD_ARRIVAL_RATE        # new sessions per second (Poisson)
+    duration_sec: float = LOAD_DURATION_SEC
+    think_time_sec: float = LOAD_THINK_TIME_SEC
+    max_turns: int = LOAD_MAX_TURNS
+    max_in_flight: int = LOAD_MAX_IN_FLIGHT
+    reply_source: str = LOAD_REPLY_SOURCE          # "scripted", "cached" or "llm"
+    personas: Optional[List[dict]] = None          # cycled over the sessions; default persona if empty
+    seed: Optional[int] = None
+
+
+def _validate(req: LoadRequest) -> None:
+    if req.arrival_rate <= 0 or req.duration_sec <= 0:
+        raise HTTPException(status_code=422, detail="arrival_rate and duration_sec must be > 0")
+    if req.max_turns < 1:
+        raise HTTPException(status_code=422, detail="max_turns must be >= 1")
+    if req.reply_source not in LOAD_REPLY_SOURCES:
+        raise HTTPException(status_code=422, detail=f"reply_source must be one of {LOAD_REPLY_SOURCES}")
+
+
+async def execute_load(req: LoadRequest) -> LoadReport:
+    """Run one open-loop load test and return its report."""
+    generator = load_generator(
+        reply_source(req.reply_source),
+        arrival_rate=req.arrival_rate,
+        duration_sec=req.duration_sec,
+        think_time_sec=req.think_time_sec,
+        max_turns=req.max_turns,
+        max_in_flight=req.max_in_flight,
+        personas=req.personas,
+        seed=req.seed,
+    )
+    report = await generator.run()
+    report.reply_source = req.reply_source
+    return report
+
+
+@router.post("/", response_model=LoadReport, response_model_exclude_none=True)
+async def run_load(req: LoadRequest):
+    """Drive the agent at a target session arrival rate and report RPS, errors and latency per turn."""
+    _validate(req)
+    try:
+        return await execute_load(req)
+    except Exception as e:
+        logger.error(f"Error running load test: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/jobs", response_model=JobInfo, response_model_exclude_none=True, status_code=202)
+async def submit_load(req: LoadRequest):
+    """Queue a load run in the background and return its job id immediately."""
+    _validate(req)
+    return get_job_runner().submit("load", lambda: execute_load(req))
+
+
+class CapacityRequest(BaseModel):
+    slo_p95_sec: float = CAPACITY_SLO_P95_SEC
+    slo_metric: str = CAPACITY_SLO_METRIC          # "ttfb", "first_delta" or "total"
+    start_concurrency: int = CAPACITY_START_CONCURRENCY
+    additive_step: int = CAPACITY_ADDITIVE_STEP
+    decrease_factor: float = CAPACITY_DECREASE_FACTOR
+    max_concurrency: int = CAPACITY_MAX_CONCURRENCY
+    step_sec: float = CAPACITY_STEP_SEC
+    max_steps: int = CAPACITY_MAX_STEPS
+    think_time_sec: float = CAPACITY_THINK_TIME_SEC
+    max_turns: int = LOAD_MAX_TURNS
+    reply_source: str = LOAD_REPLY_SOURCE
+    personas: Optional[List[dict]] = None
+    seed: Optional[int] = None
+
+
+def _validate_capacity(req: CapacityRequest) -> None:
+    if req.slo_p95_sec <= 0 or req.step_sec <= 0:
+        raise HTTPException(status_code=422, detail="slo_p95_sec and step_sec must be > 0")
+    if req.slo_metric not in CAPACITY_SLO_METRICS:
+        raise HTTPException(status_code=422, detail=f"slo_metric must be one of {CAPACITY_SLO_METRICS}")
+    if not 0 < req.decrease_factor < 1:
+        raise HTTPException(status_code=422, detail="decrease_factor must be between 0 and 1")
+    if req.reply_source not in LOAD_REPLY_SOURCES:
+        raise HTTPException(status_code=422, detail=f"reply_source must be one of {LOAD_REPLY_SOURCES}")
+
+
+async def execute_capacity(req: CapacityRequest) -> CapacityReport:
+    """Run one AIMD capacity search and return the throughput/latency curve."""
+    search = capacity_search(
+        reply_source(req.reply_source),
+        slo_p95_sec=req.slo_p95_sec,
+        slo_metric=req.slo_metric,
+        start_concurrency=req.start_concurrency,
+        additive_step=req.additive_step,
+        decrease_factor=req.decrease_factor,
+        max_concurrency=req.max_concurrency,
+        step_sec=req.step_sec,
+        max_steps=req.max_steps,
+        think_time_sec=req.think_time_sec,
+        max_turns=req.max_turns,
+        personas=req.personas,
+        seed=req.seed,
+    )
+    report = await search.run()
+    report.reply_source = req.reply_source
+    return report
+
+
+@router.post("/capacity", response_model=CapacityReport, response_model_exclude_none=True)
+async def run_capacity(req: CapacityRequest):
+    """Find the agent's maximum sustainable throughput under a p95 latency SLO."""
+    _validate_capacity(req)
+    try:
+        return await execute_capacity(req)
+    except Exception as e:
+        logger.error(f"Error running capacity search: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/capacity/jobs", response_model=JobInfo, response_model_exclude_none=True, status_code=202)
+async def submit_capacity(req: CapacityRequest):
+    """Queue a capacity search in the background and return its job id immediately."""
+    _validate_capacity(req)
+    return get_job_runner().submit("capacity", lambda: execute_capacity(req))
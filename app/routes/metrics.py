@@ -0,0 +1,14 @@
+"""FastAPI route exposing latency metrics in the Prometheus text format."""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics.registry import get_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Per-phase turn latency (p50/p95/p99, sum, count) since the process started."""
+    return PlainTextResponse(get_metrics().render(), media_type="text/plain; version=0.0.4")
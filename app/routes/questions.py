@@ -0,0 +1,52 @@
+"""FastAPI routes for cross-run question repetition analytics."""
+
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.clients.embeddings import generate_embeddings
+from app.core.llm.scheduler import PRIORITY_CRITICAL
+from app.core.persona.corpus import get_question_corpus
+
+from app.config.logger import get_logger
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+
+async def _embed(q: str) -> list:
+    if not q.strip():
+        raise HTTPException(status_code=422, detail="Query text must not be empty")
+    try:
+        return (await asyncio.to_thread(generate_embeddings, [q], priority=PRIORITY_CRITICAL))[0]
+    except Exception as e:
+        logger.error(f"Failed to embed query: {e}")
+        raise HTTPException(status_code=502, detail=str(e))
+
+
+@router.get("/similar")
+async def similar_questions(q: str, k: int = Query(10, ge=1, le=200)):
+    """The k stored agent questions most similar to `q`."""
+    embedding = await _embed(q)
+    return await asyncio.to_thread(get_question_corpus().nearest, embedding, k)
+
+
+@router.get("/frequency")
+async def question_frequency(q: str, threshold: Optional[float] = Query(None, ge=0.0, le=1.0)):
+    """How often the agent asked something like `q`, across sessions and runs."""
+    embedding = await _embed(q)
+    return await asyncio.to_thread(get_question_corpus().frequency, embedding, threshold)
+
+
+@router.get("/top")
+async def top_questions(limit: int = Query(20, ge=1, le=500)):
+    """The most repeated question clusters across all runs."""
+    return await asyncio.to_thread(get_question_corpus().top_repeated, limit)
+
+
+@router.get("/stats")
+async def corpus_stats():
+    """Size of the question corpus."""
+    return await asyncio.to_thread(get_question_corpus().stats)
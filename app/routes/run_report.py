@@ -4,16 +4,17 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
-from app.config.types import RunReport, Turn
+from uuid import uuid4
+from app.config.types import EngineReport, JobInfo, RunReport, SessionSpec, Turn
 
 from app.config.settings import (
     API_URL,
-    USER_ID,
     OPENAI_MODEL,
     TIMEOUT_SEC,
     RETRY_COUNT,
     MAX_TURNS,
     MAX_TOTAL_SECONDS,
+    MAX_CONCURRENT_SESSIONS,
     INITIAL_USER_MESSAGE,
     INITIAL_REAL_Estate_MESSAGE
 )
@@ -21,6 +22,10 @@ from app.clients.chat_client import ChatClient
 from app.core.llm.driver import LLMDriver
 from app.core.orchestration.chat import chat_orchestrator 
 from app.core.orchestration.report import report_orchestrator 
+from app.core.orchestration.engine import run_engine
+from app.core.orchestration.jobs import get_job_runner
+from app.core.store.run_store import save_report
+from app.routes.streaming import EventCallback, stream_run
 
 from app.config.logger import get_logger
 
@@ -30,36 +35,98 @@ router = APIRouter()
 
 
 
+async def execute_report(on_event: Optional[EventCallback] = None) -> RunReport:
+    """Run one report session and build the response report."""
+    chat = ChatClient(API_URL, str(uuid4()), TIMEOUT_SEC, RETRY_COUNT)
+    driver = LLMDriver(OPENAI_MODEL, api_key_env="OPENAI_API_KEY")
+    orchestrator = report_orchestrator(chat, driver, MAX_TURNS, MAX_TOTAL_SECONDS)
+    
+    report = await orchestrator.run(INITIAL_USER_MESSAGE, INITIAL_REAL_Estate_MESSAGE, on_event=on_event)
+    save_report(report, "report", API_URL)
+    session_id = report.session_id
+    
+    if report.final_summary:
+        logger.info("Final summary generated")
+    else:
+        logger.info("Run completed without final summary")
+
+    return RunReport(
+        success=report.success,
+        user_id=  report.user_id,
+        session_id=session_id ,
+        turns=[Turn(role=t.role, user_id=  report.user_id, session_id= t.session_id    ,
+                    content=t.content, ts=t.ts,   logs_report=t.logs_report, 
+                    my_log=t.my_log, logs_complete=t.logs_complete,
+                    logs_wait_sec=t.logs_wait_sec, timing=t.timing, stream=t.stream) for t in report.turns],
+        final_summary=report.final_summary,
+        started_at=report.started_at,
+        ended_at=report.ended_at,
+        error=report.error,
+        duplicate= report.duplicate,
+        run_id=report.run_id,
+        latency=report.latency,
+    )
+
+
 @router.post("/", response_model=RunReport, response_model_exclude_none=True)
 async def run_tester():
     """Run the AI tester and return the report."""
     try:
         logger.info("Starting tester run")
-        chat = ChatClient(API_URL, USER_ID, TIMEOUT_SEC, RETRY_COUNT)
-        driver = LLMDriver(OPENAI_MODEL, api_key_env="OPENAI_API_KEY")
-        orchestrator = report_orchestrator(chat, driver, MAX_TURNS, MAX_TOTAL_SECONDS)
-        
-        report = orchestrator.run(INITIAL_USER_MESSAGE, INITIAL_REAL_Estate_MESSAGE)
-        session_id = report.session_id
-        
-        if report.final_summary:
-            logger.info("Final summary generated")
-        else:
-            logger.info("Run completed without final summary")
-
-        return RunReport(
-            success=report.success,
-            user_id=  USER_ID,
-            session_id=session_id ,
-            turns=[Turn(role=t.role, user_id=  USER_ID, session_id= t.session_id    ,
-                        content=t.content, ts=t.ts,   logs_report=t.logs_report, 
-                        my_log=t.my_log) for t in report.turns],
-            final_summary=report.final_summary,
-            started_at=report.started_at,
-            ended_at=report.ended_at,
-            error=report.error,
-            duplicate= report.duplicate
-        )
+        return await execute_report()
     except Exception as e:
         logger.error(f"Error running tester: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/stream")
+async def stream_tester():
+    """Run the AI tester and stream each turn as NDJSON, closing with the summary."""
+    logger.info("Starting streamed tester run")
+    return stream_run(execute_report)
+
+
+@router.post("/jobs", response_model=JobInfo, response_model_exclude_none=True, status_code=202)
+async def submit_tester():
+    """Queue a report run in the background and return its job id immediately."""
+    return get_job_runner().submit("report", execute_report)
+
+
+class SessionsRequest(BaseModel):
+    sessions: int = 1
+    max_concurrency: int = MAX_CONCURRENT_SESSIONS
+    personas: Optional[List[dict]] = None      # cycled over the sessions; default persona if empty
+    max_turns: int = MAX_TURNS
+
+
+async def execute_sessions(req: SessionsRequest) -> EngineReport:
+    """Run the requested sessions through the run engine."""
+    logger.info(f"Starting {req.sessions} concurrent sessions")
+    driver = LLMDriver(OPENAI_MODEL, api_key_env="OPENAI_API_KEY")
+    engine = run_engine(driver, req.max_concurrency, req.max_turns, MAX_TOTAL_SECONDS)
+    personas = req.personas or [None]
+    specs = [SessionSpec(persona=personas[i % len(personas)]) for i in range(req.sessions)]
+    result = await engine.run(specs)
+    for report in result.reports:
+        save_report(report, "report", API_URL)
+    return result
+
+
+@router.post("/sessions", response_model=EngineReport, response_model_exclude_none=True)
+async def run_sessions(req: SessionsRequest):
+    """Run N report sessions concurrently, each with its own persona and user id."""
+    if req.sessions < 1:
+        raise HTTPException(status_code=422, detail="sessions must be >= 1")
+    try:
+        return await execute_sessions(req)
+    except Exception as e:
+        logger.error(f"Error running sessions: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/sessions/jobs", response_model=JobInfo, response_model_exclude_none=True, status_code=202)
+async def submit_sessions(req: SessionsRequest):
+    """Queue a multi-session run in the background and return its job id immediately."""
+    if req.sessions < 1:
+        raise HTTPException(status_code=422, detail="sessions must be >= 1")
+    return get_job_runner().submit("sessions", lambda: execute_sessions(req))
@@ -0,0 +1,57 @@
+"""FastAPI routes for browsing stored run reports."""
+
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.core.store.run_store import get_run_store
+
+from app.config.logger import get_logger
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/")
+async def list_runs(
+    run_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    agent_url: Optional[str] = None,
+    kind: Optional[str] = None,
+    success: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[int] = None,
+):
+    """Stored runs matching the filters, newest first (without turns)."""
+    return await asyncio.to_thread(
+        get_run_store().query,
+        run_id=run_id, session_id=session_id, user_id=user_id, agent_url=agent_url, kind=kind,
+        success=success, since=since, until=until, limit=limit, cursor=cursor,
+    )
+
+
+@router.get("/stats")
+async def run_store_stats():
+    """Number of stored runs and turns, and the time range they cover."""
+    return await asyncio.to_thread(get_run_store().stats)
+
+
+@router.get("/{id}")
+async def get_run(id: int):
+    """One stored run with all its turns."""
+    run = await asyncio.to_thread(get_run_store().get, id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return run
+
+
+@router.post("/compact")
+async def compact_runs():
+    """Apply the retention policy now."""
+    return await asyncio.to_thread(get_run_store().compact)
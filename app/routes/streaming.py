@@ -0,0 +1,53 @@
+"""NDJSON streaming of run events (one JSON object per line)."""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+from app.config.types import RunReport
+from app.config.logger import get_logger
+
+logger = get_logger(__name__)
+
+EventCallback = Callable[[str, dict], Awaitable[None]]
+
+
+def _line(event: str, data: Any) -> str:
+    return json.dumps({"event": event, "data": jsonable_encoder(data, exclude_none=True)}, ensure_ascii=False) + "\n"
+
+
+async def _events(run: Callable[[EventCallback], Awaitable[RunReport]]) -> AsyncIterator[str]:
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def on_event(event: str, data: dict) -> None:
+        await queue.put((event, data))
+
+    async def runner() -> None:
+        try:
+            report = await run(on_event)
+            # turns were already streamed; the closing event carries the rest of the report
+            closing = {k: v for k, v in vars(report).items() if k != "turns"}
+            await queue.put(("done", closing))
+        except Exception as e:
+            logger.error(f"Error in streamed run: {e}")
+            await queue.put(("error", {"error": str(e)}))
+
+    task = asyncio.create_task(runner())
+    try:
+        while True:
+            event, data = await queue.get()
+            yield _line(event, data)
+            if event in ("done", "error"):
+                break
+    finally:
+        # client went away mid-run: stop the conversation too
+        if not task.done():
+            task.cancel()
+
+
+def stream_run(run: Callable[[EventCallback], Awaitable[RunReport]]) -> StreamingResponse:
+    """Start `run(on_event)` and stream its "turn" events, then a closing "done"/"error" event."""
+    return StreamingResponse(_events(run), media_type="application/x-ndjson")
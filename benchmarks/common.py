@@ -0,0 +1,86 @@
+"""Shared benchmark plumbing: metric records, JSON output and comparison against a stored baseline."""
+
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+from typing import Any, Optional
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+DEFAULT_TOLERANCE = 0.25
+
+
+def metric(value: float, unit: str, better: str = "lower", budget: Optional[float] = None) -> dict[str, Any]:
+    """
+    One measured value. `better` is "lower" or "higher"; `budget` is an absolute limit that
+    fails the run even without a baseline (a max if lower is better, a min otherwise).
+    """
+    return {"value": round(float(value), 6), "unit": unit, "better": better, "budget": budget}
+
+
+def _worse(value: float, limit: float, better: str) -> bool:
+    return value > limit if better == "lower" else value < limit
+
+
+def compare(metrics: dict[str, dict], baseline: Optional[dict], tolerance: float) -> list[str]:
+    """Budget violations, and metrics more than `tolerance` (fraction) worse than the baseline."""
+    failures: list[str] = []
+    previous = (baseline or {}).get("metrics", {})
+    for name, m in metrics.items():
+        value, better = m["value"], m["better"]
+        if m.get("budget") is not None and _worse(value, m["budget"], better):
+            failures.append(f"{name}: {value} {m['unit']} over the budget of {m['budget']}")
+        base = previous.get(name, {}).get("value")
+        if base is None:
+            continue
+        limit = base * (1 + tolerance) if better == "lower" else base * (1 - tolerance)
+        if _worse(value, limit, better):
+            change = (value - base) / base * 100 if base else float("inf")
+            failures.append(f"{name}: {value} {m['unit']} vs baseline {base} ({change:+.1f}%, tolerance {tolerance:.0%})")
+    return failures
+
+
+def add_arguments(parser: argparse.ArgumentParser, name: str) -> None:
+    parser.add_argument("--out", help="write the JSON results here (default: stdout)")
+    parser.add_argument("--baseline", default=os.path.join(BASELINE_DIR, f"{name}.json"),
+                        help="baseline to compare against (default: %(default)s)")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown vs the baseline, as a fraction (default: %(default)s)")
+
+
+def finish(name: str, metrics: dict[str, dict], args: argparse.Namespace, params: Optional[dict] = None) -> int:
+    """Compare, print/write the results as JSON, optionally store the baseline; exit status 1 on a regression."""
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    failures = compare(metrics, baseline, args.tolerance)
+    result = {
+        "benchmark": name,
+        "created_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params or {},
+        "metrics": metrics,
+        "baseline": args.baseline if baseline else None,
+        "regressions": failures,
+    }
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+        return 0
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    return 1 if failures else 0
@@ -0,0 +1,141 @@
+"""
+End-to-end benchmarks of the tester against the in-process stand-ins (app.core.standins):
+report sessions through run_engine with the real ChatClient, logs reader, analyser,
+driver and embeddings, over local HTTP.
+
+  overhead:    one session at a time, stand-ins answering instantly -> wall time per turn.
+               The stand-ins share the process, so this is an upper bound of the tester's cost.
+  throughput:  N concurrent sessions against stand-ins with realistic latencies -> turns/sec.
+  memory:      the throughput run again under tracemalloc -> peak Python heap per session.
+
+    python -m benchmarks.e2e [--sessions 50] [--turns 6] [--update-baseline]
+
+Exits 1 when a metric is over its budget or more than --tolerance worse than the baseline.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.config.settings import OPENAI_ENDPOINTS
+from app.config.types import SessionSpec
+from app.core.llm.driver import LLMDriver
+from app.core.orchestration.engine import run_engine
+from app.core.standins.agent import AgentConfig
+from app.core.standins.openai_api import OpenAIConfig
+from app.core.standins.server import StandInServers
+from benchmarks.common import add_arguments, finish, metric
+
+NAME = "e2e"
+
+# stand-in latencies for the throughput and memory runs (seconds)
+REALISTIC_AGENT = {"ttfb_sec": 0.05, "deltas": 40, "delta_interval_sec": 0.005, "jitter": 0.2, "logs_delay_sec": 0.05}
+REALISTIC_OPENAI_LATENCY_SEC = 0.05
+
+# absolute limits, checked even without a baseline
+BUDGET_OVERHEAD_MS_PER_TURN = 250.0
+BUDGET_MEMORY_KB_PER_SESSION = 4096.0
+
+
+def _isolate() -> None:
+    """Fresh caches/stores for every run (relative .cache paths), and no rate limits for the stand-in."""
+    os.chdir(tempfile.mkdtemp(prefix="tester-bench-"))
+    for options in OPENAI_ENDPOINTS.values():
+        options["rpm"] = options["tpm"] = 10**9
+
+
+async def _sessions(servers: StandInServers, sessions: int, concurrency: int, turns: int):
+    engine = run_engine(
+        LLMDriver("gpt-4o"),
+        max_concurrency=concurrency,
+        max_turns=turns,
+        api_url=servers.api_url,
+        logs_api_url=servers.logs_api_url,
+    )
+    started = time.perf_counter()
+    report = await engine.run([SessionSpec() for _ in range(sessions)])
+    wall = time.perf_counter() - started
+    if report.stats.failed:
+        raise RuntimeError(f"{report.stats.failed} sessions failed: {report.stats.errors}")
+    return report, wall
+
+
+def _per_turn_ms(report) -> list[float]:
+    out = []
+    for r in report.reports:
+        turns = sum(1 for t in r.turns if t.role == "user")
+        if turns:
+            out.append((r.ended_at - r.started_at).total_seconds() * 1000 / turns)
+    return out
+
+
+def run(args: argparse.Namespace) -> tuple[dict, dict]:
+    metrics: dict[str, dict] = {}
+    scenarios = args.scenario
+    realistic_agent = AgentConfig(summary_after=args.turns, seed=2, **REALISTIC_AGENT)
+    realistic_openai = OpenAIConfig(latency_sec=REALISTIC_OPENAI_LATENCY_SEC)
+
+    # one server for every scenario: the shared OpenAI clients keep the base URL they were created with
+    with StandInServers(AgentConfig(summary_after=args.turns, seed=1)) as servers:
+        if "overhead" in scenarios:
+            asyncio.run(_sessions(servers, 1, 1, args.turns))        # warm-up: imports, pools, prompt caches
+            report, _ = asyncio.run(_sessions(servers, args.overhead_sessions, 1, args.turns))
+            per_turn = np.array(_per_turn_ms(report))
+            metrics["overhead_ms_per_turn_p50"] = metric(
+                np.percentile(per_turn, 50), "ms", budget=BUDGET_OVERHEAD_MS_PER_TURN,
+            )
+            metrics["overhead_ms_per_turn_p95"] = metric(np.percentile(per_turn, 95), "ms")
+
+        servers.agent.config, servers.openai.config = realistic_agent, realistic_openai
+        if "throughput" in scenarios:
+            report, wall = asyncio.run(_sessions(servers, args.sessions, args.concurrency, args.turns))
+            durations = [(r.ended_at - r.started_at).total_seconds() for r in report.reports]
+            metrics["throughput_turns_per_sec"] = metric(report.stats.total_turns / wall, "turns/s", better="higher")
+            metrics["session_sec_p95"] = metric(np.percentile(durations, 95), "s")
+
+        if "memory" in scenarios:
+            tracemalloc.start()
+            asyncio.run(_sessions(servers, args.sessions, args.concurrency, args.turns))
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            metrics["memory_peak_kb_per_session"] = metric(
+                peak / 1024 / args.sessions, "KiB", budget=BUDGET_MEMORY_KB_PER_SESSION,
+            )
+            metrics["memory_max_rss_mb"] = metric(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, "MiB")
+
+    params = {k: v for k, v in vars(args).items() if k in ("sessions", "concurrency", "turns", "overhead_sessions", "scenario")}
+    return metrics, params
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50, help="sessions in the throughput and memory runs")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=6, help="agent messages per session (the last one is the summary)")
+    parser.add_argument("--overhead-sessions", type=int, default=10)
+    parser.add_argument("--scenario", nargs="+", default=["overhead", "throughput", "memory"],
+                        choices=["overhead", "throughput", "memory"])
+    parser.add_argument("--verbose", action="store_true", help="keep the app's INFO logs")
+    add_arguments(parser, NAME)
+    args = parser.parse_args(argv)
+    if args.out:
+        args.out = os.path.abspath(args.out)
+    args.baseline = os.path.abspath(args.baseline)
+
+    if not args.verbose:
+        logging.disable(logging.INFO)
+    _isolate()
+    metrics, params = run(args)
+    return finish(NAME, metrics, args, params)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+Microbenchmarks of the tester's hot pure-Python paths, on synthetic inputs scaled up to
+well past what a real session produces:
+
+  sse:        ChatClient._parse_sse over streams of 100 .. 10k content events.
+  logs:       LogsReader.prepare_logs over batches of 10 .. 1k rows with large `response` bodies.
+  dedup:      deduplicate_questions and cosine_sim_matrix for 10 .. 10k questions
+              (embeddings come from a synthetic function, no OpenAI calls).
+  heuristics: is_question, stop_condition and extract_last_question over long agent messages.
+
+Every metric is the best time per call over --repeat rounds (each round loops enough calls to
+last ~0.2s), in microseconds.
+
+    python -m benchmarks.micro [--group sse logs ...] [--quick] [--update-baseline]
+
+Exits 1 when a metric is more than --tolerance worse than the baseline.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import timeit
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+import numpy as np
+
+from app.clients.chat_client import ChatClient
+from app.clients.logs_client import LogsApiClient
+from app.core.logs.reader import LogsReader
+from app.core.persona import tracker
+from app.core.persona.tracker import (
+    cosine_sim_matrix,
+    deduplicate_questions,
+    extract_last_question,
+    is_question,
+    stop_condition,
+)
+from app.core.replay.cassette import RecordedStream
+from app.core.standins.agent import AGENT_QUESTIONS, FILLER
+from benchmarks.common import add_arguments, finish, metric
+
+NAME = "micro"
+GROUPS = ("sse", "logs", "dedup", "heuristics")
+
+SIZES = {
+    "sse": (100, 1000, 10000),                  # content events per stream
+    "logs": (10, 100, 1000),                    # rows per batch
+    "dedup": (10, 100, 1000, 10000),            # questions
+    "heuristics": (1000, 10000, 100000),        # characters per agent message
+}
+QUICK_SIZES = {
+    "sse": (100, 1000),
+    "logs": (10, 100),
+    "dedup": (10, 100, 1000),
+    "heuristics": (1000, 10000),
+}
+LOG_RESPONSE_CHARS = 20000      # `response` of each main_model row
+EMBEDDING_DIM = 1536            # text-embedding-3-small
+QUESTION_TOPICS = 40            # distinct questions behind the paraphrases
+
+
+def _best_us(fn: Callable[[], object], repeat: int) -> float:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+# ---------- synthetic inputs ----------
+
+def sse_lines(events: int, delta_chars: int = 12) -> list[str]:
+    """Agent stream as aiter_lines() yields it: session event, content deltas, done, blank separators."""
+    text = FILLER * (events * delta_chars // len(FILLER) + 1)
+    lines = [f"data: {json.dumps({'type': 'session', 'session_id': 'sess-bench'})}", ""]
+    for i in range(events):
+        delta = text[i * delta_chars:(i + 1) * delta_chars]
+        lines += [f"data: {json.dumps({'type': 'content', 'delta': delta})}", ""]
+    lines.append('data: {"type": "done"}')
+    return lines
+
+
+def log_rows(rows: int, response_chars: int = LOG_RESPONSE_CHARS) -> list[dict]:
+    """Alternating intent_classifier / main_model rows; main_model responses end with an EXTRACT block."""
+    body = (FILLER * (response_chars // len(FILLER) + 1))[:response_chars]
+    out = []
+    for i in range(rows):
+        base = {"id": i + 1, "user_id": "bench", "session_id": "sess-bench", "error_message": None}
+        if i % 2 == 0:
+            out.append({**base, "log_type": "intent_classifier", "response": "general_chat", "prompt": "hi"})
+            continue
+        extract = json.dumps([{"qid": f"q{i}", "answer": "around 500k"}])
+        out.append({
+            **base,
+            "log_type": "main_model",
+            "prompt": "### WHAT YOU REMEMBER\n- budget 500k\n",
+            "response": f"{body}\n<!--EXTRACT:{extract}-->",
+            "error_message": "timeout calling tool" if i % 50 == 1 else None,
+        })
+    return out
+
+
+def agent_message(chars: int) -> str:
+    """Long agent message: paragraphs of filler and questions, no closing-summary phrase."""
+    rng = random.Random(chars)
+    parts: list[str] = []
+    size = 0
+    while size < chars:
+        paragraph = FILLER * rng.randint(1, 4) + rng.choice(AGENT_QUESTIONS)
+        parts.append(paragraph)
+        size += len(paragraph) + 2
+    return "\n\n".join(parts)[:chars]
+
+
+def questions(n: int, topics: int = QUESTION_TOPICS, dim: int = EMBEDDING_DIM) -> tuple[list[str], dict[str, np.ndarray]]:
+    """
+    n questions drawn from `topics` topics, with their embeddings: a topic vector plus a little
+    noise, so paraphrases of one topic are duplicates (cosine ~0.92) and different topics are not.
+    """
+    rng = np.random.default_rng(n)
+    centers = rng.standard_normal((topics, dim), dtype=np.float32)
+    texts, vectors = [], {}
+    for i in range(n):
+        topic = int(rng.integers(topics))
+        text = f"{AGENT_QUESTIONS[topic % len(AGENT_QUESTIONS)]} (topic {topic}, variant {i})"
+        texts.append(text)
+        vectors[text] = centers[topic] + 0.3 * rng.standard_normal(dim, dtype=np.float32)
+    return texts, vectors
+
+
+@contextmanager
+def synthetic_embeddings(vectors: dict[str, np.ndarray]) -> Iterator[None]:
+    """Route the tracker's generate_embeddings to the precomputed vectors."""
+    original = tracker.generate_embeddings
+    tracker.generate_embeddings = lambda texts, *args, **kwargs: [vectors[t] for t in texts]
+    try:
+        yield
+    finally:
+        tracker.generate_embeddings = original
+
+
+# ---------- groups ----------
+
+def bench_sse(sizes, repeat: int) -> dict[str, dict]:
+    client = ChatClient("http://bench.invalid/chat", "bench", timeout_sec=1, retry_count=0)
+    loop = asyncio.new_event_loop()
+    metrics = {}
+    try:
+        for events in sizes:
+            lines = sse_lines(events)
+            result = loop.run_until_complete(client._parse_sse(RecordedStream(lines)))
+            assert result.raw_events_count == events + 2, result.raw_events_count
+            us = _best_us(lambda: loop.run_until_complete(client._parse_sse(RecordedStream(lines))), repeat)
+            metrics[f"parse_sse_{events}_events_us"] = metric(us, "us")
+    finally:
+        # _parse_sse stops reading at "done", leaving the stream generators to close here
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+    return metrics
+
+
+def bench_logs(sizes, repeat: int) -> dict[str, dict]:
+    reader = LogsReader(LogsApiClient("http://bench.invalid/logs/api"))
+    metrics = {}
+    for rows in sizes:
+        batch = log_rows(rows)
+        assert reader.prepare_logs(batch).get("extraction_answers"), "EXTRACT block not parsed"
+        metrics[f"prepare_logs_{rows}_rows_us"] = metric(_best_us(lambda: reader.prepare_logs(batch), repeat), "us")
+    return metrics
+
+
+def bench_dedup(sizes, repeat: int) -> dict[str, dict]:
+    metrics = {}
+    for n in sizes:
+        texts, vectors = questions(n)
+        with synthetic_embeddings(vectors):
+            duplicates = deduplicate_questions(texts)
+            assert len(duplicates) <= QUESTION_TOPICS, len(duplicates)
+            us = _best_us(lambda: deduplicate_questions(texts), repeat)
+        metrics[f"deduplicate_questions_{n}_us"] = metric(us, "us")
+
+        matrix = np.stack([vectors[t] for t in texts])
+        metrics[f"cosine_sim_matrix_{n}_us"] = metric(_best_us(lambda: cosine_sim_matrix(matrix), repeat), "us")
+    return metrics
+
+
+def bench_heuristics(sizes, repeat: int) -> dict[str, dict]:
+    metrics = {}
+    for chars in sizes:
+        message = agent_message(chars)
+        # the question mark is the early exit of is_question; the statement form scans every starter
+        statement = message.replace("?", ".")
+        for name, fn, text in (
+            ("is_question", is_question, message),
+            ("is_question_statement", is_question, statement),
+            ("stop_condition", stop_condition, message),
+            ("extract_last_question", extract_last_question, message),
+        ):
+            metrics[f"{name}_{chars}_chars_us"] = metric(_best_us(lambda: fn(text), repeat), "us")
+    return metrics
+
+
+BENCHMARKS = {"sse": bench_sse, "logs": bench_logs, "dedup": bench_dedup, "heuristics": bench_heuristics}
+
+
+def run(args: argparse.Namespace) -> tuple[dict, dict]:
+    sizes = QUICK_SIZES if args.quick else SIZES
+    metrics: dict[str, dict] = {}
+    for group in args.group:
+        metrics.update(BENCHMARKS[group](sizes[group], args.repeat))
+    params = {"group": args.group, "sizes": {g: list(sizes[g]) for g in args.group}, "repeat": args.repeat}
+    return metrics, params
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--group", nargs="+", default=list(GROUPS), choices=GROUPS)
+    parser.add_argument("--quick", action="store_true", help="smaller sizes (compare only with a --quick baseline)")
+    parser.add_argument("--repeat", type=int, default=5, help="timing rounds per metric; the best one counts")
+    parser.add_argument("--verbose", action="store_true", help="keep the app's INFO logs")
+    add_arguments(parser, NAME)
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        logging.disable(logging.INFO)
+    metrics, params = run(args)
+    return finish(NAME, metrics, args, params)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
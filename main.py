@@ -1,3 +1,7 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
@@ -5,20 +9,53 @@ from dotenv import load_dotenv
 import uvicorn
 from app.routes.run_chat import router as run_chat_router
 from app.routes.run_report import router as run_report_router
+from app.routes.jobs import router as jobs_router
+from app.routes.questions import router as questions_router
+from app.routes.runs import router as runs_router
+from app.routes.metrics import router as metrics_router
+from app.routes.load import router as load_router
+from app.clients.chat_client import aclose_http_client
+from app.clients.embedding_cache import flush_embedding_caches
+from app.clients.openai_registry import aclose_openai_clients
+from app.core.orchestration.jobs import get_job_runner
+from app.core.store.run_store import close_run_store, open_run_store
+from app.config.settings import WORKER_THREADS
 
 
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # blocking steps (logs, LLM calls) run in threads; size the pool for concurrent sessions
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=WORKER_THREADS))
+    # SQLite open and schema creation off the event loop, before the first report is saved
+    await asyncio.to_thread(open_run_store)
+    yield
+    await get_job_runner().shutdown()
+    await aclose_http_client()
+    await aclose_openai_clients()
+    # let the writer drain off the event loop
+    await asyncio.to_thread(close_run_store)
+    await asyncio.to_thread(flush_embedding_caches)
+
+
 app = FastAPI(
     title="AI_Tester", 
     version="1.0.0", 
     description="Tester for Real_estate_Agent",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    lifespan=lifespan,
 )
 app.include_router(run_chat_router, prefix="/chat")
 app.include_router(run_report_router, prefix="/report")
+app.include_router(jobs_router, prefix="/jobs")
+app.include_router(questions_router, prefix="/questions")
+app.include_router(runs_router, prefix="/runs")
+app.include_router(load_router, prefix="/load")
+app.include_router(metrics_router)
 
 
 @app.get("/", response_class=HTMLResponse)
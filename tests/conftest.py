@@ -0,0 +1,21 @@
+"""Shared fixtures: the repo root on sys.path and the local stand-in servers."""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.clients.openai_registry import aclose_openai_clients  # noqa: E402
+from app.core.standins.server import StandInServers  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def standins():
+    """Stand-in agent, logs API and OpenAI API; the shared OpenAI clients are recreated against them."""
+    asyncio.run(aclose_openai_clients())
+    with StandInServers() as servers:
+        yield servers
+        asyncio.run(aclose_openai_clients())
@@ -0,0 +1,38 @@
+import pytest
+
+from app.clients.embeddings import _embed_remote
+from app.core.llm.driver import LLMDriver
+from app.core.persona.persona import persona_context
+from app.core.replay.cassette import Cassette, CassetteMiss, use_cassette
+
+QUESTION = "What's your budget for the purchase?"
+
+
+def _calls():
+    reply = LLMDriver("gpt-4o").generate_reply(persona_context(), QUESTION, [])
+    embedding = _embed_remote([QUESTION], "text-embedding-ada-002")[0]
+    return reply, embedding
+
+
+def test_openai_calls_record_and_replay(standins, tmp_path):
+    path = str(tmp_path / "session.jsonl.gz")
+    with use_cassette(Cassette(path, "record")):
+        recorded = _calls()
+
+    sent = standins.openai.requests
+    cassette = Cassette.load(path)
+    with use_cassette(cassette):
+        replayed = _calls()
+
+    assert replayed == recorded
+    assert standins.openai.requests == sent         # nothing reached the API
+    assert cassette.stats()["entries"] == {"openai": 2}
+    assert (cassette.hits, cassette.misses) == (2, 0)
+
+
+def test_unrecorded_call_is_a_miss(standins, tmp_path):
+    path = str(tmp_path / "empty.jsonl.gz")
+    Cassette(path, "record").save()
+    with use_cassette(Cassette.load(path)):
+        with pytest.raises(CassetteMiss):
+            LLMDriver("gpt-4o").generate_reply(persona_context(), QUESTION, [])
@@ -0,0 +1,24 @@
+from datetime import datetime
+
+import pytest
+
+from app.config.types import Turn
+from app.core.llm.context import ConversationContext
+from app.core.llm.tokens import CHARS_PER_TOKEN, MESSAGE_OVERHEAD_TOKENS
+
+
+def _turn(role, content):
+    return Turn(role=role, content=content, user_id="u", session_id="s", ts=datetime.utcnow())
+
+
+def test_over_budget_turn_is_cut_to_its_tail():
+    context = ConversationContext(budget_tokens=MESSAGE_OVERHEAD_TOKENS + 1)
+    summary, recent = context.window([_turn("assistant", "x" * 1000 + "What's your budget?")])
+    assert summary is None
+    assert recent[0].content == ("x" * 1000 + "What's your budget?")[-CHARS_PER_TOKEN:]
+
+
+@pytest.mark.parametrize("budget", [0, MESSAGE_OVERHEAD_TOKENS])
+def test_budget_without_room_for_content_is_rejected(budget):
+    with pytest.raises(ValueError):
+        ConversationContext(budget_tokens=budget)
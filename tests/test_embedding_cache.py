@@ -0,0 +1,65 @@
+import os
+
+import numpy as np
+
+from app.clients.embedding_cache import INDEX_FILE, INDEX_LOG_FILE, EmbeddingCache
+
+DIM = 8
+MODEL = "text-embedding-ada-002"
+
+
+def _cache(root, max_rows=1000):
+    return EmbeddingCache(str(root), MODEL, max_rows * DIM * 4)
+
+
+def _vector(i):
+    return np.full(DIM, float(i), dtype=np.float32)
+
+
+def test_puts_append_to_the_log_instead_of_rewriting_the_index(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put_many(["q0"], [_vector(0)])
+    index = os.path.join(cache.dir, INDEX_FILE)
+    snapshot = os.stat(index).st_mtime_ns, os.path.getsize(index)
+
+    for i in range(1, 50):
+        cache.put_many([f"q{i}"], [_vector(i)])
+    cache.get_many(["q3", "q7"])
+
+    assert (os.stat(index).st_mtime_ns, os.path.getsize(index)) == snapshot
+    with open(os.path.join(cache.dir, INDEX_LOG_FILE), encoding="utf-8") as f:
+        assert len(f.readlines()) == 49
+
+
+def test_reload_without_flush_keeps_every_vector(tmp_path):
+    cache = _cache(tmp_path)
+    for i in range(20):
+        cache.put_many([f"q{i}"], [_vector(i)])
+
+    reloaded = _cache(tmp_path)     # as after a crash: no flush()
+    hits = reloaded.get_many([f"q{i}" for i in range(20)])
+    assert all(np.array_equal(v, _vector(i)) for i, v in enumerate(hits))
+
+
+def test_evicted_rows_are_not_served_for_their_old_key(tmp_path):
+    cache = _cache(tmp_path, max_rows=4)
+    for i in range(4):
+        cache.put_many([f"q{i}"], [_vector(i)])
+    cache.flush()
+    cache.put_many(["q4", "q5"], [_vector(4), _vector(5)])      # evicts q0, q1 after the snapshot
+
+    reloaded = _cache(tmp_path, max_rows=4)
+    hits = reloaded.get_many([f"q{i}" for i in range(6)])
+    assert hits[0] is None and hits[1] is None
+    assert all(np.array_equal(hits[i], _vector(i)) for i in range(2, 6))
+
+
+def test_log_is_compacted_and_flush_folds_it(tmp_path):
+    cache = _cache(tmp_path, max_rows=4096)
+    for i in range(0, 3000, 10):
+        cache.put_many([f"q{j}" for j in range(i, i + 10)], [_vector(j) for j in range(i, i + 10)])
+    assert cache._log_lines <= max(1024, 2 * len(cache))
+
+    cache.flush()
+    assert os.path.getsize(os.path.join(cache.dir, INDEX_LOG_FILE)) == 0
+    assert len(_cache(tmp_path, max_rows=4096)) == 3000
@@ -0,0 +1,40 @@
+import asyncio
+
+from app.clients.logs_client import LogsApiResponse
+from app.core.logs.reader import LogsReader
+
+
+class FakeLogsClient:
+    def __init__(self):
+        self.logs = []
+
+    def write(self, *log_types):
+        for log_type in log_types:
+            self.logs.append({"id": len(self.logs) + 1, "log_type": log_type, "error_message": None})
+
+    def fetch_logs(self, user_id, session_id, limit=200, log_type=None, since_id=None):
+        return LogsApiResponse(success=True, logs=self.logs[-limit:], count=len(self.logs))
+
+    def fetch_logs_since(self, user_id, session_id, since_id=None, page_size=200):
+        logs = [l for l in self.logs if l["id"] > (since_id or 0)]
+        return LogsApiResponse(success=True, logs=logs, count=len(logs))
+
+
+def _wait(reader, deadline_sec):
+    return asyncio.run(reader.wait_for_logs("user", "sess", deadline_sec=deadline_sec))
+
+
+def test_rows_already_landed_are_not_swallowed_without_a_cursor():
+    client = FakeLogsClient()
+    reader = LogsReader(client)
+    # turn 0 wrote no logs, so no cursor exists when turn 1's rows are already there
+    assert not _wait(reader, deadline_sec=0).complete
+    client.write("intent_classifier", "main_model")
+
+    poll = _wait(reader, deadline_sec=5)
+    assert poll.complete and poll.attempts == 1
+    assert poll.logs["log_type"] == ["intent_classifier", "main_model"]
+
+    client.write("intent_classifier", "main_model")
+    assert _wait(reader, deadline_sec=5).attempts == 1
+    assert reader._last_max_id[("user", "sess")] == 4
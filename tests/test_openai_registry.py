@@ -0,0 +1,28 @@
+import asyncio
+
+from app.clients.openai_registry import aclose_openai_clients, get_async_openai_client, get_openai_client
+
+
+def test_chat_request_goes_through(standins):
+    resp = get_openai_client("chat").chat.completions.create(
+        model="gpt-4o", messages=[{"role": "user", "content": "Hello"}], temperature=0.4,
+    )
+    assert resp.choices[0].message.content
+    assert resp.usage.total_tokens > 0
+
+
+def test_embeddings_request_goes_through(standins):
+    resp = get_openai_client("embeddings").embeddings.create(model="text-embedding-ada-002", input=["Hello"])
+    assert len(resp.data[0].embedding) == standins.openai.config.embedding_dim
+
+
+def test_async_chat_request_goes_through(standins):
+    async def call():
+        try:
+            return await get_async_openai_client("chat").chat.completions.create(
+                model="gpt-4o", messages=[{"role": "user", "content": "Hello"}], temperature=0.4,
+            )
+        finally:
+            await aclose_openai_clients()     # the async pool belongs to this loop
+
+    assert asyncio.run(call()).choices[0].message.content
@@ -0,0 +1,109 @@
+import os
+
+import numpy as np
+
+from app.core.persona.corpus import (
+    CLUSTERS_FILE,
+    CODES_FILE,
+    META_FILE,
+    REPS_FILE,
+    SCALES_FILE,
+    QuestionCorpus,
+    quantize,
+)
+from app.core.persona.tracker import QuestionDeduplicator
+
+DIM = 16
+
+
+def _vectors(n):
+    return np.eye(n, DIM, dtype=np.float32)     # orthogonal: every question is its own nearest neighbour
+
+
+def _corpus(root, n):
+    corpus = QuestionCorpus(str(root))
+    for i, v in enumerate(_vectors(n)):
+        corpus.add(f"question {i}", v, run_id="run", session_id=f"s{i}", turn_index=i)
+    return corpus
+
+
+def _assert_aligned(corpus, n):
+    assert corpus.stats()["questions"] == n
+    for i, v in enumerate(_vectors(n)):
+        assert corpus.nearest(v, k=1)[0]["text"] == f"question {i}"
+
+
+def test_partial_append_is_truncated_on_load(tmp_path):
+    _corpus(tmp_path, 3)
+    # crash mid-append: the code row and scale of a 4th question were written, its meta was not
+    code, scale = quantize(_vectors(4)[3])
+    with open(tmp_path / CODES_FILE, "ab") as f:
+        f.write(code.tobytes())
+    with open(tmp_path / SCALES_FILE, "ab") as f:
+        f.write(np.float32(scale).tobytes())
+
+    corpus = QuestionCorpus(str(tmp_path))
+    _assert_aligned(corpus, 3)
+    assert os.path.getsize(tmp_path / CODES_FILE) == 3 * DIM
+
+    corpus.add("question 3", _vectors(4)[3], run_id="run", session_id="s3", turn_index=3)
+    _assert_aligned(QuestionCorpus(str(tmp_path)), 4)
+
+
+def test_torn_meta_line_is_dropped(tmp_path):
+    _corpus(tmp_path, 2)
+    code, scale = quantize(_vectors(3)[2])
+    with open(tmp_path / CODES_FILE, "ab") as f:
+        f.write(code[: DIM // 2].tobytes())
+    with open(tmp_path / META_FILE, "a", encoding="utf-8") as f:
+        f.write('{"text": "question 2", "run')
+
+    corpus = QuestionCorpus(str(tmp_path))
+    _assert_aligned(corpus, 2)
+
+    corpus.add("question 2", _vectors(3)[2], run_id="run", session_id="s2", turn_index=2)
+    _assert_aligned(QuestionCorpus(str(tmp_path)), 3)
+
+
+def _paraphrases(n, topics=4, seed=0):
+    """n questions over a few topics: paraphrases of one topic land in one cluster."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((topics, DIM)).astype(np.float32)
+    return [centers[i % topics] + 0.1 * rng.standard_normal(DIM).astype(np.float32) for i in range(n)]
+
+
+def _fill(root, vectors):
+    corpus = QuestionCorpus(str(root))
+    for i, v in enumerate(vectors):
+        corpus.add(f"question {i}", v, run_id=f"run{i % 2}", session_id=f"s{i % 3}", turn_index=i)
+    return corpus
+
+
+def test_clusters_are_restored_without_reclustering(tmp_path, monkeypatch):
+    corpus = _fill(tmp_path, _paraphrases(20))
+    expected = (corpus.top_repeated(), corpus.stats())
+    assert expected[1] == {**expected[1], "questions": 20, "clusters": 4, "sessions": 3, "runs": 2}
+
+    def fail(*args, **kwargs):
+        raise AssertionError("greedy pass re-run on load")
+
+    monkeypatch.setattr(QuestionDeduplicator, "assign", fail)
+    reloaded = QuestionCorpus(str(tmp_path))
+    assert (reloaded.top_repeated(), reloaded.stats()) == expected
+    query = _paraphrases(20)[5]
+    assert reloaded.nearest(query, k=3) == corpus.nearest(query, k=3)
+
+
+def test_missing_cluster_rows_are_clustered_on_load(tmp_path):
+    vectors = _paraphrases(12)
+    expected = _fill(tmp_path / "full", vectors).top_repeated()
+    _fill(tmp_path / "cut", vectors)
+    # crash before the last question's cluster id was written; a pre-cluster corpus has none at all
+    os.truncate(tmp_path / "cut" / CLUSTERS_FILE, 11 * 4)
+    for name in (CLUSTERS_FILE, REPS_FILE):
+        os.remove(tmp_path / "full" / name)
+
+    for root in ("cut", "full"):
+        assert QuestionCorpus(str(tmp_path / root)).top_repeated() == expected
+        assert os.path.getsize(tmp_path / root / CLUSTERS_FILE) == 12 * 4
+        assert QuestionCorpus(str(tmp_path / root)).top_repeated() == expected
@@ -0,0 +1,51 @@
+import sqlite3
+from datetime import datetime
+
+from app.config.types import RunReport, Turn
+from app.core.store.run_store import AUTO_VACUUM_INCREMENTAL, RunStore
+
+
+def _report(i):
+    now = datetime.utcnow()
+    turns = [
+        Turn(role="assistant", content="What's your budget? " * 200, user_id="u", session_id=f"s{i}", ts=now),
+        Turn(role="user", content="Around 500k. " * 200, user_id="u", session_id=f"s{i}", ts=now),
+    ]
+    return RunReport(True, "u", f"s{i}", turns, None, now, now, None, run_id="run")
+
+
+def _pragma(path, name):
+    with sqlite3.connect(path) as db:
+        return db.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def test_new_store_uses_incremental_auto_vacuum(tmp_path):
+    path = str(tmp_path / "runs.sqlite3")
+    RunStore(path).close()
+    assert _pragma(path, "auto_vacuum") == AUTO_VACUUM_INCREMENTAL
+
+
+def test_existing_store_without_auto_vacuum_is_converted(tmp_path):
+    path = str(tmp_path / "runs.sqlite3")
+    with sqlite3.connect(path) as db:
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE t (x)")
+    assert _pragma(path, "auto_vacuum") == 0
+
+    RunStore(path).close()
+    assert _pragma(path, "auto_vacuum") == AUTO_VACUUM_INCREMENTAL
+
+
+def test_compaction_returns_space(tmp_path):
+    path = str(tmp_path / "runs.sqlite3")
+    store = RunStore(path, max_runs=1000)
+    for i in range(50):
+        store.save(_report(i), "report")
+    store.close()
+
+    store = RunStore(path, max_runs=0)
+    pages = _pragma(path, "page_count")
+    assert store.compact()["over_limit"] == 50
+    store.close()
+    assert _pragma(path, "freelist_count") == 0
+    assert _pragma(path, "page_count") < pages / 2